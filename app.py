@@ -7,8 +7,19 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 from github_api import GitHubAPI, ConfusionAtomDetector, RepositoryAnalyzer
+from local_repository import GitError
 from gemini_api import GeminiAPI
 from report_generator import ReportGenerator
+from http_transport import get_default_transport
+from http_cache import HTTPResponseCache
+from blob_cache import BlobCache
+from crawl_state import CrawlStateStore
+from crawl_journal import CrawlJournal, read_journal_state
+from async_crawler import run_async
+from detection_pool import DetectionPool
+from pattern_profile import Profile, profile_rows, format_profile_table
+from corpus_statistics import corpus_statistics, format_statistics
+from file_classifier import FileClassifier, merge_skip_counts
 import config
 
 load_dotenv()
@@ -16,14 +27,6 @@ load_dotenv()
 github_token = os.getenv('GITHUB_ACCESS_TOKEN')
 gemini_api_key = os.getenv('GOOGLE_GEMINI_API_KEY')
 
-if not github_token:
-    print("Erro: Token de acesso do GitHub não encontrado no arquivo .env")
-    sys.exit(1)
-
-if not gemini_api_key:
-    print("Erro: Chave de API do Google Gemini não encontrada no arquivo .env")
-    sys.exit(1)
-
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description='Crawler GitHub para detectar átomos de confusão em código')
@@ -43,9 +46,40 @@ def parse_arguments():
                         help='Número máximo de arquivos para analisar por repositório')
     parser.add_argument('--updated-after', type=str, default="2023-01-01",
                         help='Filtrar repositórios atualizados após esta data (YYYY-MM-DD)')
+    parser.add_argument('--listing-mode', type=str, choices=['tree', 'contents'], default=config.LISTING_MODE,
+                        help='Estratégia de listagem de arquivos (tree: Git Trees recursivo, contents: diretório a diretório)')
+    parser.add_argument('--fetch-strategy', type=str, choices=['files', 'archive', 'graphql', 'auto'], default=config.FETCH_STRATEGY,
+                        help='Estratégia de download (files: um arquivo por requisição, archive: tarball único, graphql: lotes GraphQL, auto: escolhe pelo custo)')
+    
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Usar o motor assíncrono com concorrência limitada')
+    parser.add_argument('--max-repos-in-flight', type=int, default=config.ASYNC_MAX_REPOS_IN_FLIGHT,
+                        help='Repositórios analisados simultaneamente no modo assíncrono')
+    parser.add_argument('--max-files-in-flight', type=int, default=config.ASYNC_MAX_FILES_IN_FLIGHT,
+                        help='Arquivos baixados simultaneamente por repositório no modo assíncrono')
+    parser.add_argument('--detection-workers', type=int, default=config.DETECTION_WORKERS,
+                        help='Processos dedicados à detecção, separados do download (0: detecção no mesmo processo)')
+    parser.add_argument('--profile-patterns', action='store_true', default=config.DETECTOR_PATTERN_PROFILE,
+                        help='Medir custo e taxa de acerto de cada padrão por linguagem e incluir no relatório')
+    
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Desativar o cache HTTP condicional e o cache de blobs')
+    parser.add_argument('--include-generated', action='store_true',
+                        help='Analisar também arquivos de terceiros, minificados e gerados')
+    
+    parser.add_argument('--incremental', action='store_true',
+                        help='Re-crawl incremental: pula repositórios sem novos commits e reanalisa só os arquivos alterados')
+    parser.add_argument('--resume', action='store_true',
+                        help='Retomar um crawl interrompido a partir do journal, sem repetir chamadas à API')
+    parser.add_argument('--new-journal', action='store_true',
+                        help='Descartar o journal de um crawl interrompido e iniciar um novo crawl')
     
     parser.add_argument('--analyze-repo', type=str,
                         help='Analisar um repositório específico (formato: dono/repo)')
+    parser.add_argument('--local-repo', type=str, nargs='+', metavar='PATH',
+                        help='Analisar clones locais (working tree ou bare/mirror) sem usar a API do GitHub')
+    parser.add_argument('--local-ref', type=str, default='HEAD',
+                        help='Referência analisada nos clones locais')
     parser.add_argument('--deep-analysis', action='store_true',
                         help='Realizar análise profunda com Gemini para arquivos com átomos de confusão')
     
@@ -57,9 +91,27 @@ def parse_arguments():
     return parser.parse_args()
 
 
+def crawl_parameters(args) -> Dict[str, Any]:
+    return {
+        'query': args.query,
+        'languages': args.languages,
+        'min_stars': args.min_stars,
+        'min_forks': args.min_forks,
+        'max_repos': args.max_repos,
+        'max_files': args.max_files,
+        'updated_after': args.updated_after,
+        'listing_mode': args.listing_mode,
+        'fetch_strategy': args.fetch_strategy,
+        'include_generated': args.include_generated,
+        'analyze_repo': args.analyze_repo,
+        'local_repo': args.local_repo,
+        'local_ref': args.local_ref,
+    }
+
+
 def analyze_specific_repository(repo_path: str, analyzer: RepositoryAnalyzer, 
                               gemini: Optional[GeminiAPI] = None, 
-                              deep_analysis: bool = False) -> Dict[str, Any]:
+                              deep_analysis: bool = False, args=None) -> Dict[str, Any]:
     try:
         owner, repo = repo_path.split('/')
     except ValueError:
@@ -67,7 +119,11 @@ def analyze_specific_repository(repo_path: str, analyzer: RepositoryAnalyzer,
         return {}
     
     print(f"\nAnalisando repositório específico: {owner}/{repo}")
-    result = analyzer.analyze_repository(owner, repo)
+    if args is not None and args.use_async:
+        result = run_async(lambda async_analyzer: async_analyzer.analyze_repository(owner, repo),
+                           analyzer, args.max_repos_in_flight, args.max_files_in_flight)
+    else:
+        result = analyzer.analyze_repository(owner, repo)
     
     if deep_analysis and gemini and result['files_with_confusion'] > 0:
         perform_deep_analysis(result, gemini)
@@ -75,6 +131,17 @@ def analyze_specific_repository(repo_path: str, analyzer: RepositoryAnalyzer,
     return result
 
 
+def analyze_local_repositories(paths: List[str], ref: str, analyzer: RepositoryAnalyzer) -> List[Dict[str, Any]]:
+    results = []
+    for path in paths:
+        print(f"\nAnalisando clone local: {path}")
+        try:
+            results.append(analyzer.analyze_local_repository(path, ref))
+        except GitError as e:
+            print(f"Erro ao analisar {path}: {str(e)}")
+    return results
+
+
 def search_and_analyze_repositories(args, analyzer: RepositoryAnalyzer, 
                                    gemini: Optional[GeminiAPI] = None) -> List[Dict[str, Any]]:
     print(f"\nBuscando repositórios com o termo: {args.query}")
@@ -83,14 +150,20 @@ def search_and_analyze_repositories(args, analyzer: RepositoryAnalyzer,
     
     analyzer.max_files = args.max_files
     
-    results = analyzer.find_repositories_with_confusion(
-        query=args.query,
-        languages=args.languages,
-        min_stars=args.min_stars,
-        min_forks=args.min_forks,
-        last_updated=args.updated_after,
-        max_repos=args.max_repos
-    )
+    search_kwargs = {
+        'query': args.query,
+        'languages': args.languages,
+        'min_stars': args.min_stars,
+        'min_forks': args.min_forks,
+        'last_updated': args.updated_after,
+        'max_repos': args.max_repos
+    }
+    
+    if args.use_async:
+        results = run_async(lambda async_analyzer: async_analyzer.find_repositories_with_confusion(**search_kwargs),
+                            analyzer, args.max_repos_in_flight, args.max_files_in_flight)
+    else:
+        results = analyzer.find_repositories_with_confusion(**search_kwargs)
     
     if args.deep_analysis and gemini:
         for result in results:
@@ -103,7 +176,8 @@ def search_and_analyze_repositories(args, analyzer: RepositoryAnalyzer,
 def perform_deep_analysis(result: Dict[str, Any], gemini: GeminiAPI) -> None:
     print(f"\nRealizando análise profunda com Gemini para {len(result['files'])} arquivos...")
     
-    github_api = GitHubAPI(github_token)
+    github_api = GitHubAPI([token.strip() for token in github_token.split(',') if token.strip()],
+                           transport=gemini.transport)
     
     for file_info in result['files']:
         filename = file_info.get('filename', '')
@@ -141,13 +215,18 @@ def perform_deep_analysis(result: Dict[str, Any], gemini: GeminiAPI) -> None:
             print(f"Falha na análise do Gemini para {filename}: {confusion_analysis['analysis']}")
 
 
-def generate_reports(results: List[Dict[str, Any]], args) -> None:
+def generate_reports(results: List[Dict[str, Any]], args, pattern_profile: Optional[Profile] = None) -> None:
     if not results:
         print("Nenhum resultado para gerar relatórios.")
         return
     
     report_generator = ReportGenerator(output_dir=args.output_dir)
     
+    if pattern_profile:
+        profile_path = report_generator.generate_json_report(
+            {'pattern_profile': pattern_profile, 'patterns': profile_rows(pattern_profile)}, "perfil_de_padroes.json")
+        print(f"Perfil de padrões JSON: {profile_path}")
+    
     for i, result in enumerate(results):
         print(f"\nGerando relatórios para {result['repository']}...")
         
@@ -169,15 +248,27 @@ def generate_reports(results: List[Dict[str, Any]], args) -> None:
     if len(results) > 1:
         print("\nGerando relatório consolidado...")
         
+        skipped_files = {}
+        for result in results:
+            merge_skip_counts(skipped_files, result.get('skipped_files', {}))
+        
         consolidated = {
             'timestamp': datetime.now().isoformat(),
             'total_repositories': len(results),
             'repositories_analyzed': [result['repository'] for result in results],
             'total_files_analyzed': sum(result['files_analyzed'] for result in results),
             'total_files_with_confusion': sum(result['files_with_confusion'] for result in results),
+            'total_files_truncated': sum(len(result.get('truncated_files', [])) for result in results),
+            'total_files_skipped': skipped_files,
             'average_confusion_score': sum(result['average_confusion_score'] for result in results) / len(results),
+            'statistics': corpus_statistics(results),
             'repositories': results
         }
+        if pattern_profile:
+            consolidated['pattern_profile'] = pattern_profile
+        
+        print("\nEstatísticas do corpus:")
+        print(format_statistics(consolidated['statistics']))
         
         if args.format == 'json' or args.format == 'all':
             json_path = report_generator.generate_json_report(consolidated, "relatorio_consolidado.json")
@@ -191,32 +282,104 @@ def generate_reports(results: List[Dict[str, Any]], args) -> None:
 def main():
     args = parse_arguments()
     
+    if not github_token and not args.local_repo:
+        print("Erro: Token de acesso do GitHub não encontrado no arquivo .env")
+        sys.exit(1)
+    
+    if not gemini_api_key and not args.local_repo:
+        print("Erro: Chave de API do Google Gemini não encontrada no arquivo .env")
+        sys.exit(1)
+    
+    parameters = crawl_parameters(args)
+    journal_state = read_journal_state()
+    if args.resume and journal_state is not None:
+        if journal_state['finished']:
+            print(f"O crawl em {config.CRAWL_JOURNAL_PATH} já foi concluído; não há o que retomar. "
+                  "Execute sem --resume para iniciar um novo crawl.")
+            sys.exit(1)
+        if journal_state['parameters'] != parameters:
+            print(f"O crawl em {config.CRAWL_JOURNAL_PATH} foi iniciado com outros parâmetros: "
+                  f"{json.dumps(journal_state['parameters'], ensure_ascii=False)}. "
+                  "Repita os mesmos parâmetros com --resume ou use --new-journal para descartá-lo.")
+            sys.exit(1)
+    elif not args.resume and not args.new_journal and journal_state is not None and not journal_state['finished']:
+        print(f"Existe um crawl interrompido em {config.CRAWL_JOURNAL_PATH}. "
+              "Use --resume para retomá-lo ou --new-journal para descartá-lo.")
+        sys.exit(1)
+    
     print("Iniciando crawler GitHub para detecção de átomos de confusão")
     print(f"Token GitHub: {'Configurado' if github_token else 'Não configurado'}")
     print(f"API Key Gemini: {'Configurada' if gemini_api_key else 'Não configurada'}")
     
-    github_api = GitHubAPI(github_token)
-    analyzer = RepositoryAnalyzer(github_api)
+    transport = get_default_transport()
+    cache = None
+    if config.HTTP_CACHE_ENABLED and not args.no_cache:
+        cache = HTTPResponseCache()
+    github_tokens = [token.strip() for token in (github_token or '').split(',') if token.strip()]
+    github_api = GitHubAPI(github_tokens, transport=transport, cache=cache) if github_tokens else None
+    if len(github_tokens) > 1:
+        github_api.refresh_rate_limits()
+        print(f"Pool de tokens GitHub: {len(github_tokens)} tokens")
+    blob_cache = None
+    if config.BLOB_CACHE_ENABLED and not args.no_cache:
+        blob_cache = BlobCache()
+    state_store = CrawlStateStore() if args.incremental else None
+    journal = CrawlJournal(resume=args.resume, parameters=parameters)
+    detector = ConfusionAtomDetector(profile_patterns=args.profile_patterns)
+    detection_pool = None
+    if args.detection_workers > 0:
+        detection_pool = DetectionPool(detector, args.detection_workers)
+        print(f"Pool de detecção: {detection_pool.workers} processos, fila de {detection_pool.queue_size} arquivos")
+    if args.profile_patterns:
+        print("Perfil de custo por padrão ativado")
+    file_classifier = None
+    if config.FILE_CLASSIFIER_ENABLED and not args.include_generated:
+        file_classifier = FileClassifier()
+    analyzer = RepositoryAnalyzer(github_api, listing_mode=args.listing_mode, fetch_strategy=args.fetch_strategy,
+                                  blob_cache=blob_cache, state_store=state_store, journal=journal,
+                                  detection_pool=detection_pool, detector=detector, file_classifier=file_classifier)
     
     gemini = None
     if args.deep_analysis and gemini_api_key:
-        gemini = GeminiAPI(gemini_api_key)
+        gemini = GeminiAPI(gemini_api_key, transport=transport)
         print("Análise profunda com Gemini ativada")
     
     results = []
     
-    if args.analyze_repo:
-        result = analyze_specific_repository(args.analyze_repo, analyzer, gemini, args.deep_analysis)
+    if args.local_repo:
+        analyzer.max_files = args.max_files
+        results = analyze_local_repositories(args.local_repo, args.local_ref, analyzer)
+    elif args.analyze_repo:
+        result = analyze_specific_repository(args.analyze_repo, analyzer, gemini, args.deep_analysis, args)
         if result:
             results.append(result)
     else:
         results = search_and_analyze_repositories(args, analyzer, gemini)
     
+    journal.record_crawl_done()
+    journal.close()
+    if detection_pool is not None:
+        detection_pool.close()
+    
     if results:
-        generate_reports(results, args)
+        generate_reports(results, args, detector.pattern_profile)
         print("\nAnálise concluída com sucesso!")
     else:
         print("\nNenhum resultado encontrado para gerar relatórios.")
+    
+    if cache is not None:
+        stats = cache.summary()
+        print(f"\nCache HTTP: {stats['hits']} acertos, {stats['revalidated']} revalidações (304), "
+              f"{stats['misses']} falhas, {stats['rate_limit_saved']} requisições poupadas do limite de taxa")
+    
+    if blob_cache is not None:
+        stats = blob_cache.summary()
+        print(f"Cache de blobs: {stats['detection_hits']} resultados reaproveitados, "
+              f"{stats['content_hits']} conteúdos reaproveitados, {stats['misses']} downloads")
+    
+    if detector.pattern_profile:
+        print("\nPadrões mais custosos:")
+        print(format_profile_table(profile_rows(detector.pattern_profile), top=15))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,148 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Callable
+import config
+from github_api import RepositoryAnalyzer
+
+
+class AsyncRepositoryAnalyzer:
+    def __init__(self, analyzer: RepositoryAnalyzer,
+                 max_repos_in_flight: Optional[int] = None,
+                 max_files_in_flight: Optional[int] = None):
+        self.analyzer = analyzer
+        self.max_repos_in_flight = max_repos_in_flight or config.ASYNC_MAX_REPOS_IN_FLIGHT
+        self.max_files_in_flight = max_files_in_flight or config.ASYNC_MAX_FILES_IN_FLIGHT
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_repos_in_flight * (self.max_files_in_flight + 1))
+
+    async def _run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def _fetch_and_detect(self, semaphore: asyncio.Semaphore, results: Dict[str, Any],
+                                file_info: Dict[str, Any]) -> float:
+        analyzer = self.analyzer
+        language = analyzer.detector.detect_language_from_extension(file_info.get('name', ''))
+
+        async with semaphore:
+            print(f"Analisando arquivo: {file_info.get('path', '')}")
+            content, success = await self._run(analyzer._get_file_content, file_info)
+            if not success or not content:
+                print(f"Falha ao obter conteúdo do arquivo: {file_info.get('path', '')}")
+                return 0.0
+            if analyzer._skip_by_content(results, file_info, content):
+                return 0.0
+
+            cached = analyzer._cached_detection(file_info, language)
+            if cached is not None:
+                analyzer._discard_content(content)
+                return analyzer._record_file_result(results, file_info, language, *cached)
+
+            if analyzer.detection_pool is None:
+                try:
+                    detection = await self._run(analyzer._detect_content, content, language)
+                    return analyzer._store_detection(results, file_info, language, content, detection)
+                finally:
+                    analyzer._discard_content(content)
+
+            future = await self._run(analyzer._submit_detection, content, language)
+
+        try:
+            detection = await asyncio.wrap_future(future)
+            return analyzer._store_detection(results, file_info, language, content, detection)
+        finally:
+            analyzer._discard_content(content)
+
+    async def analyze_repository(self, owner: str, repo: str) -> Dict[str, Any]:
+        analyzer = self.analyzer
+        print(f"Analisando repositório: {owner}/{repo}")
+
+        results = analyzer._new_results(owner, repo)
+
+        finished_results, repo_info = await self._run(analyzer._begin_repository, owner, repo, results)
+        if finished_results is not None:
+            return finished_results
+
+        plan = await self._run(analyzer._plan_fetch, owner, repo, repo_info, results.get('_crawl_state'))
+        if plan is None:
+            print(f"Nenhum conteúdo encontrado para {owner}/{repo}")
+            return results
+
+        strategy, ref, files_to_analyze, cached_files = plan
+        total_confusion_score = analyzer._record_cached_files(results, cached_files)
+
+        if strategy != 'files':
+            file_contents = analyzer._iter_plan_contents(owner, repo, strategy, ref, files_to_analyze)
+            total_confusion_score += await self._run(
+                analyzer._analyze_file_contents, results, file_contents)
+            return analyzer._finalize_results(results, total_confusion_score)
+
+        semaphore = asyncio.Semaphore(self.max_files_in_flight)
+        scores = await asyncio.gather(*[self._fetch_and_detect(semaphore, results, file_info)
+                                        for file_info in files_to_analyze])
+        return analyzer._finalize_results(results, total_confusion_score + sum(scores))
+
+    async def _analyze_bounded(self, semaphore: asyncio.Semaphore, owner: str, repo: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await self.analyze_repository(owner, repo)
+
+    async def find_repositories_with_confusion(self,
+                                               query: str,
+                                               languages: List[str] = None,
+                                               min_stars: int = 10,
+                                               min_forks: int = 5,
+                                               last_updated: str = None,
+                                               max_repos: int = 5) -> List[Dict[str, Any]]:
+        if languages is None:
+            languages = list(config.CONFUSION_PATTERNS.keys())
+
+        semaphore = asyncio.Semaphore(self.max_repos_in_flight)
+        repositories = []
+        analyses = []
+
+        for language in languages:
+            print(f"Buscando repositórios para a linguagem: {language}")
+
+            repos = await self._run(
+                lambda **kwargs: list(self.analyzer._iter_language_repositories(**kwargs)),
+                query=query,
+                language=language,
+                min_stars=min_stars,
+                min_forks=min_forks,
+                last_updated=last_updated,
+                max_results=max_repos - len(repositories)
+            )
+
+            for repo in repos:
+                owner = repo.get('owner', {}).get('login')
+                repo_name = repo.get('name')
+                if owner and repo_name:
+                    repositories.append(repo)
+                    analyses.append(asyncio.ensure_future(self._analyze_bounded(semaphore, owner, repo_name)))
+
+                    if len(repositories) >= max_repos:
+                        break
+
+            if len(repositories) >= max_repos:
+                break
+
+        all_results = await asyncio.gather(*analyses)
+        all_results = [self.analyzer._attach_repository_metadata(result, repo)
+                       for result, repo in zip(all_results, repositories)]
+
+        return sorted(all_results, key=lambda x: x['average_confusion_score'], reverse=True)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+
+
+def run_async(coroutine_factory: Callable[[AsyncRepositoryAnalyzer], Any],
+              analyzer: RepositoryAnalyzer,
+              max_repos_in_flight: Optional[int] = None,
+              max_files_in_flight: Optional[int] = None) -> Any:
+    async_analyzer = AsyncRepositoryAnalyzer(analyzer, max_repos_in_flight, max_files_in_flight)
+    try:
+        return asyncio.run(coroutine_factory(async_analyzer))
+    finally:
+        async_analyzer.close()
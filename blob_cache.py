@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, Tuple
+import config
+from findings import Findings
+
+
+def git_blob_sha(data: bytes) -> str:
+    header = f"blob {len(data)}\0".encode()
+    return hashlib.sha1(header + data).hexdigest()
+
+
+class BlobCache:
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: Optional[float] = None):
+        self.cache_dir = cache_dir or config.BLOB_CACHE_DIR
+        self.objects_dir = os.path.join(self.cache_dir, 'objects')
+        self.max_size = int((max_size_mb if max_size_mb is not None else config.BLOB_CACHE_MAX_SIZE_MB) * 1024 * 1024)
+        self.stats = {'detection_hits': 0, 'content_hits': 0, 'misses': 0, 'evictions': 0}
+
+        if not os.path.exists(self.objects_dir):
+            os.makedirs(self.objects_dir)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.path.join(self.cache_dir, 'index.sqlite3'), check_same_thread=False)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha TEXT PRIMARY KEY,
+                content_size INTEGER NOT NULL,
+                language TEXT,
+                pattern_version TEXT,
+                line_count INTEGER,
+                results TEXT,
+                results_size INTEGER NOT NULL DEFAULT 0,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._connection.execute("CREATE INDEX IF NOT EXISTS blobs_accessed_at ON blobs (accessed_at)")
+        self._connection.commit()
+        self._total_size = self._connection.execute(
+            "SELECT COALESCE(SUM(content_size + results_size), 0) FROM blobs").fetchone()[0]
+
+    def _object_path(self, sha: str) -> str:
+        return os.path.join(self.objects_dir, sha[:2], sha[2:])
+
+    def get_detection(self, sha: str, language: str,
+                      pattern_version: str) -> Optional[Tuple[Findings, int]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT language, pattern_version, line_count, results FROM blobs WHERE sha = ?", (sha,)).fetchone()
+            if row is None or row[0] != language or row[1] != pattern_version or row[3] is None:
+                return None
+            self._connection.execute("UPDATE blobs SET accessed_at = ? WHERE sha = ?", (time.time(), sha))
+            self._connection.commit()
+            self.stats['detection_hits'] += 1
+        return Findings.load(json.loads(row[3])), row[2]
+
+    def get_content(self, sha: str) -> Optional[str]:
+        try:
+            with open(self._object_path(sha), 'rb') as blob_file:
+                content = zlib.decompress(blob_file.read()).decode('utf-8')
+        except (OSError, zlib.error, UnicodeDecodeError):
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+
+        with self._lock:
+            self._connection.execute("UPDATE blobs SET accessed_at = ? WHERE sha = ?", (time.time(), sha))
+            self._connection.commit()
+            self.stats['content_hits'] += 1
+        return content
+
+    def put(self, sha: str, content: Optional[str], language: str, pattern_version: str,
+            results: Findings, line_count: int) -> None:
+        compressed = zlib.compress(content.encode('utf-8')) if content is not None else b''
+        serialized_results = json.dumps(results.to_json(), ensure_ascii=False)
+        content_size = len(compressed)
+        results_size = len(serialized_results)
+        if content_size + results_size > self.max_size:
+            return
+
+        object_path = self._object_path(sha)
+        with self._lock:
+            previous = self._connection.execute(
+                "SELECT content_size, results_size FROM blobs WHERE sha = ?", (sha,)).fetchone()
+            if previous:
+                self._total_size -= previous[0] + previous[1]
+
+            if content is not None:
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                temporary_path = f"{object_path}.{threading.get_ident()}.tmp"
+                with open(temporary_path, 'wb') as blob_file:
+                    blob_file.write(compressed)
+                os.replace(temporary_path, object_path)
+            else:
+                try:
+                    os.remove(object_path)
+                except OSError:
+                    pass
+
+            self._connection.execute(
+                "INSERT OR REPLACE INTO blobs "
+                "(sha, content_size, language, pattern_version, line_count, results, results_size, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (sha, content_size, language, pattern_version, line_count, serialized_results,
+                 results_size, time.time()))
+            self._total_size += content_size + results_size
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self) -> None:
+        while self._total_size > self.max_size:
+            rows = self._connection.execute(
+                "SELECT sha, content_size, results_size FROM blobs ORDER BY accessed_at ASC LIMIT 64").fetchall()
+            if not rows:
+                break
+            for sha, content_size, results_size in rows:
+                if self._total_size <= self.max_size:
+                    break
+                self._connection.execute("DELETE FROM blobs WHERE sha = ?", (sha,))
+                try:
+                    os.remove(self._object_path(sha))
+                except OSError:
+                    pass
+                self._total_size -= content_size + results_size
+                self.stats['evictions'] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            summary = dict(self.stats)
+            summary['size_bytes'] = self._total_size
+        return summary
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -7,11 +7,166 @@ TIMEOUT_SECONDS = 30
 RETRY_ATTEMPTS = 3
 RETRY_DELAY = 2
 
+# Pool de conexões HTTP compartilhado (keep-alive) entre os clientes do GitHub e do Gemini
+HTTP_POOL_CONNECTIONS = 10  # número de hosts com pool mantido
+HTTP_POOL_MAXSIZE = 20  # conexões simultâneas por host
+# Substituições de URL base (ex: {"https://api.github.com": "http://127.0.0.1:8000"} para um servidor local)
+HTTP_BASE_URL_OVERRIDES = {}
+
+# Pool de tokens do GitHub (GITHUB_ACCESS_TOKEN aceita vários tokens separados por vírgula)
+# Limites padrão por recurso usados até a primeira resposta informar os valores reais
+GITHUB_DEFAULT_RATE_LIMITS = {"core": 5000, "search": 30, "graphql": 5000}
+TOKEN_POOL_RESERVE = 1  # requisições mantidas em reserva em cada token
+TOKEN_POOL_PACING_THRESHOLD = 0.1  # fração restante da cota a partir da qual as requisições são espaçadas até o reset
+
+# Cache HTTP condicional (ETag / Last-Modified) das chamadas à API do GitHub
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_DIR = ".cache/http"
+HTTP_CACHE_MAX_SIZE_MB = 200
+# Tempo (segundos) em que uma resposta é reutilizada sem nenhuma requisição; depois disso é revalidada com If-None-Match
+HTTP_CACHE_DEFAULT_TTL_SECONDS = 300
+# TTL por endpoint (expressão regular sobre o caminho da URL)
+HTTP_CACHE_TTL_OVERRIDES = {
+    r"^/rate_limit$": 0,
+    r"^/search/": 3600,
+    r"/git/trees/[0-9a-f]{40}$": 7 * 24 * 3600,
+}
+
+# Cache de blobs endereçado por conteúdo (SHA do blob Git -> conteúdo comprimido + resultados do detector)
+BLOB_CACHE_ENABLED = True
+BLOB_CACHE_DIR = ".cache/blobs"
+BLOB_CACHE_MAX_SIZE_MB = 500
+
+# Estado persistido por repositório para re-crawls incrementais (--incremental)
+CRAWL_STATE_PATH = ".cache/crawl_state.sqlite3"
+
+# Journal append-only do crawl em andamento, usado para retomar execuções interrompidas (--resume)
+CRAWL_JOURNAL_PATH = ".cache/crawl_journal.jsonl"
+
+# Modo de varredura do detector: "buffer" aplica os padrões sobre o arquivo inteiro
+# usando um índice de quebras de linha; "lines" divide o conteúdo em linhas
+DETECTOR_SCAN_MODE = "buffer"
+
+# Pré-filtro por literais obrigatórios: só linhas que contêm algum literal dos padrões
+# (ex.: "eval(", "__getattr__", "instanceof") passam pelo motor de regex
+DETECTOR_LITERAL_PREFILTER = True
+
+# Máscara léxica (modo "buffer"): padrões de código só são aplicados fora de comentários
+# e strings, e palavras-chave suspeitas só dentro de comentários
+DETECTOR_LEXER_MASK = True
+
+# Lexer usado para Python na máscara léxica: "tokenize" (exato, mais lento) ou
+# "scanner" (varredura por expressão regular, ~20x mais rápida)
+PYTHON_LEXER = "tokenize"
+
+# Detector estrutural para Python (modo "buffer"): analisa o arquivo uma vez com `ast` e
+# encontra os átomos em um único percurso; arquivos que não compilam usam as regex
+PYTHON_AST_DETECTOR = False
+
+# Estágio de detecção em processos separados (--detection-workers): 0 executa o detector no
+# mesmo processo que baixa os arquivos; N > 0 usa um pool com N processos
+DETECTION_WORKERS = 0
+# Máximo de arquivos aguardando ou em detecção no pool; quem baixa os arquivos espera quando a fila enche
+DETECTION_QUEUE_SIZE = 32
+
+# Perfil de custo por padrão (--profile-patterns): registra tempo acumulado, execuções, acertos
+# e pior linha de cada regex por linguagem; desligado por padrão para não pesar na varredura
+DETECTOR_PATTERN_PROFILE = False
+
+# Proteção contra retrocesso catastrófico: linhas mais longas que o limite (em caracteres) são
+# analisadas só até o limite e a varredura de um arquivo para ao esgotar o orçamento (em segundos);
+# nos dois casos o arquivo aparece como "truncated" no relatório (0 desativa cada limite)
+DETECTOR_MAX_LINE_LENGTH = 20000
+DETECTOR_FILE_TIME_BUDGET = 5.0
+# Executa os padrões com curingas ".*" encadeados (ex.: "\[.*\bfor\b.*\bif\b.*\]") em tempo linear,
+# com os mesmos resultados da regex original
+DETECTOR_LINEAR_PATTERNS = True
+
+# Executável do git usado para analisar clones locais (--local-repo) com `git ls-tree` e `git cat-file --batch`
+LOCAL_GIT_BINARY = "git"
+
+# Arquivos acima de MAX_FILE_SIZE_KB são baixados em partes para um arquivo temporário e varridos
+# via mmap em janelas alinhadas a quebras de linha, com memória constante (False volta a ignorá-los)
+LARGE_FILE_STREAMING = True
+LARGE_FILE_MAX_SIZE_MB = 100
+LARGE_FILE_WINDOW_KB = 1024
+LARGE_FILE_CHUNK_KB = 256
+LARGE_FILE_TEMP_DIR = None  # None usa o diretório temporário do sistema
+
+# Estatísticas do corpus no relatório consolidado (NumPy; pandas, se instalado, exporta a tabela de ocorrências)
+CORPUS_STATISTICS_PERCENTILES = [25, 50, 75, 90, 99]
+CORPUS_STATISTICS_TOP_PATTERNS = 25
+CORPUS_STATISTICS_MIN_REPOSITORIES = 3  # mínimo de repositórios com estrelas/forks para calcular correlações
+
+# Classificação de arquivos de terceiros, minificados e gerados (estilo linguist), aplicada à listagem
+# antes de qualquer download e, de forma barata, ao conteúdo logo após o download
+FILE_CLASSIFIER_ENABLED = True
+# Diretórios de dependências, em qualquer nível do caminho
+VENDORED_DIRECTORIES = [
+    "node_modules", "bower_components", "jspm_packages", "vendor", "vendors", "third_party", "thirdparty",
+    "site-packages", "dist-packages", ".venv", "venv", ".tox"
+]
+# Diretórios de artefatos de build, só na raiz do repositório (ex.: src/build/ continua sendo código-fonte)
+ROOT_BUILD_DIRECTORIES = ["dist", "build", "target"]
+# Nomes de arquivos minificados, empacotados ou gerados por compiladores (globs, sem diferenciar maiúsculas)
+GENERATED_FILE_PATTERNS = [
+    "*.min.js", "*-min.js", "*.min.mjs", "*.bundle.js", "*.chunk.js", "*.pack.js", "*.umd.js",
+    "*_pb2.py", "*_pb2_grpc.py", "*_pb.js", "*_grpc_pb.js", "*OuterClass.java", "*Grpc.java"
+]
+# Arquivos grandes cujo nome indica um pacote montado (ex.: app.bundle.js, vendor.js)
+BUNDLE_NAME_MARKERS = ["bundle", "vendor", "compiled", "generated"]
+BUNDLE_NAME_MIN_SIZE_KB = 100
+# Marcadores de código gerado procurados nas primeiras linhas do conteúdo
+GENERATED_CODE_MARKERS = [
+    "Code generated by", "DO NOT EDIT", "@generated", "Generated by the protocol buffer compiler",
+    "Generated by Django", "This file is automatically generated", "Autogenerated by", "auto-generated"
+]
+GENERATED_HEADER_LINES = 10
+# Conteúdo com comprimento médio de linha acima do limite é tratado como minificado
+MINIFIED_AVERAGE_LINE_LENGTH = 110
+MINIFIED_MIN_SIZE_BYTES = 2048
+FILE_CLASSIFIER_SAMPLE_KB = 64
+
+# Concorrência do modo assíncrono (--async)
+ASYNC_MAX_REPOS_IN_FLIGHT = 4
+ASYNC_MAX_FILES_IN_FLIGHT = 8
+
 
 GITHUB_API_BASE_URL = "https://api.github.com"
 GITHUB_SEARCH_ENDPOINT = "/search/repositories"
 GITHUB_CONTENTS_ENDPOINT = "/repos/{owner}/{repo}/contents"
 GITHUB_RATE_LIMIT_ENDPOINT = "/rate_limit"
+# A API de busca devolve no máximo 1000 resultados por consulta; consultas maiores são fatiadas
+GITHUB_SEARCH_RESULT_CAP = 1000
+GITHUB_SEARCH_PER_PAGE = 100
+GITHUB_SEARCH_EARLIEST_DATE = "2008-01-01"
+GITHUB_REPO_ENDPOINT = "/repos/{owner}/{repo}"
+GITHUB_REF_ENDPOINT = "/repos/{owner}/{repo}/git/ref/heads/{branch}"
+GITHUB_COMPARE_ENDPOINT = "/repos/{owner}/{repo}/compare/{base}...{head}"
+GITHUB_COMPARE_MAX_FILES = 300  # a API de comparação lista no máximo 300 arquivos; acima disso faz-se a análise completa
+GITHUB_TREES_ENDPOINT = "/repos/{owner}/{repo}/git/trees/{tree_sha}"
+GITHUB_TARBALL_ENDPOINT = "/repos/{owner}/{repo}/tarball/{ref}"
+GITHUB_RAW_BASE_URL = "https://raw.githubusercontent.com"
+GITHUB_GRAPHQL_ENDPOINT = "/graphql"
+
+# Modo de listagem de arquivos: "tree" (Git Trees recursivo, uma chamada por repositório)
+# ou "contents" (percorre diretório por diretório via API de conteúdos)
+LISTING_MODE = "tree"
+
+# Estratégia de download: "files" (uma requisição por arquivo), "archive" (tarball único lido em memória),
+# "graphql" (vários blobs por consulta GraphQL) ou "auto" (usa o tarball quando o número de arquivos
+# supera o custo estimado do arquivo compactado)
+FETCH_STRATEGY = "auto"
+# Quantos KB do repositório equivalem, em custo, a uma requisição por arquivo
+ARCHIVE_KB_PER_REQUEST = 1024
+
+# Lotes GraphQL: o tamanho do lote cresce enquanto o custo em pontos fica no alvo e cai pela metade quando excede
+GRAPHQL_INITIAL_BATCH_SIZE = 25
+GRAPHQL_MIN_BATCH_SIZE = 1
+GRAPHQL_MAX_BATCH_SIZE = 100
+GRAPHQL_BATCH_SIZE_STEP = 5
+GRAPHQL_TARGET_COST = 1
+GRAPHQL_MAX_BATCH_BYTES = 2 * 1024 * 1024
 
 
 GEMINI_MODEL = "gemini-2.0-flash"
@@ -26,36 +181,39 @@ LANGUAGE_EXTENSIONS = {
     "java": [".java"],
 }
 
+# Padrões de átomos de confusão em Python, nomeados para que o detector AST os referencie
+PYTHON_CONFUSION_PATTERNS = {
+    "nested_lambda": r"\b(lambda)\b.*:.*\b(lambda)\b",
+    "nested_comprehension": r"\[.*\bfor\b.*\bif\b.*\bfor\b.*\]",
+    "eval": r"\beval\(.*\)",
+    "exec": r"\bexec\(.*\)",
+    "__new__": r"\b__new__\b",
+    "__getattr__": r"\b__getattr__\b",
+    "__setattr__": r"\b__setattr__\b",
+    "__getattribute__": r"\b__getattribute__\b",
+    "__delattr__": r"\b__delattr__\b",
+    "__slots__": r"\b__slots__\b",
+    "__getitem__": r"\b__getitem__\b",
+    "__setitem__": r"\b__setitem__\b",
+    "__delitem__": r"\b__delitem__\b",
+    "__call__": r"\b__call__\b",
+    "__metaclass__": r"\b__metaclass__\b",
+    "__mro__": r"\b__mro__\b",
+    "__subclasses__": r"\b__subclasses__\b",
+    "globals_update": r"\bglobals\(\)\.update\(",
+    "setattr": r"\bsetattr\(.*,.*,.*\)",
+    "getattr": r"\bgetattr\(.*,.*\)",
+    "del": r"\bdel\b",
+    "nonlocal": r"\bnonlocal\b",
+    "walrus": r"\b:=\b",
+    "is_comparison": r"\b(is|is not)\b(?!(\s+None|\s+True|\s+False))",
+    "mutable_default": r"def\s+\w+\([^)]*=\s*(\[\]|\{\}|\(\)|\{\s*:\s*\}|\[\s*\]|\(\s*\))[^)]*\)",
+    "mixed_boolean": r"[^&|]\band\b[^&|].*\bor\b[^&|]|\bor\b[^&|].*\band\b[^&|]",
+}
+
 # Padrões de átomos de confusão por linguagem
 CONFUSION_PATTERNS = {
-    "python": [
-        r"\b(lambda)\b.*:.*\b(lambda)\b",
-        r"\[.*\bfor\b.*\bif\b.*\bfor\b.*\]",
-        r"\beval\(.*\)",
-        r"\bexec\(.*\)",
-        r"\b__new__\b",
-        r"\b__getattr__\b",
-        r"\b__setattr__\b",
-        r"\b__getattribute__\b",
-        r"\b__delattr__\b",
-        r"\b__slots__\b",
-        r"\b__getitem__\b",
-        r"\b__setitem__\b",
-        r"\b__delitem__\b",
-        r"\b__call__\b",
-        r"\b__metaclass__\b",
-        r"\b__mro__\b",
-        r"\b__subclasses__\b",
-        r"\bglobals\(\)\.update\(",
-        r"\bsetattr\(.*,.*,.*\)",
-        r"\bgetattr\(.*,.*\)",
-        r"\bdel\b",
-        r"\bnonlocal\b",
-        r"\b:=\b",
-        r"\b(is|is not)\b(?!(\s+None|\s+True|\s+False))",
-        r"def\s+\w+\([^)]*=\s*(\[\]|\{\}|\(\)|\{\s*:\s*\}|\[\s*\]|\(\s*\))[^)]*\)",
-        r"[^&|]\band\b[^&|].*\bor\b[^&|]|\bor\b[^&|].*\band\b[^&|]",
-    ],
+    "python": list(PYTHON_CONFUSION_PATTERNS.values()),
     "javascript": [
         r"\b==\b",
         r"\bwith\b",
@@ -0,0 +1,287 @@
+import sys
+import json
+import argparse
+from typing import Dict, List, Any, Optional
+import numpy as np
+import config
+from findings import Findings, PATTERN_TABLE, RESULT_TYPES, ROW_WIDTH
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+def _number(value: Any) -> float:
+    return float(value) if value is not None else np.nan
+
+
+class CorpusArrays:
+    def __init__(self, results: List[Dict[str, Any]]):
+        self.repositories = [result['repository'] for result in results]
+        self.languages = sorted({language for result in results for language in result.get('languages', {})} |
+                                {file_entry['language'] for result in results for file_entry in result.get('files', [])})
+        language_codes = {language: code for code, language in enumerate(self.languages)}
+
+        self.stars = np.array([_number(result.get('stars')) for result in results], dtype=np.float64)
+        self.forks = np.array([_number(result.get('forks')) for result in results], dtype=np.float64)
+        self.repository_scores = np.array([result.get('average_confusion_score', 0.0) for result in results],
+                                          dtype=np.float64)
+        self.language_files = np.zeros((len(results), len(self.languages)), dtype=np.int64)
+        self.language_lines = np.zeros((len(results), len(self.languages)), dtype=np.int64)
+        for repository_index, result in enumerate(results):
+            for language, totals in result.get('languages', {}).items():
+                self.language_files[repository_index, language_codes[language]] = totals['files']
+                self.language_lines[repository_index, language_codes[language]] = totals['lines']
+
+        self.file_paths = []
+        file_repositories, file_languages, file_scores, row_blocks = [], [], [], []
+        for repository_index, result in enumerate(results):
+            for file_entry in result.get('files', []):
+                findings = Findings.load(file_entry['details'])
+                self.file_paths.append(file_entry.get('path', ''))
+                file_repositories.append(repository_index)
+                file_languages.append(language_codes[file_entry['language']])
+                file_scores.append(file_entry.get('confusion_score', 0.0))
+                row_blocks.append(np.frombuffer(findings.rows, dtype=np.uint32))
+
+        self.file_repositories = np.array(file_repositories, dtype=np.int64)
+        self.file_languages = np.array(file_languages, dtype=np.int64)
+        self.file_scores = np.array(file_scores, dtype=np.float64)
+
+        rows = np.concatenate(row_blocks) if row_blocks else np.zeros(0, dtype=np.uint32)
+        rows = rows.reshape(-1, ROW_WIDTH)
+        counts = np.array([block.size // ROW_WIDTH for block in row_blocks], dtype=np.int64)
+        self.finding_files = np.repeat(np.arange(counts.size), counts)
+        self.finding_types = rows[:, 0].astype(np.int64)
+        self.finding_patterns = rows[:, 1].astype(np.int64)
+        self.finding_lines = rows[:, 2].astype(np.int64)
+        self.finding_languages = self.file_languages[self.finding_files]
+        self.finding_repositories = self.file_repositories[self.finding_files]
+
+
+def _distribution(values: np.ndarray) -> Dict[str, Any]:
+    if values.size == 0:
+        return {'count': 0}
+    summary = {
+        'count': int(values.size),
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'min': float(values.min()),
+        'max': float(values.max())
+    }
+    percentiles = np.percentile(values, config.CORPUS_STATISTICS_PERCENTILES)
+    summary.update({f"p{percentile}": float(value)
+                    for percentile, value in zip(config.CORPUS_STATISTICS_PERCENTILES, percentiles)})
+    return summary
+
+
+def _file_scores(arrays: CorpusArrays, language_code: Optional[int] = None) -> np.ndarray:
+    if language_code is None:
+        scores = arrays.file_scores
+        total_files = int(arrays.language_files.sum())
+    else:
+        scores = arrays.file_scores[arrays.file_languages == language_code]
+        total_files = int(arrays.language_files[:, language_code].sum())
+    return np.concatenate([scores, np.zeros(max(total_files - scores.size, 0))])
+
+
+def _per_kloc(count: np.ndarray, lines: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(lines > 0, count / (lines / 1000.0), np.nan)
+
+
+def _optional(value: float) -> Optional[float]:
+    return float(value) if np.isfinite(value) else None
+
+
+def _density(arrays: CorpusArrays) -> Dict[str, Any]:
+    type_count = len(RESULT_TYPES)
+    language_count = len(arrays.languages)
+    counts = np.bincount(arrays.finding_languages * type_count + arrays.finding_types,
+                         minlength=language_count * type_count).reshape(language_count, type_count)
+    lines = arrays.language_lines.sum(axis=0)
+    densities = _per_kloc(counts, lines[:, None])
+    totals = _per_kloc(counts.sum(axis=1), lines)
+
+    density = {
+        'lines_analyzed': int(lines.sum()),
+        'findings_per_kloc': _optional(_per_kloc(np.array(counts.sum()), np.array(lines.sum()))),
+        'by_language': {}
+    }
+    for code, language in enumerate(arrays.languages):
+        entry = {'lines_analyzed': int(lines[code]), 'findings_per_kloc': _optional(totals[code])}
+        entry.update({f"{result_type}_per_kloc": _optional(densities[code, type_id])
+                      for type_id, result_type in enumerate(RESULT_TYPES)})
+        density['by_language'][language] = entry
+    return density
+
+
+def _pattern_rows(arrays: CorpusArrays, top: int) -> List[Dict[str, Any]]:
+    if arrays.finding_patterns.size == 0:
+        return []
+    pattern_count = int(arrays.finding_patterns.max()) + 1
+    keys = (arrays.finding_languages * len(RESULT_TYPES) + arrays.finding_types) * pattern_count + arrays.finding_patterns
+    unique_keys, inverse, findings = np.unique(keys, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+    files = np.bincount(np.unique(inverse * arrays.file_scores.size + arrays.finding_files) // arrays.file_scores.size,
+                        minlength=unique_keys.size)
+    repositories = np.bincount(
+        np.unique(inverse * len(arrays.repositories) + arrays.finding_repositories) // len(arrays.repositories),
+        minlength=unique_keys.size)
+
+    languages = unique_keys // pattern_count // len(RESULT_TYPES)
+    types = unique_keys // pattern_count % len(RESULT_TYPES)
+    patterns = unique_keys % pattern_count
+    language_lines = arrays.language_lines.sum(axis=0)[languages]
+    language_findings = np.bincount(arrays.finding_languages, minlength=len(arrays.languages))[languages]
+    per_kloc = _per_kloc(findings, language_lines)
+
+    order = np.argsort(-findings, kind='stable')[:top] if top else np.argsort(-findings, kind='stable')
+    return [{
+        'language': arrays.languages[languages[index]],
+        'type': RESULT_TYPES[types[index]],
+        'pattern': PATTERN_TABLE[int(patterns[index])],
+        'findings': int(findings[index]),
+        'files': int(files[index]),
+        'repositories': int(repositories[index]),
+        'per_kloc': _optional(per_kloc[index]),
+        'share_of_language': float(findings[index] / language_findings[index])
+    } for index in order]
+
+
+def _rank(values: np.ndarray) -> np.ndarray:
+    order = np.argsort(values, kind='stable')
+    _, first_index, counts = np.unique(values[order], return_index=True, return_counts=True)
+    ranks = np.empty(values.size, dtype=np.float64)
+    ranks[order] = np.repeat(first_index + (counts - 1) / 2.0, counts)
+    return ranks
+
+
+def _pearson(x: np.ndarray, y: np.ndarray) -> Optional[float]:
+    if x.std() == 0 or y.std() == 0:
+        return None
+    return float(np.corrcoef(x, y)[0, 1])
+
+
+def _correlation(x: np.ndarray, y: np.ndarray) -> Optional[Dict[str, Any]]:
+    mask = np.isfinite(x) & np.isfinite(y)
+    if mask.sum() < config.CORPUS_STATISTICS_MIN_REPOSITORIES:
+        return None
+    x, y = x[mask], y[mask]
+    return {'repositories': int(mask.sum()), 'pearson': _pearson(x, y), 'spearman': _pearson(_rank(x), _rank(y))}
+
+
+def _correlations(arrays: CorpusArrays) -> Dict[str, Dict[str, Any]]:
+    repository_findings = np.bincount(arrays.finding_repositories, minlength=len(arrays.repositories))
+    metrics = {
+        'average_confusion_score': arrays.repository_scores,
+        'findings_per_kloc': _per_kloc(repository_findings, arrays.language_lines.sum(axis=1))
+    }
+    return {popularity: {metric: _correlation(values, metric_values) for metric, metric_values in metrics.items()}
+            for popularity, values in (('stars', arrays.stars), ('forks', arrays.forks))}
+
+
+def corpus_statistics(results: List[Dict[str, Any]], top: Optional[int] = None) -> Dict[str, Any]:
+    arrays = CorpusArrays(results)
+    top = config.CORPUS_STATISTICS_TOP_PATTERNS if top is None else top
+    return {
+        'repositories': len(arrays.repositories),
+        'files_analyzed': int(arrays.language_files.sum()),
+        'files_with_findings': int(arrays.file_scores.size),
+        'findings': int(arrays.finding_patterns.size),
+        'score_distribution': {
+            'all': _distribution(_file_scores(arrays)),
+            'by_language': {language: _distribution(_file_scores(arrays, code))
+                            for code, language in enumerate(arrays.languages)},
+            'by_repository': _distribution(arrays.repository_scores)
+        },
+        'density': _density(arrays),
+        'patterns': _pattern_rows(arrays, top),
+        'correlations': _correlations(arrays)
+    }
+
+
+def findings_frame(results: List[Dict[str, Any]]) -> Any:
+    if pd is None:
+        raise ImportError("pandas não está instalado; instale-o para exportar a tabela de ocorrências")
+    arrays = CorpusArrays(results)
+    return pd.DataFrame({
+        'repository': pd.Categorical.from_codes(arrays.finding_repositories, arrays.repositories),
+        'language': pd.Categorical.from_codes(arrays.finding_languages, arrays.languages),
+        'path': np.array(arrays.file_paths, dtype=object)[arrays.finding_files],
+        'type': pd.Categorical.from_codes(arrays.finding_types, RESULT_TYPES),
+        'pattern': [PATTERN_TABLE[int(pattern_id)] for pattern_id in arrays.finding_patterns],
+        'line_number': arrays.finding_lines,
+        'confusion_score': arrays.file_scores[arrays.finding_files]
+    })
+
+
+def _format_value(value: Optional[float], digits: int = 3) -> str:
+    return f"{value:.{digits}f}" if value is not None else '-'
+
+
+def format_statistics(statistics: Dict[str, Any]) -> str:
+    density = statistics['density']
+    lines = [
+        f"Repositórios: {statistics['repositories']} | Arquivos: {statistics['files_analyzed']} "
+        f"({statistics['files_with_findings']} com ocorrências) | Ocorrências: {statistics['findings']} | "
+        f"Linhas: {density['lines_analyzed']} | Ocorrências/KLOC: {_format_value(density['findings_per_kloc'])}",
+        "",
+        f"{'linguagem':<11} {'arquivos':>9} {'média':>7} {'p50':>7} {'p90':>7} {'p99':>7} {'máx':>7} {'ocorr./KLOC':>12}"
+    ]
+    for language, distribution in statistics['score_distribution']['by_language'].items():
+        if not distribution['count']:
+            continue
+        lines.append(
+            f"{language:<11} {distribution['count']:>9} {distribution['mean']:>7.3f} "
+            f"{distribution.get('p50', 0.0):>7.3f} {distribution.get('p90', 0.0):>7.3f} "
+            f"{distribution.get('p99', 0.0):>7.3f} {distribution['max']:>7.3f} "
+            f"{_format_value(density['by_language'][language]['findings_per_kloc']):>12}"
+        )
+
+    if statistics['patterns']:
+        lines.extend(["", f"{'linguagem':<11} {'ocorrências':>11} {'arquivos':>9} {'repos':>6} {'/KLOC':>8}  padrão"])
+        for row in statistics['patterns']:
+            lines.append(f"{row['language']:<11} {row['findings']:>11} {row['files']:>9} {row['repositories']:>6} "
+                         f"{_format_value(row['per_kloc']):>8}  {row['pattern']}")
+
+    lines.append("")
+    for popularity, metrics in statistics['correlations'].items():
+        for metric, correlation in metrics.items():
+            if correlation is None:
+                lines.append(f"Correlação {popularity} x {metric}: repositórios insuficientes")
+            else:
+                lines.append(f"Correlação {popularity} x {metric}: pearson={_format_value(correlation['pearson'])} "
+                             f"spearman={_format_value(correlation['spearman'])} "
+                             f"(n={correlation['repositories']})")
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Estatísticas do corpus a partir de um relatório consolidado')
+    parser.add_argument('path', help='Relatório consolidado em JSON (relatorio_consolidado.json)')
+    parser.add_argument('--top', type=int, default=config.CORPUS_STATISTICS_TOP_PATTERNS,
+                        help='Quantidade de padrões exibidos (0 = todos)')
+    parser.add_argument('--csv', type=str,
+                        help='Exportar a tabela de ocorrências para CSV (requer pandas)')
+
+    args = parser.parse_args()
+
+    with open(args.path, 'r', encoding='utf-8') as report_file:
+        data = json.load(report_file)
+    results = data.get('repositories', [data])
+
+    print(format_statistics(corpus_statistics(results, args.top)))
+
+    if args.csv:
+        try:
+            findings_frame(results).to_csv(args.csv, index=False)
+        except ImportError as e:
+            print(str(e))
+            sys.exit(1)
+        print(f"Tabela de ocorrências: {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+import config
+from github_api import GitHubAPI, ConfusionAtomDetector, RepositoryAnalyzer
+from http_transport import HTTPTransport
+from async_crawler import run_async
+from detection_pool import DetectionPool
+from crawl_state import CrawlStateStore
+
+MOCK_OWNER = "mock"
+
+MOCK_FILE_CONTENT = """import os
+
+def load(path, cache={}):
+    # hack: evita recarregar o mesmo arquivo
+    if path in cache and cache[path] is not None or os.environ.get('FORCE'):
+        return cache[path]
+    handler = lambda x: (lambda y: x + y)
+    return eval(open(path).read())
+"""
+
+
+class MockGitHubServer:
+    def __init__(self, repos: int = 6, files_per_repo: int = 20, latency: float = 0.05, content_repeat: int = 1):
+        self.repos = repos
+        self.files_per_repo = files_per_repo
+        self.latency = latency
+        self.file_content = (MOCK_FILE_CONTENT * content_repeat).encode()
+        self.request_count = 0
+        self.extra_blobs: Dict[str, Dict[str, Any]] = {}
+        self.graphql_text_paths: List[str] = []
+        self.raw_paths: List[str] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def add_blob(self, path: str, content: bytes = b'', byte_size: Optional[int] = None,
+                 is_binary: bool = False) -> None:
+        self.extra_blobs[path] = {'content': content, 'byteSize': len(content) if byte_size is None else byte_size,
+                                  'isBinary': is_binary}
+
+    def _blob(self, path: str) -> Dict[str, Any]:
+        return self.extra_blobs.get(path) or {'content': self.file_content, 'byteSize': len(self.file_content),
+                                              'isBinary': False}
+
+    def _graphql(self, payload: Dict[str, Any]) -> Tuple[int, bytes]:
+        include_text = ' text ' in payload.get('query', '')
+        repository = {}
+        for name, expression in payload.get('variables', {}).items():
+            if not name.startswith('e'):
+                continue
+            path = expression.split(':', 1)[1]
+            blob = self._blob(path)
+            entry = {'byteSize': blob['byteSize'], 'isBinary': blob['isBinary']}
+            if include_text:
+                with self._lock:
+                    self.graphql_text_paths.append(path)
+                entry.update({'isTruncated': False,
+                              'text': None if blob['isBinary'] else blob['content'].decode('utf-8')})
+            repository[f"f{name[1:]}"] = entry
+        return 200, json.dumps({'data': {'rateLimit': {'cost': 1, 'remaining': 5000},
+                                         'repository': repository}}).encode()
+
+    def _route(self, path: str, query: Dict[str, List[str]]) -> Tuple[int, bytes]:
+        parts = [part for part in path.split('/') if part]
+
+        if path == config.GITHUB_SEARCH_ENDPOINT:
+            per_page = int(query.get('per_page', ['30'])[0])
+            items = [{'id': i, 'name': f"repo{i}", 'full_name': f"{MOCK_OWNER}/repo{i}", 'owner': {'login': MOCK_OWNER}}
+                     for i in range(min(self.repos, per_page))]
+            return 200, json.dumps({'total_count': self.repos, 'items': items}).encode()
+
+        if len(parts) == 3 and parts[0] == 'repos':
+            return 200, json.dumps({'default_branch': 'main', 'size': 10 ** 6}).encode()
+
+        if len(parts) >= 5 and parts[0] == 'repos' and parts[3:5] == ['git', 'trees']:
+            tree = [{'path': f"pkg/module_{i}.py", 'type': 'blob', 'sha': f"{i:040d}",
+                     'size': len(self.file_content)} for i in range(self.files_per_repo)]
+            tree += [{'path': path, 'type': 'blob', 'sha': None, 'size': blob['byteSize']}
+                     for path, blob in self.extra_blobs.items()]
+            return 200, json.dumps({'tree': tree, 'truncated': False}).encode()
+
+        if len(parts) >= 3 and parts[0] == MOCK_OWNER:
+            with self._lock:
+                self.raw_paths.append('/'.join(parts[3:]))
+            return 200, self._blob('/'.join(parts[3:]))['content']
+
+        return 404, b'{}'
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _respond(self, status: int, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                with server._lock:
+                    server.request_count += 1
+                time.sleep(server.latency)
+                parsed = urlparse(self.path)
+                self._respond(*server._route(parsed.path, parse_qs(parsed.query)))
+
+            def do_POST(self) -> None:
+                with server._lock:
+                    server.request_count += 1
+                time.sleep(server.latency)
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                if urlparse(self.path).path != config.GITHUB_GRAPHQL_ENDPOINT:
+                    self._respond(404, b'{}')
+                    return
+                self._respond(*server._graphql(payload))
+
+        return Handler
+
+    def start(self) -> 'MockGitHubServer':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _build_analyzer(server: MockGitHubServer, pool_size: int,
+                    detection_pool: DetectionPool = None, fetch_strategy: str = 'files') -> RepositoryAnalyzer:
+    transport = HTTPTransport(pool_maxsize=pool_size, base_url_overrides={
+        config.GITHUB_API_BASE_URL: server.base_url,
+        config.GITHUB_RAW_BASE_URL: server.base_url,
+    })
+    github_api = GitHubAPI("mock-token", transport=transport)
+    analyzer = RepositoryAnalyzer(github_api, listing_mode='tree', fetch_strategy=fetch_strategy,
+                                  detection_pool=detection_pool)
+    analyzer.max_files = server.files_per_repo
+    analyzer.max_file_size = max(analyzer.max_file_size, len(server.file_content))
+    return analyzer
+
+
+def compare_sync_async(repos: int = 6, files_per_repo: int = 20, latency: float = 0.05,
+                       max_repos_in_flight: int = None, max_files_in_flight: int = None,
+                       detection_workers: int = 0, content_repeat: int = 1) -> Dict[str, Any]:
+    max_repos_in_flight = max_repos_in_flight or config.ASYNC_MAX_REPOS_IN_FLIGHT
+    max_files_in_flight = max_files_in_flight or config.ASYNC_MAX_FILES_IN_FLIGHT
+    detection_pool = DetectionPool(ConfusionAtomDetector(), detection_workers) if detection_workers > 0 else None
+    server = MockGitHubServer(repos, files_per_repo, latency, content_repeat).start()
+    search_kwargs = {'query': 'mock', 'languages': ['python'], 'max_repos': repos}
+    measurements = {}
+
+    try:
+        pools = {'': None}
+        if detection_pool is not None:
+            pools['_pool'] = detection_pool
+
+        for suffix, pool in pools.items():
+            analyzer = _build_analyzer(server, pool_size=1, detection_pool=pool)
+            start = time.perf_counter()
+            sync_results = analyzer.find_repositories_with_confusion(**search_kwargs)
+            measurements[f"sync{suffix}"] = (time.perf_counter() - start, sync_results)
+
+            analyzer = _build_analyzer(server, pool_size=max_repos_in_flight * max_files_in_flight,
+                                       detection_pool=pool)
+            start = time.perf_counter()
+            async_results = run_async(
+                lambda async_analyzer: async_analyzer.find_repositories_with_confusion(**search_kwargs),
+                analyzer, max_repos_in_flight, max_files_in_flight)
+            measurements[f"async{suffix}"] = (time.perf_counter() - start, async_results)
+    finally:
+        server.stop()
+        if detection_pool is not None:
+            detection_pool.close()
+
+    report = {'repos': repos, 'files_per_repo': files_per_repo, 'latency': latency,
+              'max_repos_in_flight': max_repos_in_flight, 'max_files_in_flight': max_files_in_flight,
+              'detection_workers': detection_workers, 'content_repeat': content_repeat}
+    for mode, (elapsed, results) in measurements.items():
+        files = sum(result['files_analyzed'] for result in results)
+        report[mode] = {
+            'seconds': round(elapsed, 3),
+            'files_analyzed': files,
+            'confusion_patterns': sum(result['total_confusion_patterns'] for result in results),
+            'files_per_second': round(files / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+    report['speedup'] = round(report['sync']['seconds'] / report['async']['seconds'], 2) \
+        if report['async']['seconds'] > 0 else 0.0
+    return report
+
+
+def _unsized_file_infos(analyzer: RepositoryAnalyzer, paths: List[str]) -> List[Dict[str, Any]]:
+    return [analyzer._tree_entry_to_file_info(MOCK_OWNER, 'repo0', 'main', {'path': path, 'type': 'blob'})
+            for path in paths]
+
+
+def check_graphql_metadata_filter() -> Dict[str, Any]:
+    server = MockGitHubServer(repos=1, files_per_repo=2, latency=0.0).start()
+    try:
+        analyzer = _build_analyzer(server, pool_size=1, fetch_strategy='graphql')
+        server.add_blob('pkg/logo.py', b'\x89PNG\r\n', is_binary=True)
+        server.add_blob('pkg/dump.py', byte_size=max(analyzer.max_file_size, analyzer.large_file_max_size) + 1)
+        files = _unsized_file_infos(analyzer, ['pkg/module_0.py', 'pkg/module_1.py', 'pkg/logo.py', 'pkg/dump.py'])
+        analyzed = [file_info['path'] for file_info, _ in analyzer._iter_graphql_files(MOCK_OWNER, 'repo0', 'main', files)]
+    finally:
+        server.stop()
+
+    expected = ['pkg/module_0.py', 'pkg/module_1.py']
+    text_requested = sorted(set(server.graphql_text_paths))
+    return {'analyzed': analyzed, 'text_requested': text_requested,
+            'passed': analyzed == expected and text_requested == expected}
+
+
+def check_changed_file_sizes(fetch_strategy: str) -> Dict[str, Any]:
+    server = MockGitHubServer(repos=1, files_per_repo=1, latency=0.0).start()
+    state_directory = tempfile.TemporaryDirectory()
+    try:
+        analyzer = _build_analyzer(server, pool_size=1, fetch_strategy=fetch_strategy)
+        analyzer.state_store = CrawlStateStore(os.path.join(state_directory.name, 'crawl_state.sqlite3'))
+        analyzer.max_files = 10
+        analyzer.max_file_size = 4 * 1024
+        analyzer.large_file_max_size = 64 * 1024
+        server.add_blob('pkg/big.py', MOCK_FILE_CONTENT.encode() * 40)
+        server.add_blob('pkg/huge.py', byte_size=analyzer.large_file_max_size + 1)
+
+        streamed = []
+        download_file = analyzer.github_api.download_file
+
+        def record_download(url: str):
+            streamed.append(url.rsplit('/', 1)[-1])
+            return download_file(url)
+
+        analyzer.github_api.download_file = record_download
+        file_records = {'pkg/huge.py': {}}
+        changed_files = [{'filename': path, 'status': 'modified', 'sha': None}
+                         for path in ('pkg/module_0.py', 'pkg/big.py', 'pkg/huge.py')]
+        analyzer._scan_changed_files(MOCK_OWNER, 'repo0', 'main', file_records, changed_files)
+        analyzer.state_store.close()
+    finally:
+        server.stop()
+        state_directory.cleanup()
+
+    analyzed = sorted(file_records)
+    downloaded = sorted(set(server.raw_paths + server.graphql_text_paths))
+    return {'analyzed': analyzed, 'downloaded': downloaded, 'streamed': streamed,
+            'passed': analyzed == ['pkg/big.py', 'pkg/module_0.py'] and 'pkg/huge.py' not in downloaded
+            and streamed == ['big.py']}
+
+
+def check_fetch_filters() -> Dict[str, Any]:
+    return {'graphql_metadata_filter': check_graphql_metadata_filter(),
+            'changed_file_sizes_files': check_changed_file_sizes('files'),
+            'changed_file_sizes_graphql': check_changed_file_sizes('graphql')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara o crawler síncrono e assíncrono contra um servidor GitHub local')
+    parser.add_argument('--repos', type=int, default=6, help='Repositórios simulados')
+    parser.add_argument('--files-per-repo', type=int, default=20, help='Arquivos por repositório simulado')
+    parser.add_argument('--latency', type=float, default=0.05, help='Latência artificial por requisição (segundos)')
+    parser.add_argument('--max-repos-in-flight', type=int, default=config.ASYNC_MAX_REPOS_IN_FLIGHT,
+                        help='Repositórios analisados simultaneamente no modo assíncrono')
+    parser.add_argument('--max-files-in-flight', type=int, default=config.ASYNC_MAX_FILES_IN_FLIGHT,
+                        help='Arquivos baixados simultaneamente por repositório no modo assíncrono')
+    parser.add_argument('--detection-workers', type=int, default=0,
+                        help='Também mede os dois modos com um pool de detecção com N processos')
+    parser.add_argument('--content-repeat', type=int, default=1,
+                        help='Repetições do conteúdo simulado por arquivo (aumenta o custo de detecção)')
+    parser.add_argument('--check-fetch-filters', action='store_true',
+                        help='Verifica se arquivos binários ou grandes demais são descartados antes do download')
+    args = parser.parse_args()
+
+    if args.check_fetch_filters:
+        checks = check_fetch_filters()
+        print(json.dumps(checks, indent=4))
+        sys.exit(0 if all(check['passed'] for check in checks.values()) else 1)
+
+    report = compare_sync_async(args.repos, args.files_per_repo, args.latency,
+                                args.max_repos_in_flight, args.max_files_in_flight,
+                                args.detection_workers, args.content_repeat)
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
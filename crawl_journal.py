@@ -0,0 +1,131 @@
+import os
+import json
+import threading
+from typing import Dict, List, Any, Optional
+import config
+from findings import Findings, compact_json
+
+
+class CrawlJournal:
+    def __init__(self, path: Optional[str] = None, resume: bool = False,
+                 parameters: Optional[Dict[str, Any]] = None):
+        self.path = path or config.CRAWL_JOURNAL_PATH
+        self.completed: Dict[str, Dict[str, Any]] = {}
+        self.listings: Dict[str, Dict[str, Any]] = {}
+        self.file_records: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.found_repositories: Dict[str, List[Dict[str, Any]]] = {}
+        self.search_cursors: Dict[str, Dict[str, Any]] = {}
+        self.finished_searches = set()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        if resume and os.path.exists(self.path):
+            self._load()
+            print(f"Retomando crawl: {len(self.completed)} repositórios concluídos, "
+                  f"{sum(len(files) for files in self.file_records.values())} arquivos em andamento")
+            self._file = open(self.path, 'a', encoding='utf-8')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._append({'event': 'crawl_started', 'parameters': parameters}, sync=True)
+
+    def _load(self) -> None:
+        with open(self.path, 'r', encoding='utf-8') as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self._apply(entry)
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        event = entry.get('event')
+        repository = entry.get('repository')
+
+        if event == 'search_page':
+            language = entry['language']
+            self.found_repositories.setdefault(language, []).extend(entry['repos'])
+            if entry['cursor'] is None:
+                self.search_cursors.pop(language, None)
+                self.finished_searches.add(language)
+            else:
+                self.search_cursors[language] = entry['cursor']
+        elif event == 'listing':
+            self.listings[repository] = entry['plan']
+        elif event == 'file':
+            self.file_records.setdefault(repository, {})[entry['path']] = entry['record']
+        elif event == 'repo_done':
+            self.completed[repository] = entry['results']
+            self.listings.pop(repository, None)
+            self.file_records.pop(repository, None)
+
+    def _append(self, entry: Dict[str, Any], sync: bool = False) -> None:
+        line = json.dumps(entry, ensure_ascii=False, default=compact_json)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+
+    def record_search_page(self, language: str, repos: List[Dict[str, Any]],
+                           cursor: Optional[Dict[str, Any]]) -> None:
+        repos = [{
+            'owner': {'login': repo.get('owner', {}).get('login')},
+            'name': repo.get('name'),
+            'stargazers_count': repo.get('stargazers_count', 0),
+            'forks_count': repo.get('forks_count', 0)
+        } for repo in repos]
+        entry = {'event': 'search_page', 'language': language, 'repos': repos, 'cursor': cursor}
+        self._apply(entry)
+        self._append(entry, sync=True)
+
+    def record_listing(self, repository: str, plan: Dict[str, Any]) -> None:
+        entry = {'event': 'listing', 'repository': repository, 'plan': plan}
+        self._apply(entry)
+        self._append(entry)
+
+    def record_file(self, repository: str, path: str, record: Dict[str, Any]) -> None:
+        entry = {'event': 'file', 'repository': repository, 'path': path, 'record': record}
+        self._apply(entry)
+        self._append(entry)
+
+    def record_repo_done(self, results: Dict[str, Any]) -> None:
+        entry = {'event': 'repo_done', 'repository': results['repository'], 'results': results}
+        self._apply(entry)
+        self._append(entry, sync=True)
+
+    def record_crawl_done(self) -> None:
+        self._append({'event': 'crawl_done'}, sync=True)
+
+    def completed_results(self, repository: str) -> Optional[Dict[str, Any]]:
+        results = self.completed.get(repository)
+        if results is not None:
+            for file_entry in results.get('files', []):
+                file_entry['details'] = Findings.load(file_entry['details'])
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def read_journal_state(path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    path = path or config.CRAWL_JOURNAL_PATH
+    if not os.path.exists(path):
+        return None
+
+    state = None
+    with open(path, 'r', encoding='utf-8') as journal_file:
+        for line in journal_file:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if state is None:
+                state = {'parameters': None, 'finished': False}
+            if entry.get('event') == 'crawl_started':
+                state['parameters'] = entry.get('parameters')
+            state['finished'] = entry.get('event') == 'crawl_done'
+    return state
@@ -0,0 +1,62 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Any, Optional
+import config
+from findings import compact_json
+
+
+class CrawlStateStore:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.CRAWL_STATE_PATH
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS repositories (
+                repository TEXT PRIMARY KEY,
+                default_branch TEXT,
+                head_sha TEXT,
+                pushed_at TEXT,
+                pattern_version TEXT,
+                files TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._connection.commit()
+
+    def get(self, repository: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT default_branch, head_sha, pushed_at, pattern_version, files "
+                "FROM repositories WHERE repository = ?", (repository,)).fetchone()
+        if row is None:
+            return None
+        default_branch, head_sha, pushed_at, pattern_version, files = row
+        return {
+            'default_branch': default_branch,
+            'head_sha': head_sha,
+            'pushed_at': pushed_at,
+            'pattern_version': pattern_version,
+            'files': json.loads(files),
+        }
+
+    def save(self, repository: str, state: Dict[str, Any], files: Dict[str, Dict[str, Any]]) -> None:
+        serialized_files = json.dumps(files, ensure_ascii=False, default=compact_json)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO repositories "
+                "(repository, default_branch, head_sha, pushed_at, pattern_version, files, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (repository, state.get('default_branch'), state.get('head_sha'), state.get('pushed_at'),
+                 state.get('pattern_version'), serialized_files, time.time()))
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,71 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, Tuple
+import config
+from findings import Findings
+
+Detection = Tuple[Findings, int, float]
+
+_worker_detector = None
+
+
+def _init_worker(detector: Any) -> None:
+    global _worker_detector
+    _worker_detector = detector
+
+
+def _detect(content: str, language: str) -> Tuple[Detection, Any]:
+    detection = _worker_detector.detect(content, language)
+    return detection, _worker_detector.take_profile()
+
+
+def _detect_file(path: str, language: str) -> Tuple[Detection, Any]:
+    detection = _worker_detector.detect_file(path, language)
+    return detection, _worker_detector.take_profile()
+
+
+class DetectionPool:
+    def __init__(self, detector: Any, workers: Optional[int] = None, queue_size: Optional[int] = None):
+        self.detector = detector
+        self.workers = workers or config.DETECTION_WORKERS or os.cpu_count() or 1
+        self.queue_size = max(queue_size or config.DETECTION_QUEUE_SIZE, self.workers)
+        self.slots = threading.BoundedSemaphore(self.queue_size)
+        self.pool = multiprocessing.Pool(self.workers, initializer=_init_worker, initargs=(detector,))
+
+    def submit(self, content: str, language: str) -> Future:
+        return self._submit(_detect, content, language)
+
+    def submit_file(self, path: str, language: str) -> Future:
+        return self._submit(_detect_file, path, language)
+
+    def _submit(self, function: Callable[[str, str], Tuple[Detection, Any]], argument: str, language: str) -> Future:
+        future = Future()
+        self.slots.acquire()
+
+        def done(result: Tuple[Detection, Any]) -> None:
+            detection, profile = result
+            self.slots.release()
+            if profile:
+                self.detector.merge_profile(profile)
+            future.set_result(detection)
+
+        def failed(error: BaseException) -> None:
+            self.slots.release()
+            future.set_exception(error)
+
+        try:
+            self.pool.apply_async(function, (argument, language), callback=done, error_callback=failed)
+        except Exception:
+            self.slots.release()
+            raise
+        return future
+
+    def close(self) -> None:
+        self.pool.close()
+        self.pool.join()
+
+    def terminate(self) -> None:
+        self.pool.terminate()
+        self.pool.join()
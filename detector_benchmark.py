@@ -0,0 +1,381 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import platform
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Any, Tuple, Optional
+import config
+from github_api import ConfusionAtomDetector
+from local_repository import LocalGitRepository
+from detector_equivalence import SAMPLE_LINES
+from pattern_profile import Profile, profile_rows, format_profile_table
+
+FILLER_WORDS = ['value', 'result', 'items', 'index', 'count', 'buffer', 'handler', 'config', 'response',
+                'total', 'node', 'parent', 'request', 'payload', 'offset', 'cursor', 'entry', 'options']
+
+FILLER_TEMPLATES = {
+    'python': ["{a} = {b}({c})", "{a}.{b}({c}, {d})", "return {a} + {b}", "for {a} in {b}:",
+               "if {a} > {b}:", "# {a} {b} {c}", "{a}[{b}] = {c}.{d}"],
+    'javascript': ["const {a} = {b}({c});", "{a}.{b}({c}, {d});", "return {a} + {b};",
+                   "for (const {a} of {b}) {{", "if ({a} > {b}) {{", "// {a} {b} {c}", "{a}[{b}] = {c}.{d};"],
+    'java': ["int {a} = {b}({c});", "{a}.{b}({c}, {d});", "return {a} + {b};",
+             "for (String {a} : {b}) {{", "if ({a} > {b}) {{", "// {a} {b} {c}", "{a}[{b}] = {c}.{d};"],
+}
+
+PATHOLOGICAL_UNITS = {
+    'python': [("def handler(", "arg=1, "), ("x = ", "a and b "), ("[", "x for x in y if x "),
+               ("# ", "todo hack weird ")],
+    'javascript': [("var s = ", "a==b&&c;"), ("f(", "x, typeof y, "), ("// ", "fixme magic tricky ")],
+    'java': [("if (", "a instanceof B && "), ("String s = \"", "assert volatile "), ("// ", "note: careful ")],
+}
+
+
+def corpus_spec(files_per_language: int = 20, lines_per_file: int = 500, match_density: float = 0.05,
+                line_length: int = 40, max_line_length: int = 160, pathological: float = 0.0005,
+                pathological_length: int = 4000, seed: int = 0,
+                languages: Optional[List[str]] = None) -> Dict[str, Any]:
+    return {
+        'languages': languages or list(config.CONFUSION_PATTERNS.keys()),
+        'files_per_language': files_per_language,
+        'lines_per_file': lines_per_file,
+        'match_density': match_density,
+        'line_length': line_length,
+        'max_line_length': max_line_length,
+        'pathological': pathological,
+        'pathological_length': pathological_length,
+        'seed': seed,
+    }
+
+
+def _filler_line(rng: random.Random, language: str, target_length: int) -> str:
+    parts = []
+    length = 0
+    while length < target_length:
+        words = {key: rng.choice(FILLER_WORDS) for key in 'abcd'}
+        part = rng.choice(FILLER_TEMPLATES[language]).format(**words)
+        parts.append(part)
+        length += len(part) + 1
+    return ' '.join(parts)
+
+
+def _pathological_line(rng: random.Random, language: str, length: int) -> str:
+    prefix, unit = rng.choice(PATHOLOGICAL_UNITS[language])
+    return prefix + unit * max(1, (length - len(prefix)) // len(unit))
+
+
+def generate_file(rng: random.Random, language: str, spec: Dict[str, Any]) -> str:
+    sigma = 0.6
+    mu = math.log(max(spec['line_length'], 1)) - sigma ** 2 / 2
+    lines = []
+
+    for _ in range(spec['lines_per_file']):
+        roll = rng.random()
+        if roll < spec['pathological']:
+            line = _pathological_line(rng, language, spec['pathological_length'])
+        elif roll < spec['pathological'] + spec['match_density']:
+            line = rng.choice(SAMPLE_LINES[language])
+        else:
+            target_length = min(int(rng.lognormvariate(mu, sigma)), spec['max_line_length'])
+            line = _filler_line(rng, language, target_length)
+        lines.append(' ' * (4 * rng.randint(0, 3)) + line)
+
+    return '\n'.join(lines) + '\n'
+
+
+def local_corpus_spec(path: str, ref: str, languages: List[str]) -> Dict[str, Any]:
+    with LocalGitRepository(path) as local_repo:
+        return {'local_repo': local_repo.path, 'ref': local_repo.resolve(ref), 'languages': languages}
+
+
+def load_local_corpus(spec: Dict[str, Any]) -> Dict[str, List[str]]:
+    detector = ConfusionAtomDetector()
+    corpus = {language: [] for language in spec['languages']}
+    with LocalGitRepository(spec['local_repo']) as local_repo:
+        entries = [(entry, detector.detect_language_from_extension(entry['path']))
+                   for entry in local_repo.list_files(spec['ref'])]
+        entries = [(entry, language) for entry, language in entries if language in corpus]
+        blobs = local_repo.iter_blobs(entry['sha'] for entry, _ in entries)
+        for (_, data), (_, language) in zip(blobs, entries):
+            if data:
+                corpus[language].append(data.decode('utf-8', errors='replace'))
+    return {language: files for language, files in corpus.items() if files}
+
+
+def generate_corpus(spec: Dict[str, Any]) -> Dict[str, List[str]]:
+    if spec.get('local_repo'):
+        return load_local_corpus(spec)
+    corpus = {}
+    for language in spec['languages']:
+        rng = random.Random(f"{spec['seed']}:{language}")
+        corpus[language] = [generate_file(rng, language, spec) for _ in range(spec['files_per_language'])]
+    return corpus
+
+
+def _throughput(lines: int, size: int, seconds: float) -> Dict[str, float]:
+    return {
+        'seconds': round(seconds, 4),
+        'lines_per_second': round(lines / seconds, 1) if seconds else 0.0,
+        'mb_per_second': round(size / 1024 / 1024 / seconds, 3) if seconds else 0.0,
+    }
+
+
+def run_benchmark(corpus: Dict[str, List[str]], detector: ConfusionAtomDetector,
+                  repeat: int = 3) -> Dict[str, Any]:
+    languages = {}
+    totals = {'files': 0, 'lines': 0, 'bytes': 0, 'findings': 0, 'seconds': 0.0}
+
+    for language, files in corpus.items():
+        best = float('inf')
+        findings = 0
+        score = 0.0
+        for _ in range(repeat):
+            findings = 0
+            score = 0.0
+            start = time.perf_counter()
+            for content in files:
+                confusion_results, _, confusion_score = detector.detect(content, language)
+                findings += len(confusion_results)
+                score += confusion_score
+            best = min(best, time.perf_counter() - start)
+
+        lines = sum(content.count('\n') + 1 for content in files)
+        size = sum(len(content.encode('utf-8')) for content in files)
+        languages[language] = {
+            'files': len(files),
+            'lines': lines,
+            'bytes': size,
+            'findings': findings,
+            'average_confusion_score': round(score / len(files), 4) if files else 0.0,
+        }
+        languages[language].update(_throughput(lines, size, best))
+
+        totals['files'] += len(files)
+        totals['lines'] += lines
+        totals['bytes'] += size
+        totals['findings'] += findings
+        totals['seconds'] += best
+
+    totals.update(_throughput(totals['lines'], totals['bytes'], totals['seconds']))
+    return {'languages': languages, 'total': totals}
+
+
+def benchmark_report(spec: Dict[str, Any], repeat: int = 3,
+                     detector: Optional[ConfusionAtomDetector] = None) -> Dict[str, Any]:
+    detector = detector or ConfusionAtomDetector()
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'pattern_version': detector.pattern_version,
+        'pattern_counts': {language: len(patterns) for language, patterns in detector.patterns.items()},
+        'comment_pattern_count': len(detector.comment_patterns),
+        'detector': {
+            'scan_mode': detector.scan_mode,
+            'literal_prefilter': detector.use_prefilter,
+            'lexer_mask': detector.use_lexer_mask,
+            'python_lexer': config.PYTHON_LEXER,
+            'python_ast': detector.use_python_ast,
+        },
+        'corpus': spec,
+        'repeat': repeat,
+    }
+    report.update(run_benchmark(generate_corpus(spec), detector, repeat))
+    return report
+
+
+def profile_corpus(corpus: Dict[str, List[str]]) -> Profile:
+    detector = ConfusionAtomDetector(profile_patterns=True)
+    for language, files in corpus.items():
+        for content in files:
+            detector.detect(content, language)
+    return detector.take_profile()
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    if baseline.get('corpus') != current.get('corpus'):
+        print("Aviso: o corpus da linha de base tem parâmetros diferentes; a comparação pode não ser válida")
+
+    sections = [(language, baseline['languages'].get(language), stats)
+                for language, stats in current['languages'].items()]
+    sections.append(('total', baseline.get('total'), current['total']))
+
+    for name, before, after in sections:
+        if not before or not before.get('lines_per_second'):
+            continue
+        change = after['lines_per_second'] / before['lines_per_second'] - 1
+        print(f"  {name:<11} {before['lines_per_second']:>12,.0f} -> {after['lines_per_second']:>12,.0f} linhas/s "
+              f"({change:+.1%})")
+        if before.get('findings') != after['findings']:
+            print(f"  {'':<11} ocorrências: {before.get('findings')} -> {after['findings']}")
+        if change < -threshold:
+            regressions.append(f"{name}: {change:+.1%} em linhas/s (limite -{threshold:.0%})")
+
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"{'linguagem':<11} {'arquivos':>8} {'linhas':>9} {'MB':>7} {'segundos':>9} "
+          f"{'linhas/s':>12} {'MB/s':>7} {'ocorrências':>11}")
+    rows = list(report['languages'].items()) + [('total', report['total'])]
+    for name, stats in rows:
+        print(f"{name:<11} {stats['files']:>8} {stats['lines']:>9} {stats['bytes'] / 1024 / 1024:>7.2f} "
+              f"{stats['seconds']:>9.3f} {stats['lines_per_second']:>12,.0f} {stats['mb_per_second']:>7.2f} "
+              f"{stats['findings']:>11}")
+
+
+def load_python_sources(paths: List[str]) -> List[str]:
+    sources = []
+    for root in paths:
+        for directory, _, filenames in os.walk(root):
+            for filename in sorted(filenames):
+                if not filename.endswith('.py'):
+                    continue
+                try:
+                    with open(os.path.join(directory, filename), 'r', encoding='utf-8') as source_file:
+                        sources.append(source_file.read())
+                except (OSError, UnicodeDecodeError):
+                    continue
+    return sources
+
+
+def build_large_file(sources: List[str], target_lines: int) -> str:
+    parts = []
+    line_count = 0
+    while line_count < target_lines and sources:
+        for source in sources:
+            parts.append(source.rstrip('\n'))
+            line_count += source.count('\n') + 1
+            if line_count >= target_lines:
+                break
+    return '\n'.join(parts) + '\n'
+
+
+def time_detector(detector: ConfusionAtomDetector, content: str, language: str,
+                  repeat: int) -> Tuple[float, List[Dict[str, Any]]]:
+    best = float('inf')
+    results = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = detector.has_confusion_patterns(content, language)
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def compare_python_ast(content: str, repeat: int = 3) -> Dict[str, Any]:
+    detectors = {
+        'regex': ConfusionAtomDetector(use_python_ast=False),
+        'ast': ConfusionAtomDetector(use_python_ast=True),
+    }
+    line_count = content.count('\n') + 1
+    report = {'lines': line_count, 'bytes': len(content.encode('utf-8')), 'modes': {}}
+
+    for mode, detector in detectors.items():
+        seconds, results = time_detector(detector, content, 'python', repeat)
+        report['modes'][mode] = {
+            'seconds': seconds,
+            'lines_per_second': line_count / seconds if seconds else 0.0,
+            'findings': len(results),
+            'by_pattern': Counter(result['pattern'] for result in results if result['type'] == 'confusion_pattern'),
+        }
+
+    return report
+
+
+def run_ast_comparison(paths: List[str], sizes: List[int], repeat: int) -> None:
+    sources = load_python_sources(paths) if paths else generate_corpus(corpus_spec(languages=['python']))['python']
+    if not sources:
+        print("Nenhum arquivo Python encontrado para o benchmark")
+        sys.exit(1)
+
+    for target_lines in sizes:
+        report = compare_python_ast(build_large_file(sources, target_lines), repeat)
+        print(f"\n{report['lines']} linhas ({report['bytes'] / 1024 / 1024:.1f} MB)")
+        for mode, stats in report['modes'].items():
+            print(f"  {mode:<6} {stats['seconds']:>8.3f}s {stats['lines_per_second']:>12,.0f} linhas/s "
+                  f"{stats['findings']:>8} ocorrências")
+
+        regex_counts = report['modes']['regex']['by_pattern']
+        ast_counts = report['modes']['ast']['by_pattern']
+        for pattern in sorted(set(regex_counts) | set(ast_counts)):
+            if regex_counts[pattern] != ast_counts[pattern]:
+                print(f"    {regex_counts[pattern]:>7} regex {ast_counts[pattern]:>7} ast  {pattern}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do detector de átomos de confusão sobre um corpus '
+                                                 'sintético reprodutível (não acessa a rede)')
+    parser.add_argument('--languages', type=str, nargs='+', default=list(config.CONFUSION_PATTERNS.keys()),
+                        choices=list(config.CONFUSION_PATTERNS.keys()))
+    parser.add_argument('--files-per-language', type=int, default=20)
+    parser.add_argument('--lines-per-file', type=int, default=500)
+    parser.add_argument('--match-density', type=float, default=0.05,
+                        help='Fração das linhas com átomos de confusão ou comentários suspeitos')
+    parser.add_argument('--line-length', type=int, default=40, help='Comprimento médio das linhas comuns')
+    parser.add_argument('--max-line-length', type=int, default=160, help='Comprimento máximo das linhas comuns')
+    parser.add_argument('--pathological', type=float, default=0.0005,
+                        help='Fração de linhas patológicas (muito longas e propensas a backtracking)')
+    parser.add_argument('--pathological-length', type=int, default=4000,
+                        help='Comprimento das linhas patológicas')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help='Repetições por linguagem (vale a melhor)')
+    parser.add_argument('--output', type=str,
+                        help='Arquivo JSON com os resultados (padrão: benchmarks/detector_<data>.json)')
+    parser.add_argument('--baseline', type=str, help='Resultado JSON anterior para a verificação de regressão')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='Queda máxima tolerada em linhas/s em relação à linha de base')
+    parser.add_argument('--compare-ast', type=str, nargs='*', metavar='PATH',
+                        help='Compara o detector por regex com o detector estrutural (ast) em arquivos Python '
+                             'grandes montados a partir dos diretórios informados (ou do corpus sintético)')
+    parser.add_argument('--ast-lines', type=int, nargs='+', default=[10000, 100000],
+                        help='Tamanhos (em linhas) dos arquivos da comparação com o detector ast')
+    parser.add_argument('--local-repo', type=str, metavar='PATH',
+                        help='Usa os arquivos de um clone local (working tree ou bare) no lugar do corpus sintético')
+    parser.add_argument('--local-ref', type=str, default='HEAD', help='Referência lida do clone local')
+    parser.add_argument('--profile-patterns', action='store_true',
+                        help='Após a medição, varre o corpus com o perfil por padrão e inclui a tabela no resultado')
+    args = parser.parse_args()
+
+    if args.compare_ast is not None:
+        run_ast_comparison(args.compare_ast, args.ast_lines, args.repeat)
+        return
+
+    if args.local_repo:
+        spec = local_corpus_spec(args.local_repo, args.local_ref, args.languages)
+    else:
+        spec = corpus_spec(args.files_per_language, args.lines_per_file, args.match_density, args.line_length,
+                           args.max_line_length, args.pathological, args.pathological_length, args.seed,
+                           args.languages)
+    report = benchmark_report(spec, args.repeat)
+    print_report(report)
+
+    if args.profile_patterns:
+        report['pattern_profile'] = profile_corpus(generate_corpus(spec))
+        print("\nCusto por padrão:")
+        print(format_profile_table(profile_rows(report['pattern_profile']), top=20))
+
+    output = args.output or os.path.join('benchmarks', f"detector_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    directory = os.path.dirname(output)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(output, 'w', encoding='utf-8') as output_file:
+        json.dump(report, output_file, indent=4, ensure_ascii=False)
+    print(f"Resultados salvos em: {output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        print(f"\nComparação com {args.baseline}:")
+        regressions = compare_reports(baseline, report, args.threshold)
+        for regression in regressions:
+            print(f"Regressão de desempenho: {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+import os
+import re
+import sys
+import time
+import random
+import argparse
+from typing import Dict, List, Any, Iterator, Tuple, Optional
+import config
+from github_api import ConfusionAtomDetector
+from linear_patterns import GappedPattern, linear_pattern
+
+SAMPLE_LINES = {
+    "python": [
+        "result = [x for x in items if x for y in x]",
+        "value = eval(expression)",
+        "exec(code, namespace)",
+        "f = lambda x: (lambda y: x + y)",
+        "class Meta(type): __slots__ = ('a',)",
+        "def handler(self, items=[], mapping={}):",
+        "if a and b or c:",
+        "if value is not None and other is flag:",
+        "setattr(obj, name, value)",
+        "getattr(obj, name)",
+        "globals().update(values)",
+        "del cache[key]",
+        "nonlocal counter",
+        "def __getattr__(self, name):",
+        "    return self.__dict__[name]",
+        "# TODO: this is a hack, don't touch",
+        "# SECURITY WARNING: keep the secret key used in production secret!",
+        "x = 1  # workaround for weird behaviour",
+        "# Strange: the Kelvin sign folds to k — CAREFUL, don't change",
+        "print('plain line')",
+        "",
+    ],
+    "javascript": [
+        "if (a == b) { return; }",
+        "with (obj) { x = y; }",
+        "var f = new Function('a', 'return a');",
+        "delete obj.key;",
+        "void 0;",
+        "if (typeof x === 'undefined') {}",
+        "i++; j--;",
+        "var flag = !!value;",
+        "var v = a ?? b;",
+        "// FIXME: confusing coercion",
+        "/* magic number below */",
+        "console.log('plain line');",
+        "",
+    ],
+    "java": [
+        "if (obj instanceof String) {}",
+        "assert value != null;",
+        "synchronized (lock) {}",
+        "private volatile int count;",
+        "private transient Object cache;",
+        "Object copy = other.clone();",
+        "protected void finalize() {}",
+        "Class<?> c = Class.forName(name);",
+        "ReflectionUtils.invoke(target);",
+        "static ThreadLocal<Integer> local;",
+        "// NOTE: careful, tricky ordering",
+        "System.out.println(\"plain line\");",
+        "",
+    ],
+}
+
+LINEAR_NOISE = [' ', '  ', 'x', '_', '1', 'é', '\t', '\r', '&', '|', '&&', '||', '.', '=', '"', "'"]
+
+PATHOLOGICAL_UNITS = ['[ for if for ', 'setattr(a, b, ', 'getattr(a ', 'lambda x: lambda ', 'a and b or ',
+                      'eval(( ', 'exec(( ']
+
+
+def reference_confusion_patterns(detector: ConfusionAtomDetector, content: str, language: str) -> List[Dict[str, Any]]:
+    if language not in detector.patterns:
+        return []
+
+    results = []
+    lines = content.split('\n')
+
+    for pattern in detector.patterns.get(language, []):
+        for i, line in enumerate(lines):
+            if not detector.is_comment(line, language):
+                for match in re.finditer(pattern, line):
+                    results.append({
+                        'type': 'confusion_pattern',
+                        'pattern': pattern,
+                        'line_number': i + 1,
+                        'line_content': line.strip(),
+                        'match': match.group(0),
+                        'start_col': match.start(),
+                        'end_col': match.end()
+                    })
+
+    for pattern in detector.comment_patterns:
+        for i, line in enumerate(lines):
+            if any(django_comment in line for django_comment in detector.django_standard_comments):
+                continue
+
+            for match in re.finditer(pattern, line, re.IGNORECASE):
+                results.append({
+                    'type': 'suspicious_comment',
+                    'pattern': pattern,
+                    'line_number': i + 1,
+                    'line_content': line.strip(),
+                    'match': match.group(0),
+                    'start_col': match.start(),
+                    'end_col': match.end()
+                })
+
+    return results
+
+
+def synthetic_corpus(files_per_language: int = 20, lines_per_file: int = 200,
+                     seed: int = 0) -> Iterator[Tuple[str, str, str]]:
+    rng = random.Random(seed)
+    for language, samples in SAMPLE_LINES.items():
+        pool = samples + [token for pattern in config.CONFUSION_PATTERNS[language]
+                          for token in re.findall(r"[A-Za-z_]{3,}", pattern)]
+        for index in range(files_per_language):
+            lines = []
+            for _ in range(lines_per_file):
+                line = rng.choice(pool)
+                if rng.random() < 0.2:
+                    line = f"{' ' * rng.randint(0, 8)}{line} {rng.choice(pool)}"
+                lines.append(line)
+            yield f"synthetic/{language}_{index}", language, '\n'.join(lines)
+
+
+def directory_corpus(detector: ConfusionAtomDetector, root: str) -> Iterator[Tuple[str, str, str]]:
+    for directory, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            language = detector.detect_language_from_extension(filename)
+            if not language:
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                with open(path, 'r', encoding='utf-8', errors='replace') as source_file:
+                    yield path, language, source_file.read()
+            except OSError as e:
+                print(f"Erro ao ler {path}: {str(e)}")
+
+
+def linear_patterns_under_test() -> List[GappedPattern]:
+    patterns = [pattern for language_patterns in config.CONFUSION_PATTERNS.values() for pattern in language_patterns]
+    gapped = [linear_pattern(pattern) for pattern in patterns]
+    gapped.extend(linear_pattern(pattern, re.IGNORECASE) for pattern in config.SUSPICIOUS_COMMENT_PATTERNS)
+    return [pattern for pattern in gapped if pattern is not None]
+
+
+def linear_corpus(patterns: List[GappedPattern], line_count: int, seed: int = 0) -> List[str]:
+    fragments = list(LINEAR_NOISE)
+    for pattern in patterns:
+        for token in re.findall(r"[A-Za-z_]{2,}|[^\\\w\s.*^$+?{}]", pattern.pattern.replace(r'\b', ' ')):
+            fragments.extend([token, f" {token} ", f"{token}("])
+
+    rng = random.Random(seed)
+    lines = []
+    for index in range(line_count):
+        size = rng.randint(0, 400) if index % 50 == 0 else rng.randint(0, 30)
+        lines.append(''.join(rng.choice(fragments) for _ in range(size)))
+    return lines
+
+
+def check_linear_patterns(patterns: List[GappedPattern], lines: List[str]) -> Dict[str, Any]:
+    summary = {'checks': 0, 'matches': 0, 'mismatches': [], 'reference_seconds': 0.0, 'linear_seconds': 0.0}
+
+    for pattern in patterns:
+        for line in lines:
+            start = time.perf_counter()
+            expected = [match.span() for match in pattern.regex.finditer(line)]
+            summary['reference_seconds'] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            actual = [match.span() for match in pattern.finditer(line)]
+            summary['linear_seconds'] += time.perf_counter() - start
+
+            summary['checks'] += 1
+            summary['matches'] += len(expected)
+            if actual != expected:
+                summary['mismatches'].append((pattern.pattern, line))
+
+    return summary
+
+
+def pathological_timings(patterns: List[GappedPattern], max_reference_seconds: float = 0.25) -> List[Dict[str, Any]]:
+    rows = []
+    for pattern in patterns:
+        for unit in PATHOLOGICAL_UNITS:
+            if not any(atoms[0].search(unit) for atoms in pattern.sequences):
+                continue
+            repetitions = 8
+            reference = 0.0
+            while reference < max_reference_seconds and repetitions <= 4096:
+                line = unit * repetitions
+                start = time.perf_counter()
+                expected = [match.span() for match in pattern.regex.finditer(line)]
+                reference = time.perf_counter() - start
+                start = time.perf_counter()
+                actual = [match.span() for match in pattern.finditer(line)]
+                rows.append({'pattern': pattern.pattern, 'unit': unit, 'length': len(line),
+                             'reference_seconds': reference, 'linear_seconds': time.perf_counter() - start,
+                             'equal': actual == expected})
+                repetitions *= 2
+    return rows
+
+
+def check_equivalence(corpus: Iterator[Tuple[str, str, str]],
+                      detector: ConfusionAtomDetector,
+                      masked_detector: Optional[ConfusionAtomDetector] = None) -> Dict[str, Any]:
+    summary = {'files': 0, 'findings': 0, 'mismatches': [], 'reference_seconds': 0.0, 'engine_seconds': 0.0,
+               'masked_findings': 0, 'masked_seconds': 0.0}
+
+    for name, language, content in corpus:
+        start = time.perf_counter()
+        expected = reference_confusion_patterns(detector, content, language)
+        summary['reference_seconds'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = detector.has_confusion_patterns(content, language)
+        summary['engine_seconds'] += time.perf_counter() - start
+
+        summary['files'] += 1
+        summary['findings'] += len(expected)
+        if actual.to_dicts() != expected:
+            summary['mismatches'].append(name)
+
+        if masked_detector is not None:
+            start = time.perf_counter()
+            summary['masked_findings'] += len(masked_detector.has_confusion_patterns(content, language))
+            summary['masked_seconds'] += time.perf_counter() - start
+
+    return summary
+
+
+def prefilter_report(detector: ConfusionAtomDetector) -> List[str]:
+    lines = []
+    for language, sections in sorted(detector.prefilter_stats.items()):
+        for section, stats in sections.items():
+            if not stats.get('pattern_lines'):
+                continue
+            skipped_lines = 1 - stats['candidate_lines'] / stats['lines']
+            skipped_runs = 1 - stats['regex_runs'] / stats['pattern_lines']
+            lines.append(f"  {language:<11} {section:<9} {stats['files']:>6} arquivos "
+                         f"{stats.get('files_skipped', 0):>6} sem candidatos "
+                         f"{skipped_lines:>7.1%} linhas puladas {skipped_runs:>7.1%} execuções de regex evitadas")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verifica se o motor de detecção produz os mesmos resultados '
+                                                 'que a implementação de referência linha a linha')
+    parser.add_argument('paths', nargs='*', help='Diretórios com código-fonte real para comparar')
+    parser.add_argument('--files-per-language', type=int, default=20)
+    parser.add_argument('--lines-per-file', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scan-mode', type=str, choices=['lines', 'buffer', 'all'], default='all',
+                        help='Modo de varredura do detector a verificar')
+    parser.add_argument('--linear-lines', type=int, default=20000,
+                        help='Linhas aleatórias para comparar os padrões lineares com as regex originais (0 desativa)')
+    parser.add_argument('--pathological', action='store_true',
+                        help='Mede regex x versão linear em linhas patológicas de tamanho crescente')
+    args = parser.parse_args()
+
+    scan_modes = ['lines', 'buffer'] if args.scan_mode == 'all' else [args.scan_mode]
+
+    failed = False
+    linear = linear_patterns_under_test()
+    if args.linear_lines > 0 and linear:
+        summary = check_linear_patterns(linear, linear_corpus(linear, args.linear_lines, args.seed))
+        print(f"[linear] {len(linear)} padrões, {summary['checks']} comparações, {summary['matches']} ocorrências, "
+              f"regex {summary['reference_seconds']:.3f}s, linear {summary['linear_seconds']:.3f}s")
+        for pattern, line in summary['mismatches'][:20]:
+            print(f"Divergência em {pattern}: {line!r}")
+        failed = bool(summary['mismatches'])
+    if args.pathological:
+        for row in pathological_timings(linear):
+            print(f"  {row['length']:>7} caracteres  regex {row['reference_seconds'] * 1000:>10.2f}ms  "
+                  f"linear {row['linear_seconds'] * 1000:>8.3f}ms  {'ok' if row['equal'] else 'DIVERGENTE'}  "
+                  f"{row['unit'].strip()!r}  {row['pattern']}")
+            failed = failed or not row['equal']
+
+    for scan_mode in scan_modes:
+        detector = ConfusionAtomDetector(scan_mode=scan_mode, use_lexer_mask=False, max_line_length=0, time_budget=0)
+        masked_detector = None
+        if scan_mode == 'buffer':
+            masked_detector = ConfusionAtomDetector(scan_mode=scan_mode, use_lexer_mask=True,
+                                                    max_line_length=0, time_budget=0)
+        corpora = [synthetic_corpus(args.files_per_language, args.lines_per_file, args.seed)]
+        corpora.extend(directory_corpus(detector, path) for path in args.paths)
+
+        for corpus in corpora:
+            detector.prefilter_stats = {}
+            summary = check_equivalence(corpus, detector, masked_detector)
+            speedup = summary['reference_seconds'] / summary['engine_seconds'] if summary['engine_seconds'] else 0.0
+            print(f"[{scan_mode}] {summary['files']} arquivos, {summary['findings']} ocorrências, "
+                  f"referência {summary['reference_seconds']:.3f}s, motor {summary['engine_seconds']:.3f}s "
+                  f"({speedup:.1f}x)")
+            for line in prefilter_report(detector):
+                print(line)
+            if masked_detector is not None:
+                print(f"  com máscara léxica: {summary['masked_findings']} ocorrências "
+                      f"({summary['findings'] - summary['masked_findings']} em strings ou fora de comentários), "
+                      f"{summary['masked_seconds']:.3f}s")
+            for name in summary['mismatches']:
+                print(f"Divergência em: {name}")
+            failed = failed or bool(summary['mismatches'])
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
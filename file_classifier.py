@@ -0,0 +1,69 @@
+import re
+import fnmatch
+from typing import Dict, List, Optional, Union
+import config
+from large_files import SpooledFile
+
+
+def _compile_globs(patterns: List[str]) -> Optional[re.Pattern]:
+    if not patterns:
+        return None
+    return re.compile('|'.join(f"(?:{fnmatch.translate(pattern)})" for pattern in patterns), re.IGNORECASE)
+
+
+class FileClassifier:
+    def __init__(self, vendored_directories: Optional[List[str]] = None,
+                 generated_file_patterns: Optional[List[str]] = None,
+                 root_build_directories: Optional[List[str]] = None):
+        if vendored_directories is None:
+            vendored_directories = config.VENDORED_DIRECTORIES
+        if root_build_directories is None:
+            root_build_directories = config.ROOT_BUILD_DIRECTORIES
+        if generated_file_patterns is None:
+            generated_file_patterns = config.GENERATED_FILE_PATTERNS
+        self.vendored_directories = {directory.lower() for directory in vendored_directories}
+        self.root_build_directories = {directory.lower() for directory in root_build_directories}
+        self.generated_names = _compile_globs(generated_file_patterns)
+        self.bundle_markers = [marker.lower() for marker in config.BUNDLE_NAME_MARKERS]
+        self.bundle_min_size = config.BUNDLE_NAME_MIN_SIZE_KB * 1024
+        self.generated_markers = config.GENERATED_CODE_MARKERS
+        self.header_lines = config.GENERATED_HEADER_LINES
+        self.minified_line_length = config.MINIFIED_AVERAGE_LINE_LENGTH
+        self.minified_min_size = config.MINIFIED_MIN_SIZE_BYTES
+        self.sample_size = config.FILE_CLASSIFIER_SAMPLE_KB * 1024
+
+    def classify_path(self, path: str, size: int = 0) -> Optional[str]:
+        directories, _, name = path.lower().rpartition('/')
+        if directories:
+            components = directories.split('/')
+            if components[0] in self.root_build_directories or not self.vendored_directories.isdisjoint(components):
+                return 'vendored'
+        if self.generated_names is not None and self.generated_names.match(name):
+            return 'generated_name'
+        if size >= self.bundle_min_size and any(marker in name for marker in self.bundle_markers):
+            return 'bundle_size'
+        return None
+
+    def _sample(self, content: Union[str, SpooledFile]) -> str:
+        if isinstance(content, SpooledFile):
+            with open(content.path, 'rb') as body:
+                return body.read(self.sample_size).decode('utf-8', errors='replace')
+        return content[:self.sample_size]
+
+    def classify_content(self, content: Union[str, SpooledFile]) -> Optional[str]:
+        sample = self._sample(content)
+        header = '\n'.join(sample.split('\n', self.header_lines)[:self.header_lines])
+        if any(marker in header for marker in self.generated_markers):
+            return 'generated_header'
+
+        if len(sample) >= self.minified_min_size:
+            line_count = sample.count('\n') + 1
+            if len(sample) / line_count > self.minified_line_length:
+                return 'minified'
+        return None
+
+
+def merge_skip_counts(target: Dict[str, int], source: Dict[str, int]) -> Dict[str, int]:
+    for reason, count in source.items():
+        target[reason] = target.get(reason, 0) + count
+    return target
@@ -0,0 +1,188 @@
+import threading
+from array import array
+from typing import Dict, List, Any, Iterator, Tuple, Set, Union, Optional
+
+Hit = Tuple[int, str, int, int]
+
+RESULT_TYPES = ('confusion_pattern', 'suspicious_comment')
+RESULT_TYPE_IDS = {result_type: index for index, result_type in enumerate(RESULT_TYPES)}
+
+
+class PatternTable:
+    def __init__(self):
+        self.patterns: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def intern(self, pattern: str) -> int:
+        pattern_id = self.ids.get(pattern)
+        if pattern_id is None:
+            with self._lock:
+                pattern_id = self.ids.get(pattern)
+                if pattern_id is None:
+                    pattern_id = len(self.patterns)
+                    self.patterns.append(pattern)
+                    self.ids[pattern] = pattern_id
+        return pattern_id
+
+    def __getitem__(self, pattern_id: int) -> str:
+        return self.patterns[pattern_id]
+
+
+PATTERN_TABLE = PatternTable()
+
+
+ROW_WIDTH = 5
+
+
+class Findings:
+    __slots__ = ('rows', 'lines', 'truncated')
+
+    def __init__(self):
+        self.rows = array('I')
+        self.lines: Dict[int, str] = {}
+        self.truncated: Optional[str] = None
+
+    def append(self, result_type: str, pattern: str, line_number: int, line: str,
+               start_col: int, end_col: int) -> None:
+        self.rows.extend((RESULT_TYPE_IDS[result_type], PATTERN_TABLE.intern(pattern), line_number, start_col, end_col))
+        self.lines.setdefault(line_number, line)
+
+    def add_hits(self, result_type: str, patterns: List[str], hits: List[List[Hit]]) -> None:
+        type_id = RESULT_TYPE_IDS[result_type]
+        rows = self.rows
+        lines = self.lines
+        for pattern, pattern_hits in zip(patterns, hits):
+            if not pattern_hits:
+                continue
+            pattern_id = PATTERN_TABLE.intern(pattern)
+            for line_number, line, start_col, end_col in pattern_hits:
+                rows.extend((type_id, pattern_id, line_number, start_col, end_col))
+                if line_number not in lines:
+                    lines[line_number] = line
+
+    def extend(self, other: 'Findings', line_offset: int = 0) -> None:
+        rows = other.rows
+        if line_offset:
+            rows = array('I', rows)
+            rows[2::ROW_WIDTH] = array('I', [line_number + line_offset for line_number in rows[2::ROW_WIDTH]])
+        self.rows.extend(rows)
+        self.truncated = self.truncated or other.truncated
+        for line_number, line in other.lines.items():
+            self.lines.setdefault(line_number + line_offset, line)
+
+    def __len__(self) -> int:
+        return len(self.rows) // ROW_WIDTH
+
+    def count(self, result_type: str) -> int:
+        return self.rows[0::ROW_WIDTH].count(RESULT_TYPE_IDS[result_type])
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        rows = self.rows
+        for offset in range(0, len(rows), ROW_WIDTH):
+            type_id, pattern_id, line_number, start_col, end_col = rows[offset:offset + ROW_WIDTH]
+            line = self.lines[line_number]
+            yield {
+                'type': RESULT_TYPES[type_id],
+                'pattern': PATTERN_TABLE[pattern_id],
+                'line_number': line_number,
+                'line_content': line.strip(),
+                'match': line[start_col:end_col],
+                'start_col': start_col,
+                'end_col': end_col
+            }
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    def _local_patterns(self) -> Tuple[List[str], List[int]]:
+        local_ids: Dict[int, int] = {}
+        rows = self.rows.tolist()
+        for offset in range(1, len(rows), ROW_WIDTH):
+            rows[offset] = local_ids.setdefault(rows[offset], len(local_ids))
+        return [PATTERN_TABLE[pattern_id] for pattern_id in local_ids], rows
+
+    def to_json(self) -> Dict[str, Any]:
+        patterns, rows = self._local_patterns()
+        data = {
+            'patterns': patterns,
+            'rows': rows,
+            'lines': [[line_number, line] for line_number, line in self.lines.items()]
+        }
+        if self.truncated:
+            data['truncated'] = self.truncated
+        return data
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> 'Findings':
+        return _rebuild_findings(data['patterns'], data['rows'],
+                                 {line_number: line for line_number, line in data['lines']}, data.get('truncated'))
+
+    @classmethod
+    def from_dicts(cls, results: List[Dict[str, Any]]) -> 'Findings':
+        leads: Dict[int, Set[int]] = {}
+        for result in results:
+            candidates = _legacy_leads(result)
+            previous = leads.get(result['line_number'])
+            leads[result['line_number']] = candidates if previous is None else (previous & candidates) or previous
+
+        findings = cls()
+        for result in results:
+            line_number = result['line_number']
+            line = findings.lines.get(line_number)
+            if line is None:
+                line = ' ' * min(leads[line_number], default=0) + result['line_content']
+            findings.append(result['type'], result['pattern'], line_number, line.ljust(result['end_col']),
+                            result['start_col'], result['end_col'])
+        return findings
+
+    @classmethod
+    def load(cls, value: Union['Findings', Dict[str, Any], List[Dict[str, Any]]]) -> 'Findings':
+        if isinstance(value, Findings):
+            return value
+        if isinstance(value, dict):
+            return cls.from_json(value)
+        return cls.from_dicts(value)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        patterns, rows = self._local_patterns()
+        return _rebuild_findings, (patterns, array('I', rows), self.lines, self.truncated)
+
+
+def _legacy_leads(result: Dict[str, Any]) -> Set[int]:
+    line_content = result['line_content']
+    match = result['match'].strip()
+    if not match:
+        return set()
+    offset = result['start_col'] + result['match'].find(match)
+    leads = set()
+    index = line_content.find(match)
+    while index != -1:
+        if offset >= index:
+            leads.add(offset - index)
+        index = line_content.find(match, index + 1)
+    return leads
+
+
+def _rebuild_findings(patterns: List[str], rows: Union[array, List[int]], lines: Dict[int, str],
+                      truncated: Optional[str] = None) -> Findings:
+    pattern_ids = [PATTERN_TABLE.intern(pattern) for pattern in patterns]
+    findings = Findings()
+    findings.rows = array('I', rows)
+    for offset in range(1, len(findings.rows), ROW_WIDTH):
+        findings.rows[offset] = pattern_ids[findings.rows[offset]]
+    findings.lines = lines
+    findings.truncated = truncated
+    return findings
+
+
+def compact_json(value: Any) -> Any:
+    if isinstance(value, Findings):
+        return value.to_json()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def expanded_json(value: Any) -> Any:
+    if isinstance(value, Findings):
+        return value.to_dicts()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
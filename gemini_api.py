@@ -3,10 +3,12 @@ import time
 import os
 from typing import Dict, List, Any, Optional, Tuple
 import config
+from http_transport import HTTPTransport, get_default_transport
 
 class GeminiAPI:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, transport: Optional[HTTPTransport] = None):
         self.api_key = api_key
+        self.transport = transport or get_default_transport()
         self.model = config.GEMINI_MODEL
         self.base_url = config.GEMINI_API_URL.format(model=self.model)
         self.max_tokens = config.GEMINI_MAX_TOKENS
@@ -41,7 +43,7 @@ class GeminiAPI:
         while current_attempt < self.retry_attempts:
             try:
                 print(f"Enviando requisição para o Gemini...")
-                response = requests.post(url, json=payload, headers=headers, timeout=self.timeout)
+                response = self.transport.post(url, json=payload, headers=headers, timeout=self.timeout)
                 
                 if response.status_code == 200:
                     return response.json()
@@ -2,45 +2,100 @@ import requests
 import time
 import re
 import os
-from typing import Dict, List, Any, Optional, Tuple, Set
-from datetime import datetime
+import json
+import hashlib
+import tarfile
+import threading
+import itertools
+from collections import deque
+from concurrent.futures import Future
+from urllib.parse import quote
+from typing import Dict, List, Any, Optional, Tuple, Set, Iterator, Union, Callable
+from datetime import datetime, date, timedelta
 import config
+from http_transport import HTTPTransport, get_default_transport
+from http_cache import HTTPResponseCache
+from blob_cache import BlobCache, git_blob_sha
+from token_pool import TokenPool
+from crawl_state import CrawlStateStore
+from crawl_journal import CrawlJournal
+from pattern_matcher import CompiledPatternSet, ScanBudget, newline_index
+from source_lexer import lex_spans, masked_views
+from python_ast_detector import PythonAstDetector
+from detection_pool import DetectionPool, Detection
+from findings import Findings
+from local_repository import LocalGitRepository
+from large_files import SpooledFile, spool_stream, iter_windows
+from file_classifier import FileClassifier, merge_skip_counts
+from pattern_profile import Profile, record_run, merge_profiles
+
+CachedFile = Tuple[Dict[str, Any], str, Findings, int]
+FileContent = Union[str, SpooledFile]
 
 class GitHubAPI:
-    def __init__(self, token: str):
-        self.token = token
-        self.headers = {'Authorization': f'token {token}'}
+    def __init__(self, token: Union[str, List[str]], transport: Optional[HTTPTransport] = None,
+                 cache: Optional[HTTPResponseCache] = None):
+        tokens = [token] if isinstance(token, str) else list(token)
+        self.token_pool = TokenPool(tokens)
+        self.token = self.token_pool.tokens[0]
+        self.transport = transport or get_default_transport()
+        self.cache = cache
         self.base_url = config.GITHUB_API_BASE_URL
         self.retry_attempts = config.RETRY_ATTEMPTS
         self.retry_delay = config.RETRY_DELAY
         self.timeout = config.TIMEOUT_SECONDS
     
+    def _auth_headers(self, token: str) -> Dict[str, str]:
+        return {'Authorization': f'token {token}'}
+    
     def _make_request(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return self._request(url, params)[0]
+    
+    def _request(self, url: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Any, Dict[str, str]]:
+        cache_key = None
+        cached = None
+        conditional_headers = {}
+        if self.cache is not None:
+            cache_key = self.cache.make_key(url, params)
+            cached = self.cache.lookup(cache_key)
+            if cached is not None and self.cache.is_fresh(cached, url):
+                return self.cache.record_hit(cache_key, cached), {'Link': cached['link'] or ''}
+            conditional_headers = self.cache.conditional_headers(cached)
+        
+        resource = self.token_pool.resource_for_url(url)
+        
         current_attempt = 0
         while current_attempt < self.retry_attempts:
+            token = self.token_pool.acquire(resource)
             try:
-                response = requests.get(
+                response = self.transport.get(
                     url, 
-                    headers=self.headers, 
+                    headers={**self._auth_headers(token), **conditional_headers}, 
                     params=params,
                     timeout=self.timeout
                 )
+                self.token_pool.update(token, response.headers, resource)
+                
+                if response.status_code == 304 and cached is not None:
+                    return self.cache.record_revalidated(cache_key, cached), {'Link': cached['link'] or ''}
                 
                 if response.status_code == 403 and 'X-RateLimit-Remaining' in response.headers:
                     remaining = int(response.headers['X-RateLimit-Remaining'])
                     if remaining == 0:
                         reset_time = int(response.headers['X-RateLimit-Reset'])
-                        sleep_time = reset_time - int(time.time()) + 1
-                        if sleep_time > 0:
-                            print(f"Limite de taxa atingido. Aguardando {sleep_time} segundos...")
-                            time.sleep(sleep_time)
+                        if reset_time + 1 > time.time():
+                            self.token_pool.mark_exhausted(token, resource, reset_time + 1)
                             continue
                 
                 if response.status_code == 200:
-                    return response.json()
+                    data = response.json()
+                    if self.cache is not None:
+                        self.cache.record_miss()
+                        self.cache.store(cache_key, response.headers, response.content)
+                    return data, {'Link': response.headers.get('Link', '')}
                 elif response.status_code == 404:
                     print(f"Recurso não encontrado: {url}")
-                    return {}
+                    return {}, {}
                 else:
                     print(f"Erro na requisição: {response.status_code} - {response.text}")
             except requests.RequestException as e:
@@ -52,22 +107,29 @@ class GitHubAPI:
             current_attempt += 1
         
         print(f"Todas as tentativas falharam para: {url}")
-        return {}
+        return {}, {}
+    
+    def refresh_rate_limits(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        url = f"{self.base_url}{config.GITHUB_RATE_LIMIT_ENDPOINT}"
+        for token in self.token_pool.tokens:
+            try:
+                response = self.transport.get(url, headers=self._auth_headers(token), timeout=self.timeout)
+                if response.status_code == 200:
+                    self.token_pool.load_rate_limit(token, response.json())
+            except requests.RequestException as e:
+                print(f"Erro ao consultar limite de taxa: {str(e)}")
+        return self.token_pool.summary()
     
     def check_rate_limit(self) -> Dict[str, Any]:
         url = f"{self.base_url}{config.GITHUB_RATE_LIMIT_ENDPOINT}"
         return self._make_request(url)
     
-    def search_repositories(self, 
-                           query: str, 
+    def build_search_query(self,
+                           query: str,
                            language: Optional[str] = None,
                            min_stars: int = 0,
                            min_forks: int = 0,
-                           last_updated: Optional[str] = None,
-                           page: int = 1,
-                           per_page: int = 30) -> List[Dict[str, Any]]:
-        url = f"{self.base_url}{config.GITHUB_SEARCH_ENDPOINT}"
-        
+                           last_updated: Optional[str] = None) -> str:
         search_query = query
         if language:
             search_query += f" language:{language}"
@@ -77,6 +139,19 @@ class GitHubAPI:
             search_query += f" forks:>={min_forks}"
         if last_updated:
             search_query += f" pushed:>={last_updated}"
+        return search_query
+    
+    def search_repositories(self, 
+                           query: str, 
+                           language: Optional[str] = None,
+                           min_stars: int = 0,
+                           min_forks: int = 0,
+                           last_updated: Optional[str] = None,
+                           page: int = 1,
+                           per_page: int = 30) -> List[Dict[str, Any]]:
+        url = f"{self.base_url}{config.GITHUB_SEARCH_ENDPOINT}"
+        
+        search_query = self.build_search_query(query, language, min_stars, min_forks, last_updated)
         
         params = {
             'q': search_query,
@@ -89,13 +164,239 @@ class GitHubAPI:
         result = self._make_request(url, params)
         return result.get('items', [])
     
+    def _search_page(self, search_query: str, per_page: int) -> Dict[str, Any]:
+        url = f"{self.base_url}{config.GITHUB_SEARCH_ENDPOINT}"
+        return self._make_request(url, {'q': search_query, 'sort': 'stars', 'order': 'desc', 'per_page': per_page})
+    
+    def iter_search_result_pages(self, search_query: str, per_page: int = 100,
+                                 start_url: Optional[str] = None) -> Iterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        url = start_url or f"{self.base_url}{config.GITHUB_SEARCH_ENDPOINT}"
+        params = None if start_url else {'q': search_query, 'sort': 'stars', 'order': 'desc', 'per_page': per_page}
+        
+        while url:
+            result, headers = self._request(url, params)
+            
+            links = requests.utils.parse_header_links(headers.get('Link', '')) if headers.get('Link') else []
+            url = next((link['url'] for link in links if link.get('rel') == 'next'), None)
+            params = None
+            
+            yield result.get('items', []), url
+    
+    def iter_search_pages(self, search_query: str, per_page: int = 100) -> Iterator[Dict[str, Any]]:
+        for items, _ in self.iter_search_result_pages(search_query, per_page):
+            yield from items
+    
+    def _split_search_slice(self, base_query: str, pushed_clause: str,
+                            entry: Dict[str, Any]) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        if 'low' in entry:
+            low, high = entry['low'], entry['high']
+            sliced_query = f"{base_query} stars:{low}..{high}{pushed_clause}"
+        else:
+            start, end = date.fromisoformat(entry['start']), date.fromisoformat(entry['end'])
+            sliced_query = f"{base_query} stars:{entry['stars']} pushed:{start.isoformat()}..{end.isoformat()}"
+        total = self._search_page(sliced_query, 1).get('total_count', 0)
+        
+        if total <= config.GITHUB_SEARCH_RESULT_CAP:
+            return (sliced_query if total else None), []
+        
+        if 'low' in entry:
+            if low >= high:
+                return None, [{'stars': low, 'start': entry['start'], 'end': entry['end']}]
+            middle = (low + high) // 2
+            return None, [dict(entry, high=middle), dict(entry, low=middle + 1)]
+        
+        if start >= end:
+            print(f"Fatia de busca ainda acima do limite ({total} resultados): {sliced_query}")
+            return sliced_query, []
+        middle = start + (end - start) // 2
+        return None, [dict(entry, end=middle.isoformat()), dict(entry, start=(middle + timedelta(days=1)).isoformat())]
+    
+    def plan_search_slices(self,
+                           query: str,
+                           language: Optional[str] = None,
+                           min_stars: int = 0,
+                           min_forks: int = 0,
+                           last_updated: Optional[str] = None,
+                           pending: Optional[List[Dict[str, Any]]] = None) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        if pending is None:
+            full_query = self.build_search_query(query, language, min_stars, min_forks, last_updated)
+            first_page = self._search_page(full_query, 1)
+            if first_page.get('total_count', 0) <= config.GITHUB_SEARCH_RESULT_CAP:
+                yield full_query, []
+                return
+            
+            items = first_page.get('items', [])
+            max_stars = items[0].get('stargazers_count', min_stars) if items else min_stars
+            start = datetime.strptime(last_updated or config.GITHUB_SEARCH_EARLIEST_DATE, "%Y-%m-%d").date()
+            pending = [{'low': min_stars, 'high': max_stars, 'start': start.isoformat(), 'end': date.today().isoformat()}]
+            print(f"Busca dividida em fatias sob demanda para superar o limite de {config.GITHUB_SEARCH_RESULT_CAP} resultados")
+        
+        base_query = self.build_search_query(query, language, 0, min_forks, None)
+        pushed_clause = f" pushed:>={last_updated}" if last_updated else ''
+        pending = list(pending)
+        
+        while pending:
+            sliced_query, parts = self._split_search_slice(base_query, pushed_clause, pending.pop())
+            pending.extend(parts)
+            if sliced_query is not None:
+                yield sliced_query, list(pending)
+    
+    def iter_repositories(self,
+                          query: str,
+                          language: Optional[str] = None,
+                          min_stars: int = 0,
+                          min_forks: int = 0,
+                          last_updated: Optional[str] = None,
+                          max_results: Optional[int] = None,
+                          cursor: Optional[Dict[str, Any]] = None,
+                          on_page: Optional[Callable[[List[Dict[str, Any]], Optional[Dict[str, Any]]], None]] = None) -> Iterator[Dict[str, Any]]:
+        start_url = None
+        if cursor is not None:
+            slices = self.plan_search_slices(query, language, min_stars, min_forks, last_updated, cursor['pending'])
+            if cursor['slice'] is not None:
+                slices = itertools.chain([(cursor['slice'], cursor['pending'])], slices)
+                start_url = cursor.get('next_url')
+        elif max_results is not None and max_results <= config.GITHUB_SEARCH_RESULT_CAP:
+            slices = iter([(self.build_search_query(query, language, min_stars, min_forks, last_updated), [])])
+        else:
+            slices = self.plan_search_slices(query, language, min_stars, min_forks, last_updated)
+        
+        per_page = config.GITHUB_SEARCH_PER_PAGE
+        if max_results is not None:
+            per_page = max(1, min(per_page, max_results))
+        
+        seen = set()
+        yielded = 0
+        for slice_query, pending in slices:
+            pages = self.iter_search_result_pages(slice_query, per_page, start_url)
+            start_url = None
+            
+            for items, next_url in pages:
+                page = []
+                for repository in items:
+                    key = repository.get('id') or repository.get('full_name')
+                    if key not in seen:
+                        seen.add(key)
+                        page.append(repository)
+                
+                if on_page is not None:
+                    if next_url:
+                        next_cursor = {'slice': slice_query, 'next_url': next_url, 'pending': pending}
+                    elif pending:
+                        next_cursor = {'slice': None, 'next_url': None, 'pending': pending}
+                    else:
+                        next_cursor = None
+                    on_page(page, next_cursor)
+                
+                for repository in page:
+                    yield repository
+                    yielded += 1
+                    if max_results is not None and yielded >= max_results:
+                        return
+    
     def get_repo_contents(self, owner: str, repo: str, path: str = '') -> List[Dict[str, Any]]:
         url = f"{self.base_url}/repos/{owner}/{repo}/contents/{path}"
         return self._make_request(url)
     
+    def get_repository(self, owner: str, repo: str) -> Dict[str, Any]:
+        url = f"{self.base_url}{config.GITHUB_REPO_ENDPOINT.format(owner=owner, repo=repo)}"
+        return self._make_request(url)
+    
+    def get_branch_head(self, owner: str, repo: str, branch: str) -> Optional[str]:
+        endpoint = config.GITHUB_REF_ENDPOINT.format(owner=owner, repo=repo, branch=quote(branch, safe='/'))
+        result = self._make_request(f"{self.base_url}{endpoint}")
+        return (result.get('object') or {}).get('sha') if isinstance(result, dict) else None
+    
+    def compare_commits(self, owner: str, repo: str, base: str, head: str) -> Dict[str, Any]:
+        endpoint = config.GITHUB_COMPARE_ENDPOINT.format(owner=owner, repo=repo, base=base, head=head)
+        return self._make_request(f"{self.base_url}{endpoint}")
+    
+    def get_tree(self, owner: str, repo: str, tree_sha: str, recursive: bool = False) -> Dict[str, Any]:
+        endpoint = config.GITHUB_TREES_ENDPOINT.format(owner=owner, repo=repo, tree_sha=quote(tree_sha, safe=''))
+        url = f"{self.base_url}{endpoint}"
+        params = {'recursive': 1} if recursive else None
+        return self._make_request(url, params)
+    
+    def get_archive_stream(self, owner: str, repo: str, ref: str = '') -> Optional[requests.Response]:
+        endpoint = config.GITHUB_TARBALL_ENDPOINT.format(owner=owner, repo=repo, ref=quote(ref, safe=''))
+        url = f"{self.base_url}{endpoint}".rstrip('/')
+        try:
+            token = self.token_pool.acquire('core')
+            response = self.transport.get(url, headers=self._auth_headers(token), timeout=self.timeout, stream=True)
+            self.token_pool.update(token, response.headers, 'core')
+            if response.status_code == 200:
+                return response
+            print(f"Erro ao obter arquivo compactado: {response.status_code}")
+            response.close()
+        except requests.RequestException as e:
+            print(f"Erro ao obter arquivo compactado: {str(e)}")
+        return None
+    
+    def graphql(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        url = f"{self.base_url}{config.GITHUB_GRAPHQL_ENDPOINT}"
+        payload = {'query': query, 'variables': variables or {}}
+        
+        current_attempt = 0
+        while current_attempt < self.retry_attempts:
+            token = self.token_pool.acquire('graphql')
+            try:
+                response = self.transport.post(url, json=payload, headers=self._auth_headers(token),
+                                               timeout=self.timeout)
+                self.token_pool.update(token, response.headers, 'graphql')
+                
+                if response.status_code == 403 and response.headers.get('X-RateLimit-Remaining') == '0':
+                    self.token_pool.mark_exhausted(token, 'graphql', int(response.headers['X-RateLimit-Reset']) + 1)
+                    continue
+                
+                if response.status_code == 200:
+                    return response.json()
+                else:
+                    print(f"Erro na requisição GraphQL: {response.status_code} - {response.text}")
+            except requests.RequestException as e:
+                print(f"Erro de requisição GraphQL: {str(e)}")
+            
+            sleep_time = self.retry_delay * (2 ** current_attempt)
+            print(f"Tentativa {current_attempt + 1} falhou. Aguardando {sleep_time} segundos...")
+            time.sleep(sleep_time)
+            current_attempt += 1
+        
+        print("Todas as tentativas falharam para a API GraphQL")
+        return {}
+    
+    def get_blobs_batch(self, owner: str, repo: str, ref: str, paths: List[str],
+                        include_text: bool = True) -> Tuple[Dict[str, Optional[Dict[str, Any]]], Dict[str, Any]]:
+        blob_fields = 'byteSize isBinary isTruncated text' if include_text else 'byteSize isBinary'
+        declarations = ['$owner: String!', '$name: String!']
+        selections = []
+        variables = {'owner': owner, 'name': repo}
+        
+        for index, path in enumerate(paths):
+            declarations.append(f'$e{index}: String!')
+            selections.append(f'f{index}: object(expression: $e{index}) {{ ... on Blob {{ {blob_fields} }} }}')
+            variables[f'e{index}'] = f"{ref or 'HEAD'}:{path}"
+        
+        query = (f"query({', '.join(declarations)}) {{ rateLimit {{ cost remaining }} "
+                 f"repository(owner: $owner, name: $name) {{ {' '.join(selections)} }} }}")
+        
+        response = self.graphql(query, variables)
+        data = response.get('data') or {}
+        repository = data.get('repository') or {}
+        
+        blobs = {path: repository.get(f'f{index}') for index, path in enumerate(paths)}
+        metadata = {'rate_limit': data.get('rateLimit') or {}, 'errors': response.get('errors', []),
+                    'failed': not data}
+        return blobs, metadata
+    
+    def _get_file(self, file_url: str, stream: bool = False) -> requests.Response:
+        resource = self.token_pool.resource_for_url(file_url)
+        token = self.token_pool.acquire(resource)
+        response = self.transport.get(file_url, headers=self._auth_headers(token), timeout=self.timeout, stream=stream)
+        self.token_pool.update(token, response.headers, resource)
+        return response
+    
     def get_file_content(self, file_url: str) -> Tuple[str, bool]:
         try:
-            response = requests.get(file_url, timeout=self.timeout)
+            response = self._get_file(file_url)
             if response.status_code == 200:
                 return response.text, True
             else:
@@ -104,14 +405,75 @@ class GitHubAPI:
         except requests.RequestException as e:
             print(f"Erro ao obter conteúdo do arquivo: {str(e)}")
             return "", False
+    
+    def download_file(self, file_url: str) -> Tuple[Optional[SpooledFile], bool]:
+        try:
+            response = self._get_file(file_url, stream=True)
+        except requests.RequestException as e:
+            print(f"Erro ao obter conteúdo do arquivo: {str(e)}")
+            return None, False
+        
+        try:
+            if response.status_code != 200:
+                print(f"Erro ao obter conteúdo do arquivo: {response.status_code}")
+                return None, False
+            
+            spooled = SpooledFile()
+            try:
+                for chunk in response.iter_content(config.LARGE_FILE_CHUNK_KB * 1024):
+                    spooled.write(chunk)
+            except requests.RequestException as e:
+                spooled.remove()
+                print(f"Erro ao obter conteúdo do arquivo: {str(e)}")
+                return None, False
+            return spooled.finish(), True
+        finally:
+            response.close()
 
 
 class ConfusionAtomDetector:
-    def __init__(self):
+    def __init__(self, scan_mode: Optional[str] = None, use_prefilter: Optional[bool] = None,
+                 use_lexer_mask: Optional[bool] = None, use_python_ast: Optional[bool] = None,
+                 profile_patterns: Optional[bool] = None, linear_patterns: Optional[bool] = None,
+                 max_line_length: Optional[int] = None, time_budget: Optional[float] = None):
+        self.scan_mode = scan_mode or config.DETECTOR_SCAN_MODE
+        self.use_prefilter = use_prefilter if use_prefilter is not None else config.DETECTOR_LITERAL_PREFILTER
+        self.use_lexer_mask = use_lexer_mask if use_lexer_mask is not None else config.DETECTOR_LEXER_MASK
+        self.use_python_ast = use_python_ast if use_python_ast is not None else config.PYTHON_AST_DETECTOR
+        self.linear_patterns = linear_patterns if linear_patterns is not None else config.DETECTOR_LINEAR_PATTERNS
+        self.max_line_length = max_line_length if max_line_length is not None else config.DETECTOR_MAX_LINE_LENGTH
+        self.time_budget = time_budget if time_budget is not None else config.DETECTOR_FILE_TIME_BUDGET
+        self.prefilter_stats: Dict[str, Dict[str, Dict[str, int]]] = {}
+        if profile_patterns is None:
+            profile_patterns = config.DETECTOR_PATTERN_PROFILE
+        self.pattern_profile: Optional[Profile] = {} if profile_patterns else None
         self.patterns = config.CONFUSION_PATTERNS
         self.comment_patterns = config.SUSPICIOUS_COMMENT_PATTERNS
         self.django_standard_comments = getattr(config, 'DJANGO_STANDARD_COMMENTS', [])
         self.language_extensions = config.LANGUAGE_EXTENSIONS
+        self.pattern_version = self._compute_pattern_version()
+        self.matchers = {language: CompiledPatternSet(patterns, linear=self.linear_patterns)
+                         for language, patterns in self.patterns.items()}
+        self.comment_matcher = CompiledPatternSet(self.comment_patterns, re.IGNORECASE, linear=self.linear_patterns)
+        self.python_ast = None
+        self.python_ast_residual = None
+        if self.use_python_ast and 'python' in self.patterns:
+            self.python_ast = PythonAstDetector(self.patterns['python'])
+            self.python_ast_residual = CompiledPatternSet([pattern for pattern in self.patterns['python']
+                                                           if pattern not in self.python_ast.patterns],
+                                                          linear=self.linear_patterns)
+    
+    def _compute_pattern_version(self) -> str:
+        signature = json.dumps({
+            'patterns': self.patterns,
+            'comment_patterns': self.comment_patterns,
+            'django_standard_comments': self.django_standard_comments,
+            'lexer_mask': config.PYTHON_LEXER if self.use_lexer_mask and self.scan_mode == 'buffer' else None,
+            'python_ast': self.use_python_ast and self.scan_mode == 'buffer',
+            'findings_format': 'columnar',
+            'scan_guard': [self.max_line_length, self.time_budget],
+        }, sort_keys=True)
+        return hashlib.sha1(signature.encode('utf-8')).hexdigest()
     
     def detect_language_from_extension(self, filename: str) -> Optional[str]:
         _, ext = os.path.splitext(filename.lower())
@@ -123,57 +485,93 @@ class ConfusionAtomDetector:
         return None
     
     def is_comment(self, line: str, language: str) -> bool:
+        stripped = line.strip()
         if language == 'python':
-            return line.strip().startswith('#')
+            return stripped.startswith('#')
         elif language == 'java':
-            return line.strip().startswith('//') or line.strip().startswith('/*')
+            return stripped.startswith(('//', '/*'))
         elif language == 'javascript':
-            return line.strip().startswith('//') or line.strip().startswith('/*')
+            return stripped.startswith(('//', '/*'))
         else:
             return False
     
-    def has_confusion_patterns(self, content: str, language: str) -> List[Dict[str, Any]]:
+    def is_django_standard_comment(self, line: str) -> bool:
+        return any(django_comment in line for django_comment in self.django_standard_comments)
+    
+    def _python_ast_patterns(self, content: str, code_view: str, line_starts: List[int],
+                             is_code_comment: Optional[Callable[[str], bool]],
+                             stats: Dict[str, int],
+                             profile: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None,
+                             budget: Optional[ScanBudget] = None) -> Optional[Findings]:
+        started = time.perf_counter()
+        hits = self.python_ast.detect(content, line_starts)
+        if profile is not None:
+            record_run(profile.setdefault('ast', {}), 'python_ast', time.perf_counter() - started,
+                       sum(len(pattern_hits) for pattern_hits in (hits or {}).values()))
+        if hits is None:
+            return None
+        
+        residual = self.python_ast_residual.find_buffer(code_view, line_starts, is_code_comment,
+                                                        self.use_prefilter, stats, source=content,
+                                                        profile=profile['code'] if profile is not None else None,
+                                                        budget=budget)
+        hits.update(zip(self.python_ast_residual.patterns, residual))
+        
+        results = Findings()
+        patterns = self.patterns['python']
+        results.add_hits('confusion_pattern', patterns, [hits.get(pattern, []) for pattern in patterns])
+        return results
+    
+    def _scan_budget(self, scale: float = 1.0) -> Optional[ScanBudget]:
+        if not self.max_line_length and not self.time_budget:
+            return None
+        return ScanBudget(self.max_line_length, self.time_budget * scale)
+    
+    def has_confusion_patterns(self, content: str, language: str,
+                               profile: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None,
+                               budget: Optional[ScanBudget] = None, structural: bool = True) -> Findings:
         if language not in self.patterns:
-            return []
-        
-        results = []
-        lines = content.split('\n')
-        
-        for pattern in self.patterns.get(language, []):
-            for i, line in enumerate(lines):
-                if not self.is_comment(line, language):
-                    matches = re.finditer(pattern, line)
-                    for match in matches:
-                        results.append({
-                            'type': 'confusion_pattern',
-                            'pattern': pattern,
-                            'line_number': i + 1,
-                            'line_content': line.strip(),
-                            'match': match.group(0),
-                            'start_col': match.start(),
-                            'end_col': match.end()
-                        })
-        
-        for pattern in self.comment_patterns:
-            for i, line in enumerate(lines):
-                if any(django_comment in line for django_comment in self.django_standard_comments):
-                    continue
-                
-                matches = re.finditer(pattern, line, re.IGNORECASE)
-                for match in matches:
-                    results.append({
-                        'type': 'suspicious_comment',
-                        'pattern': pattern,
-                        'line_number': i + 1,
-                        'line_content': line.strip(),
-                        'match': match.group(0),
-                        'start_col': match.start(),
-                        'end_col': match.end()
-                    })
+            return Findings()
+        
+        is_code_comment = lambda line: self.is_comment(line, language)
+        code_profile = profile.setdefault('code', {}) if profile is not None else None
+        comment_profile = profile.setdefault('comments', {}) if profile is not None else None
+        if budget is None:
+            budget = self._scan_budget()
+        
+        if self.scan_mode == 'lines':
+            lines = content.split('\n')
+            results = self.matchers[language].scan_lines(lines, 'confusion_pattern', is_code_comment, code_profile,
+                                                         budget)
+            results.extend(self.comment_matcher.scan_lines(lines, 'suspicious_comment',
+                                                           self.is_django_standard_comment, comment_profile, budget))
+            results.truncated = budget.truncated if budget is not None else None
+            return results
         
+        stats = self.prefilter_stats.setdefault(language, {'code': {}, 'comments': {}})
+        line_starts = newline_index(content)
+        code_view, comment_view = content, content
+        
+        if self.use_lexer_mask and structural:
+            code_view, comment_view = masked_views(content, lex_spans(content, language, line_starts))
+            is_code_comment = None
+        
+        results = None
+        if self.python_ast is not None and language == 'python' and structural:
+            results = self._python_ast_patterns(content, code_view, line_starts, is_code_comment, stats['code'],
+                                                profile, budget)
+        if results is None:
+            results = self.matchers[language].scan_buffer(code_view, line_starts, 'confusion_pattern',
+                                                          is_code_comment, self.use_prefilter, stats['code'],
+                                                          source=content, profile=code_profile, budget=budget)
+        results.extend(self.comment_matcher.scan_buffer(comment_view, line_starts, 'suspicious_comment',
+                                                        self.is_django_standard_comment,
+                                                        self.use_prefilter, stats['comments'], source=content,
+                                                        profile=comment_profile, budget=budget))
+        results.truncated = budget.truncated if budget is not None else None
         return results
     
-    def calculate_confusion_score(self, results: List[Dict[str, Any]], content_length: int) -> float:
+    def calculate_confusion_score(self, results: Findings, content_length: int) -> float:
         if content_length == 0:
             return 0.0
         
@@ -182,19 +580,73 @@ class ConfusionAtomDetector:
             'suspicious_comment': 1.0
         }
         
-        score = sum(weights.get(result['type'], 0.0) for result in results)
+        score = sum(weight * results.count(result_type) for result_type, weight in weights.items())
         
         normalized_score = score / (content_length / 100.0)
         
         return min(normalized_score, 10.0)  
+    
+    def merge_profile(self, profile: Profile) -> None:
+        if self.pattern_profile is not None:
+            merge_profiles(self.pattern_profile, profile)
+    
+    def take_profile(self) -> Profile:
+        profile = self.pattern_profile or {}
+        if self.pattern_profile is not None:
+            self.pattern_profile = {}
+        return profile
+    
+    def detect(self, content: str, language: str) -> Detection:
+        profile = {} if self.pattern_profile is not None else None
+        confusion_results = self.has_confusion_patterns(content, language, profile)
+        if profile:
+            self.merge_profile({language: profile})
+        line_count = content.count('\n') + 1
+        return confusion_results, line_count, self.calculate_confusion_score(confusion_results, line_count)
+    
+    def detect_file(self, path: str, language: str) -> Detection:
+        profile = {} if self.pattern_profile is not None else None
+        budget = self._scan_budget(max(1.0, os.path.getsize(path) / (config.MAX_FILE_SIZE_KB * 1024)))
+        confusion_results = Findings()
+        line_count = 1
+        
+        for line_offset, window, clipped in iter_windows(path):
+            confusion_results.extend(self.has_confusion_patterns(window, language, profile, budget, structural=False),
+                                     line_offset)
+            if clipped:
+                confusion_results.truncated = confusion_results.truncated or 'line_length'
+            line_count = line_offset + window.count('\n') + 1
+            if budget is not None and budget.expired():
+                confusion_results.truncated = budget.truncated
+                break
+        
+        if profile:
+            self.merge_profile({language: profile})
+        return confusion_results, line_count, self.calculate_confusion_score(confusion_results, line_count)
 
 
 class RepositoryAnalyzer:
-    def __init__(self, github_api: GitHubAPI):
+    def __init__(self, github_api: GitHubAPI, listing_mode: Optional[str] = None,
+                 fetch_strategy: Optional[str] = None, blob_cache: Optional[BlobCache] = None,
+                 state_store: Optional[CrawlStateStore] = None, journal: Optional[CrawlJournal] = None,
+                 detection_pool: Optional[DetectionPool] = None,
+                 detector: Optional[ConfusionAtomDetector] = None,
+                 file_classifier: Optional[FileClassifier] = None):
         self.github_api = github_api
-        self.detector = ConfusionAtomDetector()
+        self.detector = detector or (detection_pool.detector if detection_pool is not None else ConfusionAtomDetector())
         self.max_files = config.MAX_FILES_PER_REPO
         self.max_file_size = config.MAX_FILE_SIZE_KB * 1024  
+        self.large_file_max_size = config.LARGE_FILE_MAX_SIZE_MB * 1024 * 1024 if config.LARGE_FILE_STREAMING else 0
+        self.listing_mode = listing_mode or config.LISTING_MODE
+        self.fetch_strategy = fetch_strategy or config.FETCH_STRATEGY
+        self.blob_cache = blob_cache
+        self.state_store = state_store
+        self.journal = journal
+        self.detection_pool = detection_pool
+        self.file_classifier = file_classifier
+        self.skipped_files: Dict[str, Dict[str, int]] = {}
+        self._skip_lock = threading.Lock()
+        self.graphql_batch_size = config.GRAPHQL_INITIAL_BATCH_SIZE
     
     def _should_analyze_file(self, file_info: Dict[str, Any]) -> bool:
         if file_info.get('type') != 'file':
@@ -203,7 +655,16 @@ class RepositoryAnalyzer:
         if not file_info.get('download_url'):
             return False
         
-        if file_info.get('size', 0) > self.max_file_size:
+        return self._should_analyze_blob(file_info)
+    
+    def _within_size_limit(self, size: Optional[int]) -> bool:
+        return size is None or size <= max(self.max_file_size, self.large_file_max_size)
+    
+    def _is_large_file(self, file_info: Dict[str, Any]) -> bool:
+        return (file_info.get('size') or 0) > self.max_file_size
+    
+    def _should_analyze_blob(self, file_info: Dict[str, Any]) -> bool:
+        if not self._within_size_limit(file_info.get('size')):
             return False
         
         filename = file_info.get('name', '')
@@ -213,87 +674,824 @@ class RepositoryAnalyzer:
         
         return True
     
-    def analyze_repository(self, owner: str, repo: str) -> Dict[str, Any]:
-        print(f"Analisando repositório: {owner}/{repo}")
-        
-        results = {
-            'repository': f"{owner}/{repo}",
-            'analyzed_at': datetime.now().isoformat(),
-            'files_analyzed': 0,
-            'files_with_confusion': 0,
-            'total_confusion_patterns': 0,
-            'total_suspicious_comments': 0,
-            'average_confusion_score': 0.0,
-            'files': []
+    def _record_skips(self, repository: str, skipped: Dict[str, int]) -> None:
+        with self._skip_lock:
+            merge_skip_counts(self.skipped_files.setdefault(repository, {}), skipped)
+    
+    def _classified_out(self, repository: str, file_info: Dict[str, Any]) -> bool:
+        if self.file_classifier is None:
+            return False
+        reason = self.file_classifier.classify_path(file_info.get('path', ''), file_info.get('size') or 0)
+        if reason is None:
+            return False
+        self._record_skips(repository, {reason: 1})
+        return True
+    
+    def _vendored_directory(self, path: str) -> bool:
+        return self.file_classifier is not None and self.file_classifier.classify_path(f"{path}/") == 'vendored'
+    
+    def _skip_by_content(self, results: Dict[str, Any], file_info: Dict[str, Any], content: FileContent) -> bool:
+        if self.file_classifier is None:
+            return False
+        reason = self.file_classifier.classify_content(content)
+        if reason is None:
+            return False
+        print(f"Arquivo ignorado ({reason}): {file_info.get('path', '')}")
+        self._record_skips(results['repository'], {reason: 1})
+        self._discard_content(content)
+        return True
+    
+    def _tree_entry_to_file_info(self, owner: str, repo: str, ref: str, 
+                                 entry: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
+        path = f"{prefix}{entry.get('path', '')}"
+        return {
+            'type': 'file' if entry.get('type') == 'blob' else entry.get('type'),
+            'name': path.rsplit('/', 1)[-1],
+            'path': path,
+            'sha': entry.get('sha'),
+            'size': entry.get('size'),
+            'download_url': f"{config.GITHUB_RAW_BASE_URL}/{owner}/{repo}/{quote(ref, safe='')}/{quote(path)}"
         }
+    
+    def _local_entry_to_file_info(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        path = entry['path']
+        return {
+            'type': 'file',
+            'name': path.rsplit('/', 1)[-1],
+            'path': path,
+            'sha': entry['sha'],
+            'size': entry['size'],
+            'download_url': None
+        }
+    
+    def _list_files_from_tree(self, owner: str, repo: str, 
+                              repo_info: Optional[Dict[str, Any]] = None) -> Optional[List[Dict[str, Any]]]:
+        if repo_info is None:
+            repo_info = self.github_api.get_repository(owner, repo)
+        ref = repo_info.get('default_branch') if repo_info else None
+        if not ref:
+            return None
         
+        files_to_analyze = []
+        queue = deque([(ref, '')])
+        
+        while queue and len(files_to_analyze) < self.max_files:
+            tree_sha, prefix = queue.popleft()
+            
+            tree = self.github_api.get_tree(owner, repo, tree_sha, recursive=True)
+            if tree.get('truncated'):
+                print(f"Árvore truncada em '{prefix or '/'}', listando subárvores individualmente...")
+                tree = self.github_api.get_tree(owner, repo, tree_sha)
+                for entry in tree.get('tree', []):
+                    if entry.get('type') == 'tree' and not self._vendored_directory(f"{prefix}{entry.get('path', '')}"):
+                        queue.append((entry.get('sha'), f"{prefix}{entry.get('path', '')}/"))
+            
+            entries = [entry for entry in tree.get('tree', []) if entry.get('type') == 'blob']
+            entries.sort(key=lambda entry: entry.get('path', '').count('/'))
+            
+            for entry in entries:
+                file_info = self._tree_entry_to_file_info(owner, repo, ref, entry, prefix)
+                if self._should_analyze_file(file_info) and not self._classified_out(f"{owner}/{repo}", file_info):
+                    files_to_analyze.append(file_info)
+        
+        return files_to_analyze
+    
+    def _list_files_from_contents(self, owner: str, repo: str) -> Optional[List[Dict[str, Any]]]:
         contents = self.github_api.get_repo_contents(owner, repo)
         if not contents:
-            print(f"Nenhum conteúdo encontrado para {owner}/{repo}")
-            return results
+            return None
         
         files_to_analyze = []
         
-        queue = [item for item in contents if isinstance(item, dict)]
+        queue = deque(item for item in contents if isinstance(item, dict))
         
         while queue and len(files_to_analyze) < self.max_files:
-            item = queue.pop(0)
+            item = queue.popleft()
             
             if item.get('type') == 'dir':
+                if self._vendored_directory(item.get('path', '')):
+                    continue
                 dir_contents = self.github_api.get_repo_contents(owner, repo, item.get('path', ''))
                 if isinstance(dir_contents, list):
                     queue.extend(dir_contents)
-            elif self._should_analyze_file(item):
+            elif self._should_analyze_file(item) and not self._classified_out(f"{owner}/{repo}", item):
                 files_to_analyze.append(item)
         
-        files_to_analyze = files_to_analyze[:self.max_files]
+        return files_to_analyze
+    
+    def list_files(self, owner: str, repo: str, 
+                   repo_info: Optional[Dict[str, Any]] = None) -> Optional[List[Dict[str, Any]]]:
+        if self.listing_mode == 'contents':
+            files_to_analyze = self._list_files_from_contents(owner, repo)
+        else:
+            files_to_analyze = self._list_files_from_tree(owner, repo, repo_info)
+        
+        if files_to_analyze is None:
+            return None
         
+        return files_to_analyze[:self.max_files]
+    
+    def _new_results(self, owner: str, repo: str) -> Dict[str, Any]:
+        return {
+            'repository': f"{owner}/{repo}",
+            'analyzed_at': datetime.now().isoformat(),
+            'files_analyzed': 0,
+            'files_with_confusion': 0,
+            'total_confusion_patterns': 0,
+            'total_suspicious_comments': 0,
+            'average_confusion_score': 0.0,
+            'lines_analyzed': 0,
+            'languages': {},
+            'files': [],
+            'truncated_files': [],
+            'skipped_files': {}
+        }
+    
+    def _attach_repository_metadata(self, results: Dict[str, Any], repo: Dict[str, Any]) -> Dict[str, Any]:
+        results['stars'] = repo.get('stargazers_count')
+        results['forks'] = repo.get('forks_count')
+        return results
+    
+    def _record_file_result(self, results: Dict[str, Any], file_info: Dict[str, Any], language: str,
+                            confusion_results: Findings, line_count: int,
+                            confusion_score: Optional[float] = None) -> float:
+        if confusion_score is None:
+            confusion_score = self.detector.calculate_confusion_score(confusion_results, line_count)
+        
+        confusion_patterns = confusion_results.count('confusion_pattern')
+        suspicious_comments = confusion_results.count('suspicious_comment')
+        
+        language_totals = results['languages'].setdefault(language, {'files': 0, 'lines': 0})
+        language_totals['files'] += 1
+        language_totals['lines'] += line_count
+        results['lines_analyzed'] += line_count
+        
+        if confusion_results.truncated:
+            results['truncated_files'].append({
+                'path': file_info.get('path', ''),
+                'language': language,
+                'reason': confusion_results.truncated
+            })
+        
+        if confusion_results:
+            results['files_with_confusion'] += 1
+            results['total_confusion_patterns'] += confusion_patterns
+            results['total_suspicious_comments'] += suspicious_comments
+            
+            results['files'].append({
+                'filename': file_info.get('name', ''),
+                'path': file_info.get('path', ''),
+                'language': language,
+                'confusion_score': confusion_score,
+                'confusion_patterns': confusion_patterns,
+                'suspicious_comments': suspicious_comments,
+                'line_count': line_count,
+                'truncated': confusion_results.truncated,
+                'details': confusion_results
+            })
+        
+        results['files_analyzed'] += 1
+        
+        if self.state_store is not None:
+            results.setdefault('_file_records', {})[file_info.get('path', '')] = self._file_record(
+                file_info, language, confusion_results, line_count)
+        
+        return confusion_score
+    
+    def _file_record(self, file_info: Dict[str, Any], language: str,
+                     confusion_results: Findings, line_count: int) -> Dict[str, Any]:
+        return {
+            'name': file_info.get('name', ''),
+            'language': language,
+            'line_count': line_count,
+            'details': confusion_results
+        }
+    
+    def _cached_detection(self, file_info: Dict[str, Any],
+                          language: str) -> Optional[Tuple[Findings, int]]:
+        if self.blob_cache is None or not file_info.get('sha'):
+            return None
+        return self.blob_cache.get_detection(file_info['sha'], language, self.detector.pattern_version)
+    
+    def _store_detection(self, results: Dict[str, Any], file_info: Dict[str, Any], language: str,
+                         content: FileContent, detection: Detection) -> float:
+        confusion_results, line_count, confusion_score = detection
+        sha = file_info.get('sha')
+        
+        if self.blob_cache is not None and sha:
+            self.blob_cache.put(sha, None if isinstance(content, SpooledFile) else content, language,
+                                self.detector.pattern_version, confusion_results, line_count)
+        
+        if self.journal is not None:
+            self.journal.record_file(results['repository'], file_info.get('path', ''),
+                                     self._file_record(file_info, language, confusion_results, line_count))
+        
+        return self._record_file_result(results, file_info, language, confusion_results, line_count, confusion_score)
+    
+    def _detect_content(self, content: FileContent, language: str) -> Detection:
+        if isinstance(content, SpooledFile):
+            return self.detector.detect_file(content.path, language)
+        return self.detector.detect(content, language)
+    
+    def _submit_detection(self, content: FileContent, language: str) -> Future:
+        if isinstance(content, SpooledFile):
+            return self.detection_pool.submit_file(content.path, language)
+        return self.detection_pool.submit(content, language)
+    
+    def _discard_content(self, content: FileContent) -> None:
+        if isinstance(content, SpooledFile):
+            content.remove()
+    
+    def _analyze_content(self, results: Dict[str, Any], file_info: Dict[str, Any],
+                         content: FileContent) -> float:
+        language = self.detector.detect_language_from_extension(file_info.get('name', ''))
+        
+        if self._skip_by_content(results, file_info, content):
+            return 0.0
+        
+        try:
+            cached = self._cached_detection(file_info, language)
+            if cached is not None:
+                confusion_results, line_count = cached
+                return self._record_file_result(results, file_info, language, confusion_results, line_count)
+            
+            return self._store_detection(results, file_info, language, content,
+                                         self._detect_content(content, language))
+        finally:
+            self._discard_content(content)
+    
+    def _store_pending_detection(self, results: Dict[str, Any], file_info: Dict[str, Any], language: str,
+                                 content: FileContent, future: Future) -> float:
+        try:
+            return self._store_detection(results, file_info, language, content, future.result())
+        finally:
+            self._discard_content(content)
+    
+    def _split_journaled_files(self, repository: str,
+                               files_to_analyze: List[Dict[str, Any]]) -> Tuple[List[CachedFile], List[Dict[str, Any]]]:
+        file_records = self.journal.file_records.get(repository) if self.journal is not None else None
+        if not file_records:
+            return [], files_to_analyze
+        
+        journaled_files = []
+        remaining_files = []
+        for file_info in files_to_analyze:
+            record = file_records.get(file_info.get('path', ''))
+            if record is not None:
+                journaled_files.append((file_info, record['language'], Findings.load(record['details']),
+                                        record['line_count']))
+            else:
+                remaining_files.append(file_info)
+        
+        if journaled_files:
+            print(f"{len(journaled_files)} arquivos recuperados do journal do crawl")
+        return journaled_files, remaining_files
+    
+    def _split_cached_files(self, files_to_analyze: List[Dict[str, Any]]) -> Tuple[List[CachedFile], List[Dict[str, Any]]]:
+        if self.blob_cache is None:
+            return [], files_to_analyze
+        
+        cached_files = []
+        remaining_files = []
+        for file_info in files_to_analyze:
+            language = self.detector.detect_language_from_extension(file_info.get('name', ''))
+            cached = None
+            if file_info.get('sha'):
+                cached = self.blob_cache.get_detection(file_info['sha'], language, self.detector.pattern_version)
+            if cached is not None:
+                cached_files.append((file_info, language, cached[0], cached[1]))
+            else:
+                remaining_files.append(file_info)
+        
+        if cached_files:
+            print(f"{len(cached_files)} arquivos reaproveitados do cache de blobs")
+        return cached_files, remaining_files
+    
+    def _record_cached_files(self, results: Dict[str, Any], 
+                             cached_files: List[CachedFile]) -> float:
         total_confusion_score = 0.0
+        for file_info, language, confusion_results, line_count in cached_files:
+            total_confusion_score += self._record_file_result(results, file_info, language, confusion_results, line_count)
+        return total_confusion_score
+    
+    def _get_file_content(self, file_info: Dict[str, Any]) -> Tuple[FileContent, bool]:
+        if self._is_large_file(file_info):
+            return self.github_api.download_file(file_info.get('download_url', ''))
+        if self.blob_cache is not None and file_info.get('sha'):
+            content = self.blob_cache.get_content(file_info['sha'])
+            if content is not None:
+                return content, True
+        return self.github_api.get_file_content(file_info.get('download_url', ''))
+    
+    def _finalize_results(self, results: Dict[str, Any], total_confusion_score: float) -> Dict[str, Any]:
+        file_records = results.pop('_file_records', {})
+        crawl_state = results.pop('_crawl_state', None)
+        if self.state_store is not None and crawl_state is not None:
+            self.state_store.save(results['repository'], crawl_state, file_records)
+        
+        with self._skip_lock:
+            skipped = self.skipped_files.pop(results['repository'], {})
+        merge_skip_counts(results.setdefault('skipped_files', {}), skipped)
+        if skipped:
+            print(f"Arquivos ignorados em {results['repository']}: "
+                  f"{', '.join(f'{reason}={count}' for reason, count in sorted(skipped.items()))}")
         
+        if results['files_analyzed'] > 0:
+            results['average_confusion_score'] = total_confusion_score / results['files_analyzed']
+        
+        results['files'] = sorted(results['files'], key=lambda x: x['confusion_score'], reverse=True)
+        
+        if self.journal is not None:
+            self.journal.record_repo_done(results)
+        
+        return results
+    
+    def _iter_downloaded_files(self, files_to_analyze: List[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], FileContent]]:
         for file_info in files_to_analyze:
-            filename = file_info.get('name', '')
             file_path = file_info.get('path', '')
-            file_url = file_info.get('download_url', '')
-            language = self.detector.detect_language_from_extension(filename)
             
             print(f"Analisando arquivo: {file_path}")
             
-            content, success = self.github_api.get_file_content(file_url)
+            content, success = self._get_file_content(file_info)
             if not success or not content:
                 print(f"Falha ao obter conteúdo do arquivo: {file_path}")
                 continue
             
-            confusion_results = self.detector.has_confusion_patterns(content, language)
+            yield file_info, content
+    
+    def _iter_local_files(self, local_repo: LocalGitRepository,
+                          files_to_analyze: List[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], FileContent]]:
+        blobs = local_repo.iter_blobs((file_info['sha'] for file_info in files_to_analyze),
+                                      spool_above=self.max_file_size)
+        for (_, data), file_info in zip(blobs, files_to_analyze):
+            file_path = file_info.get('path', '')
             
-            confusion_score = self.detector.calculate_confusion_score(confusion_results, len(content.split('\n')))
-            total_confusion_score += confusion_score
+            print(f"Analisando arquivo: {file_path}")
             
-            confusion_patterns = sum(1 for r in confusion_results if r['type'] == 'confusion_pattern')
-            suspicious_comments = sum(1 for r in confusion_results if r['type'] == 'suspicious_comment')
+            if not data:
+                print(f"Falha ao obter conteúdo do arquivo: {file_path}")
+                continue
             
-            if confusion_results:
-                results['files_with_confusion'] += 1
-                results['total_confusion_patterns'] += confusion_patterns
-                results['total_suspicious_comments'] += suspicious_comments
-                
-                results['files'].append({
-                    'filename': filename,
-                    'path': file_path,
-                    'language': language,
-                    'confusion_score': confusion_score,
-                    'confusion_patterns': confusion_patterns,
-                    'suspicious_comments': suspicious_comments,
-                    'details': confusion_results
-                })
-            
-            results['files_analyzed'] += 1
+            if isinstance(data, SpooledFile):
+                yield file_info, data
+            else:
+                yield file_info, data.decode('utf-8', errors='replace')
+    
+    def _iter_archive_files(self, owner: str, repo: str, ref: str,
+                            wanted_paths: Optional[Set[str]] = None) -> Iterator[Tuple[Dict[str, Any], FileContent]]:
+        response = self.github_api.get_archive_stream(owner, repo, ref)
+        if response is None:
+            return
         
-        if results['files_analyzed'] > 0:
-            results['average_confusion_score'] = total_confusion_score / results['files_analyzed']
+        response.raw.decode_content = True
+        found = 0
+        limit = len(wanted_paths) if wanted_paths is not None else self.max_files
         
-        results['files'] = sorted(results['files'], key=lambda x: x['confusion_score'], reverse=True)
+        try:
+            with tarfile.open(fileobj=response.raw, mode='r|gz') as archive:
+                for member in archive:
+                    if not member.isfile() or '/' not in member.name:
+                        continue
+                    
+                    path = member.name.split('/', 1)[1]
+                    if wanted_paths is not None and path not in wanted_paths:
+                        continue
+                    
+                    file_info = self._tree_entry_to_file_info(owner, repo, ref, 
+                                                              {'path': path, 'type': 'blob', 'size': member.size})
+                    if not self._should_analyze_file(file_info) or self._classified_out(f"{owner}/{repo}", file_info):
+                        continue
+                    
+                    extracted = archive.extractfile(member)
+                    if extracted is None:
+                        continue
+                    
+                    print(f"Analisando arquivo: {path}")
+                    if self._is_large_file(file_info):
+                        content = spool_stream(extracted, member.size)
+                        file_info['sha'] = content.git_sha
+                    else:
+                        data = extracted.read()
+                        file_info['sha'] = git_blob_sha(data)
+                        content = data.decode('utf-8', errors='replace')
+                    if content:
+                        yield file_info, content
+                    
+                    found += 1
+                    if found >= limit:
+                        break
+        except (tarfile.TarError, requests.RequestException) as e:
+            print(f"Erro ao ler o arquivo compactado de {owner}/{repo}: {str(e)}")
+        finally:
+            response.close()
+    
+    def _estimate_archive_cost(self, repo_info: Dict[str, Any]) -> float:
+        return 1.0 + repo_info.get('size', 0) / float(config.ARCHIVE_KB_PER_REQUEST)
+    
+    def _list_for_plan(self, owner: str, repo: str,
+                       repo_info: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        if repo_info is None:
+            repo_info = {}
+            if self.listing_mode != 'contents' or self.fetch_strategy != 'files':
+                repo_info = self.github_api.get_repository(owner, repo)
+        ref = repo_info.get('default_branch', '') if repo_info else ''
+        size = repo_info.get('size', 0) if repo_info else 0
         
-        return results
+        if self.fetch_strategy == 'archive':
+            return {'ref': ref, 'size': size, 'files': None}
+        
+        files_to_analyze = self.list_files(owner, repo, repo_info)
+        if files_to_analyze is None:
+            return None
+        
+        with self._skip_lock:
+            skipped = dict(self.skipped_files.get(f"{owner}/{repo}", {}))
+        return {'ref': ref, 'size': size, 'files': files_to_analyze, 'skipped': skipped}
+    
+    def _plan_fetch(self, owner: str, repo: str, 
+                    repo_info: Optional[Dict[str, Any]] = None,
+                    crawl_state: Optional[Dict[str, Any]] = None) -> Optional[Tuple[str, str, Optional[List[Dict[str, Any]]], List[CachedFile]]]:
+        full_name = f"{owner}/{repo}"
+        listing = self.journal.listings.get(full_name) if self.journal is not None else None
+        if listing is None:
+            listing = self._list_for_plan(owner, repo, repo_info)
+            if listing is None:
+                return None
+            if self.journal is not None:
+                self.journal.record_listing(full_name, dict(listing, crawl_state=crawl_state))
+        else:
+            self._record_skips(full_name, listing.get('skipped', {}))
+        
+        ref = listing['ref']
+        if listing['files'] is None:
+            return 'archive', ref, None, []
+        
+        journaled_files, files_to_analyze = self._split_journaled_files(full_name, listing['files'])
+        cached_files, files_to_analyze = self._split_cached_files(files_to_analyze)
+        cached_files = journaled_files + cached_files
+        
+        if self.fetch_strategy == 'graphql':
+            return 'graphql', ref, files_to_analyze, cached_files
+        
+        if self.fetch_strategy == 'auto' and len(files_to_analyze) > self._estimate_archive_cost(listing):
+            print(f"Usando arquivo compactado para {owner}/{repo} ({len(files_to_analyze)} arquivos)")
+            return 'archive', ref, files_to_analyze, cached_files
+        
+        return 'files', ref, files_to_analyze, cached_files
+    
+    def _iter_archive_plan(self, owner: str, repo: str, ref: str,
+                           files_to_analyze: Optional[List[Dict[str, Any]]]) -> Iterator[Tuple[Dict[str, Any], FileContent]]:
+        wanted_paths = None
+        if files_to_analyze is not None:
+            wanted_paths = {file_info.get('path', '') for file_info in files_to_analyze}
+        return self._iter_archive_files(owner, repo, ref, wanted_paths)
+    
+    def _graphql_batches(self, files_to_analyze: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        pending = deque(files_to_analyze)
+        while pending:
+            batch = []
+            batch_bytes = 0
+            while pending and len(batch) < self.graphql_batch_size:
+                size = pending[0].get('size') or 0
+                if batch and batch_bytes + size > config.GRAPHQL_MAX_BATCH_BYTES:
+                    break
+                batch.append(pending.popleft())
+                batch_bytes += size
+            yield batch
+    
+    def _tune_graphql_batch_size(self, metadata: Dict[str, Any], batch_length: int) -> None:
+        cost = metadata['rate_limit'].get('cost')
+        if metadata['failed'] or (cost is not None and cost > config.GRAPHQL_TARGET_COST):
+            self.graphql_batch_size = max(config.GRAPHQL_MIN_BATCH_SIZE, min(self.graphql_batch_size, batch_length) // 2)
+        elif batch_length >= self.graphql_batch_size:
+            self.graphql_batch_size = min(config.GRAPHQL_MAX_BATCH_SIZE,
+                                          self.graphql_batch_size + config.GRAPHQL_BATCH_SIZE_STEP)
+    
+    def _filter_graphql_metadata(self, owner: str, repo: str, ref: str,
+                                 files_to_analyze: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        unknown = [file_info for file_info in files_to_analyze if file_info.get('size') is None]
+        if not unknown:
+            return files_to_analyze
+        
+        rejected = set()
+        for batch in self._graphql_batches(unknown):
+            blobs, _ = self.github_api.get_blobs_batch(owner, repo, ref, [f.get('path', '') for f in batch],
+                                                       include_text=False)
+            for file_info in batch:
+                blob = blobs.get(file_info.get('path', ''))
+                if not blob or blob.get('isBinary') or not self._within_size_limit(blob.get('byteSize', 0)):
+                    rejected.add(file_info.get('path', ''))
+                else:
+                    file_info['size'] = blob.get('byteSize', 0)
+        
+        return [file_info for file_info in files_to_analyze if file_info.get('path', '') not in rejected]
+    
+    def _resolve_unknown_sizes(self, owner: str, repo: str, ref: str,
+                               files_to_analyze: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        unknown = [file_info for file_info in files_to_analyze if file_info.get('size') is None]
+        if unknown and self.fetch_strategy != 'graphql':
+            tree = self.github_api.get_tree(owner, repo, ref, recursive=True) or {}
+            sizes = {entry.get('path'): entry.get('size') for entry in tree.get('tree', []) if entry.get('type') == 'blob'}
+            for file_info in unknown:
+                file_info['size'] = sizes.get(file_info.get('path', ''))
+        
+        return self._filter_graphql_metadata(owner, repo, ref, files_to_analyze)
+    
+    def _iter_graphql_files(self, owner: str, repo: str, ref: str,
+                            files_to_analyze: List[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], FileContent]]:
+        files_to_analyze = self._filter_graphql_metadata(owner, repo, ref, files_to_analyze)
+        large_files = [file_info for file_info in files_to_analyze if self._is_large_file(file_info)]
+        files_to_analyze = [file_info for file_info in files_to_analyze if not self._is_large_file(file_info)]
+        
+        for batch in self._graphql_batches(files_to_analyze):
+            print(f"Baixando {len(batch)} arquivos via GraphQL...")
+            blobs, metadata = self.github_api.get_blobs_batch(owner, repo, ref, [f.get('path', '') for f in batch])
+            self._tune_graphql_batch_size(metadata, len(batch))
+            
+            if metadata['failed']:
+                print("Lote GraphQL falhou, baixando arquivos individualmente...")
+                yield from self._iter_downloaded_files(batch)
+                continue
+            
+            truncated = []
+            for file_info in batch:
+                blob = blobs.get(file_info.get('path', ''))
+                if blob and blob.get('isTruncated'):
+                    truncated.append(file_info)
+                    continue
+                if not blob or blob.get('isBinary') or blob.get('text') is None:
+                    print(f"Falha ao obter conteúdo do arquivo: {file_info.get('path', '')}")
+                    continue
+                print(f"Analisando arquivo: {file_info.get('path', '')}")
+                yield file_info, blob['text']
+            
+            yield from self._iter_downloaded_files(truncated)
+        
+        yield from self._iter_downloaded_files(large_files)
+    
+    def _iter_plan_contents(self, owner: str, repo: str, strategy: str, ref: str,
+                            files_to_analyze: Optional[List[Dict[str, Any]]]) -> Iterator[Tuple[Dict[str, Any], FileContent]]:
+        if strategy == 'archive':
+            return self._iter_archive_plan(owner, repo, ref, files_to_analyze)
+        if strategy == 'graphql':
+            return self._iter_graphql_files(owner, repo, ref, files_to_analyze)
+        return self._iter_downloaded_files(files_to_analyze)
+    
+    def _analyze_file_contents(self, results: Dict[str, Any], 
+                               file_contents: Iterator[Tuple[Dict[str, Any], FileContent]]) -> float:
+        if self.detection_pool is not None:
+            return self._analyze_file_contents_in_pool(results, file_contents)
+        
+        total_confusion_score = 0.0
+        
+        for file_info, content in file_contents:
+            total_confusion_score += self._analyze_content(results, file_info, content)
+        
+        return total_confusion_score
+    
+    def _analyze_file_contents_in_pool(self, results: Dict[str, Any],
+                                       file_contents: Iterator[Tuple[Dict[str, Any], FileContent]]) -> float:
+        total_confusion_score = 0.0
+        pending = deque()
+        
+        for file_info, content in file_contents:
+            if self._skip_by_content(results, file_info, content):
+                continue
+            
+            language = self.detector.detect_language_from_extension(file_info.get('name', ''))
+            cached = self._cached_detection(file_info, language)
+            if cached is not None:
+                self._discard_content(content)
+                total_confusion_score += self._record_file_result(results, file_info, language, *cached)
+                continue
+            
+            pending.append((file_info, language, content, self._submit_detection(content, language)))
+            while pending and (pending[0][3].done() or len(pending) >= self.detection_pool.queue_size):
+                total_confusion_score += self._store_pending_detection(results, *pending.popleft())
+        
+        for file_info, language, content, future in pending:
+            total_confusion_score += self._store_pending_detection(results, file_info, language, content, future)
+        
+        return total_confusion_score
+    
+    def _results_from_records(self, owner: str, repo: str, file_records: Dict[str, Dict[str, Any]],
+                              crawl_state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        results = self._new_results(owner, repo)
+        if crawl_state is not None:
+            results['_crawl_state'] = crawl_state
+        
+        total_confusion_score = 0.0
+        for path, record in file_records.items():
+            file_info = {'name': record['name'], 'path': path}
+            total_confusion_score += self._record_file_result(results, file_info, record['language'],
+                                                              Findings.load(record['details']), record['line_count'])
+        
+        return self._finalize_results(results, total_confusion_score)
+    
+    def _scan_changed_files(self, owner: str, repo: str, head_sha: str,
+                            file_records: Dict[str, Dict[str, Any]], changed_files: List[Dict[str, Any]]) -> bool:
+        if len(changed_files) >= config.GITHUB_COMPARE_MAX_FILES:
+            return False
+        
+        candidates = []
+        for changed in changed_files:
+            path = changed.get('filename', '')
+            status = changed.get('status')
+            
+            if status == 'renamed':
+                file_records.pop(changed.get('previous_filename', ''), None)
+            if status == 'removed':
+                file_records.pop(path, None)
+                continue
+            if status not in ('added', 'modified', 'renamed', 'copied', 'changed'):
+                continue
+            
+            file_info = self._tree_entry_to_file_info(owner, repo, head_sha,
+                                                      {'path': path, 'type': 'blob', 'sha': changed.get('sha')})
+            if not self._should_analyze_file(file_info):
+                file_records.pop(path, None)
+                continue
+            candidates.append(file_info)
+        
+        resolved = self._resolve_unknown_sizes(owner, repo, head_sha, candidates)
+        resolved_paths = {file_info['path'] for file_info in resolved}
+        for file_info in candidates:
+            if file_info['path'] not in resolved_paths:
+                file_records.pop(file_info['path'], None)
+        
+        files_to_analyze = []
+        for file_info in resolved:
+            path = file_info['path']
+            if not self._should_analyze_file(file_info) or self._classified_out(f"{owner}/{repo}", file_info):
+                file_records.pop(path, None)
+                continue
+            if path not in file_records and len(file_records) + len(files_to_analyze) >= self.max_files:
+                continue
+            files_to_analyze.append(file_info)
+        
+        print(f"Reanalisando {len(files_to_analyze)} arquivos alterados")
+        
+        scan_results = self._new_results(owner, repo)
+        cached_files, files_to_analyze = self._split_cached_files(files_to_analyze)
+        self._record_cached_files(scan_results, cached_files)
+        strategy = 'graphql' if self.fetch_strategy == 'graphql' else 'files'
+        self._analyze_file_contents(scan_results, self._iter_plan_contents(owner, repo, strategy, head_sha,
+                                                                           files_to_analyze))
+        file_records.update(scan_results.get('_file_records', {}))
+        return True
+    
+    def _analyze_incrementally(self, owner: str, repo: str,
+                               repo_info: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        branch = repo_info.get('default_branch') if repo_info else None
+        if self.state_store is None or not branch:
+            return None, None
+        
+        full_name = f"{owner}/{repo}"
+        stored = self.state_store.get(full_name)
+        usable = (stored is not None and stored['default_branch'] == branch
+                  and stored['pattern_version'] == self.detector.pattern_version)
+        
+        if usable and stored['pushed_at'] and stored['pushed_at'] == repo_info.get('pushed_at'):
+            print(f"{full_name} sem alterações desde o último crawl")
+            return self._results_from_records(owner, repo, stored['files'], None), None
+        
+        head_sha = self.github_api.get_branch_head(owner, repo, branch)
+        if not head_sha:
+            return None, None
+        
+        crawl_state = {
+            'default_branch': branch,
+            'head_sha': head_sha,
+            'pushed_at': repo_info.get('pushed_at'),
+            'pattern_version': self.detector.pattern_version
+        }
+        
+        if not usable:
+            return None, crawl_state
+        
+        file_records = dict(stored['files'])
+        
+        if stored['head_sha'] == head_sha:
+            print(f"{full_name} sem alterações desde o último crawl")
+            return self._results_from_records(owner, repo, file_records, crawl_state), None
+        
+        comparison = self.github_api.compare_commits(owner, repo, stored['head_sha'], head_sha)
+        if comparison.get('status') not in ('ahead', 'identical'):
+            return None, crawl_state
+        
+        if not self._scan_changed_files(owner, repo, head_sha, file_records, comparison.get('files', [])):
+            return None, crawl_state
+        
+        return self._results_from_records(owner, repo, file_records, crawl_state), None
+    
+    def _begin_repository(self, owner: str, repo: str,
+                          results: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        full_name = results['repository']
+        
+        if self.journal is not None:
+            completed = self.journal.completed_results(full_name)
+            if completed is not None:
+                print(f"{full_name} já concluído no journal do crawl")
+                return completed, None
+            listing = self.journal.listings.get(full_name)
+            if listing is not None:
+                results['_crawl_state'] = listing.get('crawl_state')
+                return None, None
+        
+        repo_info = None
+        if self.state_store is not None:
+            repo_info = self.github_api.get_repository(owner, repo)
+            incremental_results, crawl_state = self._analyze_incrementally(owner, repo, repo_info)
+            if incremental_results is not None:
+                return incremental_results, None
+            results['_crawl_state'] = crawl_state
+        
+        return None, repo_info
+    
+    def analyze_repository(self, owner: str, repo: str) -> Dict[str, Any]:
+        print(f"Analisando repositório: {owner}/{repo}")
+        
+        results = self._new_results(owner, repo)
+        
+        finished_results, repo_info = self._begin_repository(owner, repo, results)
+        if finished_results is not None:
+            return finished_results
+        
+        plan = self._plan_fetch(owner, repo, repo_info, results.get('_crawl_state'))
+        if plan is None:
+            print(f"Nenhum conteúdo encontrado para {owner}/{repo}")
+            return results
+        
+        strategy, ref, files_to_analyze, cached_files = plan
+        total_confusion_score = self._record_cached_files(results, cached_files)
+        
+        file_contents = self._iter_plan_contents(owner, repo, strategy, ref, files_to_analyze)
+        total_confusion_score += self._analyze_file_contents(results, file_contents)
+        
+        return self._finalize_results(results, total_confusion_score)
+    
+    def analyze_local_repository(self, path: str, ref: Optional[str] = None) -> Dict[str, Any]:
+        ref = ref or 'HEAD'
+        
+        with LocalGitRepository(path) as local_repo:
+            owner, repo = local_repo.repository_name()
+            print(f"Analisando repositório local: {local_repo.path} ({owner}/{repo} em {ref})")
+            
+            results = self._new_results(owner, repo)
+            
+            if self.journal is not None:
+                completed = self.journal.completed_results(results['repository'])
+                if completed is not None:
+                    print(f"{results['repository']} já concluído no journal do crawl")
+                    return completed
+            
+            entries = local_repo.list_files(ref)
+            entries.sort(key=lambda entry: entry['path'].count('/'))
+            files_to_analyze = [file_info for file_info in map(self._local_entry_to_file_info, entries)
+                                if self._should_analyze_blob(file_info)
+                                and not self._classified_out(results['repository'], file_info)][:self.max_files]
+            
+            journaled_files, files_to_analyze = self._split_journaled_files(results['repository'], files_to_analyze)
+            cached_files, files_to_analyze = self._split_cached_files(files_to_analyze)
+            total_confusion_score = self._record_cached_files(results, journaled_files + cached_files)
+            
+            file_contents = self._iter_local_files(local_repo, files_to_analyze)
+            total_confusion_score += self._analyze_file_contents(results, file_contents)
+        
+        return self._finalize_results(results, total_confusion_score)
+    
+    def _iter_language_repositories(self, query: str, language: str, min_stars: int, min_forks: int,
+                                    last_updated: Optional[str], max_results: int) -> Iterator[Dict[str, Any]]:
+        seen = set()
+        cursor = None
+        on_page = None
+        
+        if self.journal is not None:
+            for repo in self.journal.found_repositories.get(language, [])[:max_results]:
+                seen.add(f"{repo.get('owner', {}).get('login')}/{repo.get('name')}")
+                yield repo
+            if language in self.journal.finished_searches or len(seen) >= max_results:
+                return
+            cursor = self.journal.search_cursors.get(language)
+            on_page = lambda page, next_cursor: self.journal.record_search_page(language, page, next_cursor)
+        
+        repos = self.github_api.iter_repositories(
+            query=query,
+            language=language,
+            min_stars=min_stars,
+            min_forks=min_forks,
+            last_updated=last_updated,
+            max_results=max_results - len(seen),
+            cursor=cursor,
+            on_page=on_page
+        )
+        
+        for repo in repos:
+            full_name = f"{repo.get('owner', {}).get('login')}/{repo.get('name')}"
+            if full_name in seen:
+                continue
+            seen.add(full_name)
+            yield repo
     
     def find_repositories_with_confusion(self, 
                                         query: str,
@@ -310,13 +1508,13 @@ class RepositoryAnalyzer:
         for language in languages:
             print(f"Buscando repositórios para a linguagem: {language}")
             
-            repos = self.github_api.search_repositories(
+            repos = self._iter_language_repositories(
                 query=query,
                 language=language,
                 min_stars=min_stars,
                 min_forks=min_forks,
                 last_updated=last_updated,
-                per_page=max_repos
+                max_results=max_repos - len(all_results)
             )
             
             for repo in repos:
@@ -325,7 +1523,7 @@ class RepositoryAnalyzer:
                 
                 if owner and repo_name:
                     result = self.analyze_repository(owner, repo_name)
-                    all_results.append(result)
+                    all_results.append(self._attach_repository_metadata(result, repo))
                     
                     if len(all_results) >= max_repos:
                         break
@@ -0,0 +1,155 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from urllib.parse import urlencode, urlparse
+from typing import Dict, Any, Optional
+import config
+
+
+class HTTPResponseCache:
+    def __init__(self,
+                 cache_dir: Optional[str] = None,
+                 max_size_mb: Optional[float] = None,
+                 default_ttl: Optional[float] = None,
+                 ttl_overrides: Optional[Dict[str, float]] = None):
+        self.cache_dir = cache_dir or config.HTTP_CACHE_DIR
+        self.max_size = int((max_size_mb if max_size_mb is not None else config.HTTP_CACHE_MAX_SIZE_MB) * 1024 * 1024)
+        self.default_ttl = default_ttl if default_ttl is not None else config.HTTP_CACHE_DEFAULT_TTL_SECONDS
+        self.ttl_overrides = [(re.compile(pattern), ttl) for pattern, ttl in
+                              (ttl_overrides if ttl_overrides is not None else config.HTTP_CACHE_TTL_OVERRIDES).items()]
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'evictions': 0}
+
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.path.join(self.cache_dir, 'responses.sqlite3'),
+                                           check_same_thread=False)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                link TEXT,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._connection.commit()
+        self._total_size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def make_key(self, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()))}"
+
+    def ttl_for(self, url: str) -> float:
+        path = urlparse(url).path
+        for pattern, ttl in self.ttl_overrides:
+            if pattern.search(path):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT etag, last_modified, link, body, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, link, body, stored_at = row
+        return {'etag': etag, 'last_modified': last_modified, 'link': link, 'body': body, 'stored_at': stored_at}
+
+    def is_fresh(self, entry: Dict[str, Any], url: str) -> bool:
+        return time.time() - entry['stored_at'] < self.ttl_for(url)
+
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if entry is None:
+            return headers
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self.stats[counter] += 1
+
+    def record_hit(self, key: str, entry: Dict[str, Any]) -> Any:
+        self._count('hits')
+        self._touch(key, refresh=False)
+        return json.loads(entry['body'])
+
+    def record_revalidated(self, key: str, entry: Dict[str, Any]) -> Any:
+        self._count('revalidated')
+        self._touch(key, refresh=True)
+        return json.loads(entry['body'])
+
+    def record_miss(self) -> None:
+        self._count('misses')
+
+    def _touch(self, key: str, refresh: bool) -> None:
+        now = time.time()
+        with self._lock:
+            if refresh:
+                self._connection.execute(
+                    "UPDATE responses SET accessed_at = ?, stored_at = ? WHERE key = ?", (now, now, key))
+            else:
+                self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._connection.commit()
+
+    def store(self, key: str, headers: Dict[str, str], body: bytes) -> None:
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        size = len(body)
+        if size > self.max_size:
+            return
+
+        now = time.time()
+        with self._lock:
+            previous = self._connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if previous:
+                self._total_size -= previous[0]
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, last_modified, link, body, size, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, headers.get('Link'), sqlite3.Binary(body), size, now, now))
+            self._total_size += size
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self) -> None:
+        while self._total_size > self.max_size:
+            rows = self._connection.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at ASC LIMIT 64").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._total_size <= self.max_size:
+                    break
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_size -= size
+                self.stats['evictions'] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            summary = dict(self.stats)
+            summary['size_bytes'] = self._total_size
+        requests_seen = summary['hits'] + summary['revalidated'] + summary['misses']
+        summary['rate_limit_saved'] = summary['hits'] + summary['revalidated']
+        summary['hit_rate'] = summary['rate_limit_saved'] / requests_seen if requests_seen else 0.0
+        return summary
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,56 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Optional
+import config
+
+
+class HTTPTransport:
+    def __init__(self,
+                 pool_connections: Optional[int] = None,
+                 pool_maxsize: Optional[int] = None,
+                 base_url_overrides: Optional[Dict[str, str]] = None,
+                 compression: bool = True):
+        self.pool_connections = pool_connections or config.HTTP_POOL_CONNECTIONS
+        self.pool_maxsize = pool_maxsize or config.HTTP_POOL_MAXSIZE
+        self.base_url_overrides = dict(config.HTTP_BASE_URL_OVERRIDES)
+        if base_url_overrides:
+            self.base_url_overrides.update(base_url_overrides)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        if compression:
+            self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+
+    def resolve_url(self, url: str) -> str:
+        for prefix, replacement in self.base_url_overrides.items():
+            if url.startswith(prefix):
+                return replacement.rstrip('/') + url[len(prefix):]
+        return url
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        return self.session.request(method, self.resolve_url(url), **kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_default_transport: Optional[HTTPTransport] = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport() -> HTTPTransport:
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = HTTPTransport()
+        return _default_transport
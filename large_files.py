@@ -0,0 +1,93 @@
+import os
+import mmap
+import hashlib
+import tempfile
+from typing import Iterator, Optional, Tuple, BinaryIO
+import config
+
+
+class SpooledFile:
+    def __init__(self, size_hint: Optional[int] = None, directory: Optional[str] = None):
+        descriptor, self.path = tempfile.mkstemp(prefix='crawler_', suffix='.body',
+                                                 dir=directory or config.LARGE_FILE_TEMP_DIR)
+        self._file: Optional[BinaryIO] = os.fdopen(descriptor, 'wb')
+        self.size = 0
+        self.size_hint = size_hint
+        self._sha = hashlib.sha1(f"blob {size_hint}\0".encode('utf-8')) if size_hint is not None else None
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self.size += len(chunk)
+        if self._sha is not None:
+            self._sha.update(chunk)
+
+    def finish(self) -> 'SpooledFile':
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return self
+
+    @property
+    def git_sha(self) -> Optional[str]:
+        if self._sha is None or self.size != self.size_hint:
+            return None
+        return self._sha.hexdigest()
+
+    def remove(self) -> None:
+        self.finish()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __bool__(self) -> bool:
+        return self.size > 0
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def spool_stream(stream: BinaryIO, size: Optional[int] = None) -> SpooledFile:
+    spooled = SpooledFile(size)
+    chunk_size = config.LARGE_FILE_CHUNK_KB * 1024
+    try:
+        while size is None or spooled.size < size:
+            wanted = chunk_size if size is None else min(chunk_size, size - spooled.size)
+            chunk = stream.read(wanted)
+            if not chunk:
+                break
+            spooled.write(chunk)
+    except BaseException:
+        spooled.remove()
+        raise
+    return spooled.finish()
+
+
+def iter_windows(path: str, window_size: Optional[int] = None) -> Iterator[Tuple[int, str, bool]]:
+    window_size = window_size or config.LARGE_FILE_WINDOW_KB * 1024
+    with open(path, 'rb') as body:
+        size = os.fstat(body.fileno()).st_size
+        if size == 0:
+            return
+
+        with mmap.mmap(body.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0
+            line_offset = 0
+            while start < size:
+                end = min(start + window_size, size)
+                clipped = False
+                if end < size:
+                    newline = mapped.rfind(b'\n', start, end)
+                    if newline != -1:
+                        end = newline + 1
+                    else:
+                        clipped = True
+
+                chunk = mapped[start:end]
+                yield line_offset, chunk.decode('utf-8', errors='replace'), clipped
+                line_offset += chunk.count(b'\n')
+
+                if clipped:
+                    newline = mapped.find(b'\n', end)
+                    end = size if newline == -1 else newline
+                start = end
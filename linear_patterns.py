@@ -0,0 +1,142 @@
+import re
+from typing import List, Iterator, Optional, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+GAP = '.*'
+
+
+def _split_top_level(pattern: str, separator: str) -> Optional[List[str]]:
+    parts = []
+    depth = 0
+    in_class = False
+    start = 0
+    i = 0
+    length = len(pattern)
+
+    while i < length:
+        char = pattern[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            if char == ']':
+                in_class = False
+        elif char == '[':
+            in_class = True
+            if pattern[i + 1:i + 2] == '^':
+                i += 1
+            if pattern[i + 1:i + 2] == ']':
+                i += 1
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif depth == 0 and pattern.startswith(separator, i):
+            parts.append(pattern[start:i])
+            i += len(separator)
+            start = i
+            continue
+        i += 1
+
+    if depth != 0 or in_class:
+        return None
+    parts.append(pattern[start:])
+    return parts
+
+
+def _fixed_width(atom: str, flags: int) -> bool:
+    try:
+        low, high = sre_parse.parse(atom, flags).getwidth()
+    except re.error:
+        return False
+    return low == high and low > 0
+
+
+def gapped_atoms(pattern: str, flags: int = 0) -> Optional[List[List[str]]]:
+    alternatives = _split_top_level(pattern, '|')
+    if alternatives is None:
+        return None
+
+    sequences = []
+    for alternative in alternatives:
+        atoms = _split_top_level(alternative, GAP)
+        if atoms is None or len(atoms) < 2:
+            return None
+        if any(GAP in atom or not _fixed_width(atom, flags) for atom in atoms):
+            return None
+        sequences.append(atoms)
+    return sequences
+
+
+class GappedMatch:
+    __slots__ = ('_start', '_end')
+
+    def __init__(self, start: int, end: int):
+        self._start = start
+        self._end = end
+
+    def start(self) -> int:
+        return self._start
+
+    def end(self) -> int:
+        return self._end
+
+    def span(self) -> Tuple[int, int]:
+        return self._start, self._end
+
+
+class GappedPattern:
+    def __init__(self, pattern: str, sequences: List[List[str]], flags: int = 0):
+        self.pattern = pattern
+        self.flags = flags
+        self.regex = re.compile(pattern, flags)
+        self.sequences = [[re.compile(atom, flags) for atom in atoms] for atoms in sequences]
+        self.last_atoms = [re.compile(f".*({atoms[-1]})", flags) for atoms in sequences]
+        self.first_atoms = '|'.join(f"(?:{atoms[0]})" for atoms in sequences)
+
+    def _sequence_match(self, atoms: List[re.Pattern], last_atom: re.Pattern, string: str, pos: int,
+                        endpos: int) -> Optional[Tuple[int, int]]:
+        first = atoms[0].search(string, pos, endpos)
+        if first is None:
+            return None
+
+        position = first.end()
+        for atom in atoms[1:-1]:
+            match = atom.search(string, position, endpos)
+            if match is None:
+                return None
+            position = match.end()
+
+        last = last_atom.match(string, position, endpos)
+        if last is None:
+            return None
+        return first.start(), last.end(1)
+
+    def finditer(self, string: str, pos: int = 0, endpos: Optional[int] = None) -> Iterator[GappedMatch]:
+        if endpos is None or endpos > len(string):
+            endpos = len(string)
+        if string.find('\n', pos, endpos) != -1:
+            yield from self.regex.finditer(string, pos, endpos)
+            return
+
+        while pos <= endpos:
+            best = None
+            for atoms, last_atom in zip(self.sequences, self.last_atoms):
+                span = self._sequence_match(atoms, last_atom, string, pos, endpos)
+                if span is not None and (best is None or span[0] < best[0]):
+                    best = span
+            if best is None:
+                return
+            yield GappedMatch(*best)
+            pos = best[1]
+
+
+def linear_pattern(pattern: str, flags: int = 0) -> Optional[GappedPattern]:
+    sequences = gapped_atoms(pattern, flags)
+    if sequences is None:
+        return None
+    return GappedPattern(pattern, sequences, flags)
@@ -0,0 +1,147 @@
+import os
+import re
+import threading
+import subprocess
+from typing import Dict, List, Any, Optional, Tuple, Iterator, Iterable, Union
+import config
+from large_files import SpooledFile, spool_stream
+
+GITHUB_REMOTE = re.compile(r"github\.com[:/]+([^/]+)/([^/]+?)(?:\.git)?/?$")
+
+BLOB_MODES = ('100644', '100755')
+
+
+class GitError(Exception):
+    pass
+
+
+class LocalGitRepository:
+    def __init__(self, path: str, git_binary: Optional[str] = None):
+        self.path = os.path.abspath(path)
+        self.git_binary = git_binary or config.LOCAL_GIT_BINARY
+        self._batch: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self.git_dir = self._git('rev-parse', '--absolute-git-dir').decode('utf-8').strip()
+        self.bare = self._git('rev-parse', '--is-bare-repository').decode('utf-8').strip() == 'true'
+
+    def _git(self, *args: str) -> bytes:
+        try:
+            completed = subprocess.run([self.git_binary, '-C', self.path, *args], capture_output=True, check=True)
+        except FileNotFoundError:
+            raise GitError(f"Executável do git não encontrado: {self.git_binary}")
+        except subprocess.CalledProcessError as e:
+            raise GitError(f"git {' '.join(args)} falhou em {self.path}: {e.stderr.decode('utf-8', 'replace').strip()}")
+        return completed.stdout
+
+    def repository_name(self) -> Tuple[str, str]:
+        try:
+            remote = self._git('config', '--get', 'remote.origin.url').decode('utf-8').strip()
+        except GitError:
+            remote = ''
+        match = GITHUB_REMOTE.search(remote)
+        if match:
+            return match.group(1), match.group(2)
+
+        name = os.path.basename(self.git_dir if self.bare else self.path)
+        if name.endswith('.git'):
+            name = name[:-4]
+        return 'local', name
+
+    def resolve(self, ref: str = 'HEAD') -> str:
+        return self._git('rev-parse', '--verify', f"{ref}^{{commit}}").decode('utf-8').strip()
+
+    def list_files(self, ref: str = 'HEAD') -> List[Dict[str, Any]]:
+        entries = []
+        for record in self._git('ls-tree', '-r', '-l', '-z', ref).split(b'\0'):
+            if not record:
+                continue
+            metadata, path = record.split(b'\t', 1)
+            mode, object_type, sha, size = metadata.split()
+            if object_type != b'blob' or mode.decode('ascii') not in BLOB_MODES:
+                continue
+            entries.append({
+                'path': path.decode('utf-8', errors='replace'),
+                'type': 'blob',
+                'sha': sha.decode('ascii'),
+                'size': int(size)
+            })
+        return entries
+
+    def _batch_process(self) -> subprocess.Popen:
+        if self._batch is None or self._batch.poll() is not None:
+            self._batch = subprocess.Popen([self.git_binary, '-C', self.path, 'cat-file', '--batch'],
+                                           stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        return self._batch
+
+    def _read_object(self, stdout: Any, spool_above: Optional[int] = None,
+                     skip: bool = False) -> Union[bytes, SpooledFile, None]:
+        header = stdout.readline()
+        if not header:
+            raise GitError("git cat-file --batch terminou inesperadamente")
+        fields = header.split()
+        if len(fields) != 3:
+            return None
+        size = int(fields[2])
+        if skip:
+            data = None
+            while size > 0:
+                chunk = stdout.read(min(size, config.LARGE_FILE_CHUNK_KB * 1024))
+                if not chunk:
+                    break
+                size -= len(chunk)
+        elif spool_above is not None and size > spool_above:
+            data = spool_stream(stdout, size)
+        else:
+            data = stdout.read(size)
+        stdout.read(1)
+        return data
+
+    def iter_blobs(self, shas: Iterable[str],
+                   spool_above: Optional[int] = None) -> Iterator[Tuple[str, Union[bytes, SpooledFile, None]]]:
+        shas = list(shas)
+        if not shas:
+            return
+
+        with self._lock:
+            process = self._batch_process()
+
+            def feed() -> None:
+                try:
+                    for sha in shas:
+                        process.stdin.write(f"{sha}\n".encode('ascii'))
+                    process.stdin.flush()
+                except (BrokenPipeError, ValueError):
+                    pass
+
+            writer = threading.Thread(target=feed, daemon=True)
+            writer.start()
+            read = 0
+            try:
+                for sha in shas:
+                    data = self._read_object(process.stdout, spool_above)
+                    read += 1
+                    yield sha, data
+            finally:
+                if process.poll() is None:
+                    for _ in range(len(shas) - read):
+                        self._read_object(process.stdout, skip=True)
+                writer.join()
+
+    def read_blob(self, sha: str) -> Optional[bytes]:
+        for _, data in self.iter_blobs([sha]):
+            return data
+        return None
+
+    def close(self) -> None:
+        if self._batch is not None:
+            if self._batch.poll() is None:
+                self._batch.stdin.close()
+                self._batch.wait()
+            self._batch.stdout.close()
+            self._batch = None
+
+    def __enter__(self) -> 'LocalGitRepository':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,391 @@
+import re
+from time import perf_counter
+from bisect import bisect_right
+from typing import Dict, List, Any, Callable, Optional, Iterator, Tuple, Set
+from findings import Findings, Hit
+from pattern_profile import record_run
+from linear_patterns import linear_pattern
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:
+    import sre_parse
+    import sre_constants
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+NEWLINE = re.compile('\n')
+
+REPEAT_OPCODES = tuple(getattr(sre_constants, name) for name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+                       if hasattr(sre_constants, name))
+
+LINE_SAFE_ESCAPES = {
+    r'\s': r'[^\S\n]',
+    r'\W': r'[^\w\n]',
+    r'\D': r'[^\d\n]',
+}
+
+
+def line_safe_pattern(pattern: str) -> str:
+    parts = []
+    i = 0
+    length = len(pattern)
+
+    while i < length:
+        char = pattern[i]
+
+        if char == '\\' and i + 1 < length:
+            escape = pattern[i:i + 2]
+            parts.append(LINE_SAFE_ESCAPES.get(escape, escape))
+            i += 2
+            continue
+
+        if char == '[':
+            j = i + 1
+            negated = j < length and pattern[j] == '^'
+            if negated:
+                j += 1
+            if j < length and pattern[j] == ']':
+                j += 1
+            while j < length and pattern[j] != ']':
+                j += 2 if pattern[j] == '\\' else 1
+
+            body = pattern[i + 1:j]
+            if negated:
+                parts.append(f"[{body}\\n]")
+            elif any(escape in body for escape in (r'\s', r'\W', r'\D', r'\n')):
+                parts.append(f"(?:(?!\\n)[{body}])")
+            else:
+                parts.append(f"[{body}]")
+            i = j + 1
+            continue
+
+        parts.append(char)
+        i += 1
+
+    return ''.join(parts)
+
+
+def _best_literals(current: Optional[Set[str]], candidate: Optional[Set[str]]) -> Optional[Set[str]]:
+    if not candidate:
+        return current
+    if current is None:
+        return candidate
+    score = lambda literals: (min(len(literal) for literal in literals), -len(literals))
+    return candidate if score(candidate) > score(current) else current
+
+
+def _required_literals(parsed: Any) -> Optional[Set[str]]:
+    best = None
+    run: List[str] = []
+
+    for opcode, argument in parsed:
+        if opcode is sre_constants.LITERAL:
+            run.append(chr(argument))
+            continue
+        if opcode is sre_constants.AT:
+            continue
+
+        if run:
+            best = _best_literals(best, {''.join(run)})
+            run = []
+
+        if opcode is sre_constants.SUBPATTERN:
+            best = _best_literals(best, _required_literals(argument[-1]))
+        elif opcode is sre_constants.BRANCH:
+            branches = [_required_literals(branch) for branch in argument[1]]
+            if all(branches):
+                best = _best_literals(best, set().union(*branches))
+        elif opcode in REPEAT_OPCODES and argument[0] >= 1:
+            best = _best_literals(best, _required_literals(argument[2]))
+
+    if run:
+        best = _best_literals(best, {''.join(run)})
+    return best
+
+
+def required_literals(pattern: str, flags: int = 0) -> Optional[List[str]]:
+    literals = _required_literals(sre_parse.parse(pattern, flags))
+    if not literals:
+        return None
+    if flags & re.IGNORECASE:
+        literals = {literal.lower() for literal in literals}
+    return sorted(literals)
+
+
+def literal_trie_pattern(literals: List[str]) -> str:
+    trie: Dict[str, Any] = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if '' in node else body
+
+    return build(trie)
+
+
+class LiteralPrefilter:
+    def __init__(self, literal_patterns: Dict[str, List[int]], flags: int = 0):
+        self.flags = flags
+        self.ignore_case = bool(flags & re.IGNORECASE)
+        self.literals = sorted(literal_patterns, key=len, reverse=True)
+        self.targets: Dict[str, List[int]] = {}
+        for literal in self.literals:
+            indexes = set()
+            for prefix in self.literals:
+                if len(prefix) <= len(literal) and re.fullmatch(re.escape(prefix), literal[:len(prefix)], flags):
+                    indexes.update(literal_patterns[prefix])
+            self.targets[literal] = sorted(indexes)
+
+        self.automaton = re.compile(literal_trie_pattern(self.literals), flags)
+        ascii_literals = all(literal.isascii() for literal in self.literals)
+        self.folded_automaton = None
+        if self.ignore_case and ascii_literals:
+            self.folded_automaton = re.compile(literal_trie_pattern(self.literals))
+        self.native = None
+        if ahocorasick is not None and ascii_literals:
+            self.native = ahocorasick.Automaton()
+            for literal in self.literals:
+                self.native.add_word(literal, literal)
+            self.native.make_automaton()
+
+    def _targets_for(self, text: str) -> List[int]:
+        key = text.lower() if self.ignore_case else text
+        targets = self.targets.get(key)
+        if targets is None:
+            literal = next(literal for literal in self.literals
+                           if re.fullmatch(re.escape(literal), text, self.flags))
+            targets = self.targets[literal]
+        return targets
+
+    def iter_hits(self, content: str) -> Iterator[Tuple[int, List[int]]]:
+        if self.native is not None and (not self.ignore_case or content.isascii()):
+            haystack = content.lower() if self.ignore_case else content
+            for end, literal in self.native.iter(haystack):
+                yield end - len(literal) + 1, self.targets[literal]
+            return
+
+        search = self.automaton.search
+        haystack = content
+        if self.folded_automaton is not None and content.isascii():
+            search = self.folded_automaton.search
+            haystack = content.lower()
+
+        position = 0
+        while True:
+            match = search(haystack, position)
+            if match is None:
+                return
+            yield match.start(), self._targets_for(match.group(0))
+            position = match.start() + 1
+
+
+class ScanBudget:
+    def __init__(self, max_line_length: int = 0, seconds: float = 0.0):
+        self.max_line_length = max_line_length
+        self.deadline = perf_counter() + seconds if seconds > 0 else None
+        self.truncated: Optional[str] = None
+
+    def line_end(self, line_start: int, line_end: int) -> int:
+        if self.max_line_length and line_end - line_start > self.max_line_length:
+            self.truncated = self.truncated or 'line_length'
+            return line_start + self.max_line_length
+        return line_end
+
+    def expired(self) -> bool:
+        if self.deadline is not None and perf_counter() > self.deadline:
+            self.truncated = 'time_budget'
+            return True
+        return False
+
+
+def newline_index(content: str) -> List[int]:
+    line_starts = [0]
+    line_starts.extend(match.end() for match in NEWLINE.finditer(content))
+    return line_starts
+
+
+class CompiledPatternSet:
+    def __init__(self, patterns: List[str], flags: int = 0, linear: bool = True):
+        self.patterns = list(patterns)
+        self.compiled = []
+        candidate_patterns = []
+        for pattern in self.patterns:
+            gapped = linear_pattern(pattern, flags) if linear else None
+            self.compiled.append(gapped or re.compile(pattern, flags))
+            candidate_patterns.append(gapped.first_atoms if gapped is not None else pattern)
+
+        self.combined = None
+        self.line_safe_combined = None
+        if self.patterns:
+            self.combined = re.compile('|'.join(f"(?:{pattern})" for pattern in candidate_patterns), flags)
+            self.line_safe_combined = re.compile(
+                '|'.join(f"(?:{line_safe_pattern(pattern)})" for pattern in candidate_patterns), flags)
+
+        literal_patterns: Dict[str, List[int]] = {}
+        self.unfiltered: List[int] = []
+        for index, pattern in enumerate(self.patterns):
+            literals = required_literals(pattern, flags)
+            if literals is None:
+                self.unfiltered.append(index)
+                continue
+            for literal in literals:
+                literal_patterns.setdefault(literal, []).append(index)
+
+        self.prefilter = LiteralPrefilter(literal_patterns, flags) if literal_patterns else None
+        self.unfiltered_combined = None
+        if self.unfiltered:
+            self.unfiltered_combined = re.compile(
+                '|'.join(f"(?:{line_safe_pattern(candidate_patterns[index])})" for index in self.unfiltered), flags)
+
+    def _profiled_spans(self, index: int, profile: Dict[str, Dict[str, Any]], content: str,
+                        start: int, end: int) -> List[Tuple[int, int]]:
+        started = perf_counter()
+        spans = [match.span() for match in self.compiled[index].finditer(content, start, end)]
+        record_run(profile, self.patterns[index], perf_counter() - started, len(spans))
+        return spans
+
+    def find_lines(self, lines: List[str], skip_line: Optional[Callable[[str], bool]] = None,
+                   profile: Optional[Dict[str, Dict[str, Any]]] = None,
+                   budget: Optional[ScanBudget] = None) -> List[List[Hit]]:
+        hits: List[List[Hit]] = [[] for _ in self.patterns]
+        if self.combined is None:
+            return hits
+
+        search = self.combined.search
+
+        for i, line in enumerate(lines):
+            if budget is not None:
+                if budget.expired():
+                    break
+                line = line[:budget.line_end(0, len(line))]
+            if search(line) is None:
+                continue
+            if skip_line is not None and skip_line(line):
+                continue
+
+            for index, regex in enumerate(self.compiled):
+                if profile is not None:
+                    hits[index].extend((i + 1, line, start, end)
+                                       for start, end in self._profiled_spans(index, profile, line, 0, len(line)))
+                    continue
+                for match in regex.finditer(line):
+                    hits[index].append((i + 1, line, match.start(), match.end()))
+
+        return hits
+
+    def scan_lines(self, lines: List[str], result_type: str,
+                   skip_line: Optional[Callable[[str], bool]] = None,
+                   profile: Optional[Dict[str, Dict[str, Any]]] = None,
+                   budget: Optional[ScanBudget] = None) -> Findings:
+        findings = Findings()
+        findings.add_hits(result_type, self.patterns, self.find_lines(lines, skip_line, profile, budget))
+        return findings
+
+    def _regex_candidate_lines(self, regex: re.Pattern, content: str, line_starts: List[int]) -> Iterator[int]:
+        search = regex.search
+        line_count = len(line_starts)
+        position = 0
+
+        while True:
+            candidate = search(content, position)
+            if candidate is None:
+                return
+            line_index = bisect_right(line_starts, candidate.start()) - 1
+            yield line_index
+            if line_index + 1 >= line_count:
+                return
+            position = line_starts[line_index + 1]
+
+    def _prefilter_candidate_lines(self, content: str, line_starts: List[int]) -> Dict[int, Set[int]]:
+        candidates: Dict[int, Set[int]] = {}
+        line_count = len(line_starts)
+        next_line_start = 0
+        current: Set[int] = set()
+
+        for position, targets in self.prefilter.iter_hits(content):
+            if position >= next_line_start:
+                line_index = bisect_right(line_starts, position) - 1
+                next_line_start = line_starts[line_index + 1] if line_index + 1 < line_count else len(content) + 1
+                current = candidates.setdefault(line_index, set())
+            current.update(targets)
+
+        if self.unfiltered_combined is not None:
+            for line_index in self._regex_candidate_lines(self.unfiltered_combined, content, line_starts):
+                candidates.setdefault(line_index, set()).update(self.unfiltered)
+
+        return candidates
+
+    def find_buffer(self, content: str, line_starts: List[int],
+                    skip_line: Optional[Callable[[str], bool]] = None, use_prefilter: bool = True,
+                    stats: Optional[Dict[str, int]] = None, source: Optional[str] = None,
+                    profile: Optional[Dict[str, Dict[str, Any]]] = None,
+                    budget: Optional[ScanBudget] = None) -> List[List[Hit]]:
+        hits: List[List[Hit]] = [[] for _ in self.patterns]
+        if self.line_safe_combined is None:
+            return hits
+        if source is None:
+            source = content
+
+        if use_prefilter and self.prefilter is not None:
+            candidates = self._prefilter_candidate_lines(content, line_starts)
+            candidate_lines = [(line_index, sorted(candidates[line_index])) for line_index in sorted(candidates)]
+        else:
+            all_patterns = list(range(len(self.patterns)))
+            candidate_lines = [(line_index, all_patterns) for line_index in
+                               self._regex_candidate_lines(self.line_safe_combined, content, line_starts)]
+
+        line_count = len(line_starts)
+        regex_runs = 0
+
+        for line_index, pattern_indexes in candidate_lines:
+            line_start = line_starts[line_index]
+            line_end = line_starts[line_index + 1] - 1 if line_index + 1 < line_count else len(content)
+            if budget is not None:
+                if budget.expired():
+                    break
+                line_end = budget.line_end(line_start, line_end)
+
+            line = source[line_start:line_end]
+            if skip_line is not None and skip_line(line):
+                continue
+
+            regex_runs += len(pattern_indexes)
+            for index in pattern_indexes:
+                if profile is not None:
+                    hits[index].extend((line_index + 1, line, start - line_start, end - line_start) for start, end in
+                                       self._profiled_spans(index, profile, content, line_start, line_end))
+                    continue
+                for match in self.compiled[index].finditer(content, line_start, line_end):
+                    hits[index].append((line_index + 1, line, match.start() - line_start, match.end() - line_start))
+
+        if stats is not None:
+            stats['files'] = stats.get('files', 0) + 1
+            stats['lines'] = stats.get('lines', 0) + line_count
+            stats['pattern_lines'] = stats.get('pattern_lines', 0) + line_count * len(self.patterns)
+            stats['candidate_lines'] = stats.get('candidate_lines', 0) + len(candidate_lines)
+            stats['regex_runs'] = stats.get('regex_runs', 0) + regex_runs
+            if not candidate_lines:
+                stats['files_skipped'] = stats.get('files_skipped', 0) + 1
+
+        return hits
+
+    def scan_buffer(self, content: str, line_starts: List[int], result_type: str,
+                    skip_line: Optional[Callable[[str], bool]] = None, use_prefilter: bool = True,
+                    stats: Optional[Dict[str, int]] = None, source: Optional[str] = None,
+                    profile: Optional[Dict[str, Dict[str, Any]]] = None,
+                    budget: Optional[ScanBudget] = None) -> Findings:
+        findings = Findings()
+        findings.add_hits(result_type, self.patterns, self.find_buffer(content, line_starts, skip_line, use_prefilter,
+                                                                       stats, source, profile, budget))
+        return findings
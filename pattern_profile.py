@@ -0,0 +1,114 @@
+import sys
+import json
+import threading
+import argparse
+from typing import Dict, List, Any, Optional
+
+Profile = Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]
+
+PROFILE_FIELDS = ('runs', 'matches', 'matched_lines', 'seconds')
+
+_merge_lock = threading.Lock()
+
+
+def new_entry() -> Dict[str, Any]:
+    return {'runs': 0, 'matches': 0, 'matched_lines': 0, 'seconds': 0.0, 'worst_line_seconds': 0.0}
+
+
+def record_run(profile: Dict[str, Dict[str, Any]], pattern: str, seconds: float, matches: int) -> None:
+    entry = profile.get(pattern)
+    if entry is None:
+        entry = profile[pattern] = new_entry()
+    entry['runs'] += 1
+    entry['seconds'] += seconds
+    entry['matches'] += matches
+    if matches:
+        entry['matched_lines'] += 1
+    if seconds > entry['worst_line_seconds']:
+        entry['worst_line_seconds'] = seconds
+
+
+def merge_profiles(target: Profile, source: Profile) -> Profile:
+    with _merge_lock:
+        _merge_into(target, source)
+    return target
+
+
+def _merge_into(target: Profile, source: Profile) -> None:
+    for language, groups in source.items():
+        for group, patterns in groups.items():
+            target_patterns = target.setdefault(language, {}).setdefault(group, {})
+            for pattern, entry in patterns.items():
+                target_entry = target_patterns.get(pattern)
+                if target_entry is None:
+                    target_entry = target_patterns[pattern] = new_entry()
+                for field in PROFILE_FIELDS:
+                    target_entry[field] += entry[field]
+                target_entry['worst_line_seconds'] = max(target_entry['worst_line_seconds'],
+                                                         entry['worst_line_seconds'])
+
+
+def profile_rows(profile: Profile) -> List[Dict[str, Any]]:
+    total_seconds = sum(entry['seconds'] for groups in profile.values()
+                        for patterns in groups.values() for entry in patterns.values())
+    rows = []
+    for language, groups in profile.items():
+        for group, patterns in groups.items():
+            for pattern, entry in patterns.items():
+                runs = entry['runs']
+                rows.append({
+                    'language': language,
+                    'group': group,
+                    'pattern': pattern,
+                    'runs': runs,
+                    'matches': entry['matches'],
+                    'matched_lines': entry['matched_lines'],
+                    'hit_rate': entry['matched_lines'] / runs if runs else 0.0,
+                    'seconds': entry['seconds'],
+                    'mean_microseconds': entry['seconds'] / runs * 1e6 if runs else 0.0,
+                    'worst_line_ms': entry['worst_line_seconds'] * 1e3,
+                    'share': entry['seconds'] / total_seconds if total_seconds else 0.0
+                })
+    rows.sort(key=lambda row: row['seconds'], reverse=True)
+    return rows
+
+
+def format_profile_table(rows: List[Dict[str, Any]], top: Optional[int] = None) -> str:
+    if top:
+        rows = rows[:top]
+    lines = [
+        f"{'linguagem':<11} {'grupo':<9} {'execuções':>10} {'acertos':>8} {'taxa':>7} "
+        f"{'total (s)':>10} {'média (µs)':>11} {'pior (ms)':>10} {'%':>6}  padrão"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['language']:<11} {row['group']:<9} {row['runs']:>10} {row['matches']:>8} "
+            f"{row['hit_rate']:>7.2%} {row['seconds']:>10.4f} {row['mean_microseconds']:>11.2f} "
+            f"{row['worst_line_ms']:>10.3f} {row['share']:>6.1%}  {row['pattern']}"
+        )
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Tabela de custo por padrão a partir de um perfil salvo')
+    parser.add_argument('path', help='Arquivo JSON com o perfil (perfil_de_padroes.json ou relatório consolidado)')
+    parser.add_argument('--top', type=int, default=20, help='Quantidade de padrões exibidos (0 = todos)')
+    parser.add_argument('--language', help='Filtrar por linguagem')
+
+    args = parser.parse_args()
+
+    with open(args.path, 'r', encoding='utf-8') as profile_file:
+        data = json.load(profile_file)
+    profile = data.get('pattern_profile', data)
+    if args.language:
+        profile = {args.language: profile.get(args.language, {})}
+
+    rows = profile_rows(profile)
+    if not rows:
+        print("Nenhum padrão perfilado encontrado")
+        sys.exit(1)
+    print(format_profile_table(rows, args.top))
+
+
+if __name__ == "__main__":
+    main()
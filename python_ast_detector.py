@@ -0,0 +1,173 @@
+import ast
+import warnings
+from typing import Dict, List, Optional
+import config
+from findings import Hit
+
+PATTERNS = config.PYTHON_CONFUSION_PATTERNS
+
+NESTED_LAMBDA = PATTERNS['nested_lambda']
+NESTED_COMPREHENSION = PATTERNS['nested_comprehension']
+GLOBALS_UPDATE = PATTERNS['globals_update']
+DEL_STATEMENT = PATTERNS['del']
+NONLOCAL_STATEMENT = PATTERNS['nonlocal']
+WALRUS = PATTERNS['walrus']
+IS_COMPARISON = PATTERNS['is_comparison']
+MUTABLE_DEFAULT = PATTERNS['mutable_default']
+MIXED_BOOLEAN = PATTERNS['mixed_boolean']
+
+DUNDER_NAMES = ['__new__', '__getattr__', '__setattr__', '__getattribute__', '__delattr__', '__slots__',
+                '__getitem__', '__setitem__', '__delitem__', '__call__', '__metaclass__', '__mro__',
+                '__subclasses__']
+DUNDER_PATTERNS = {name: PATTERNS[name] for name in DUNDER_NAMES}
+
+CALL_PATTERNS = {name: PATTERNS[name] for name in ('eval', 'exec', 'setattr', 'getattr')}
+
+AST_PATTERNS = set(DUNDER_PATTERNS.values()) | set(CALL_PATTERNS.values()) | {
+    NESTED_LAMBDA, NESTED_COMPREHENSION, GLOBALS_UPDATE, DEL_STATEMENT, NONLOCAL_STATEMENT,
+    WALRUS, IS_COMPARISON, MUTABLE_DEFAULT, MIXED_BOOLEAN,
+}
+
+SINGLETON_CONSTANTS = (None, True, False)
+
+
+def _char_col(line: str, byte_col: int) -> int:
+    if line.isascii():
+        return byte_col
+    return len(line.encode('utf-8')[:byte_col].decode('utf-8', errors='ignore'))
+
+
+def _is_mutable_default(node: ast.AST) -> bool:
+    if isinstance(node, (ast.List, ast.Dict, ast.Set)):
+        return True
+    if isinstance(node, ast.Tuple):
+        return not node.elts
+    return (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id in ('list', 'dict', 'set') and not node.args and not node.keywords)
+
+
+class PythonAtomVisitor(ast.NodeVisitor):
+    def __init__(self, content: str, line_starts: List[int], patterns: List[str]):
+        self.content = content
+        self.line_starts = line_starts
+        self.enabled = set(patterns)
+        self.hits: Dict[str, List[Hit]] = {pattern: [] for pattern in patterns}
+
+    def _line(self, lineno: int) -> Optional[str]:
+        if lineno < 1 or lineno > len(self.line_starts):
+            return None
+        start = self.line_starts[lineno - 1]
+        end = self.line_starts[lineno] - 1 if lineno < len(self.line_starts) else len(self.content)
+        return self.content[start:end]
+
+    def _record(self, pattern: str, node: ast.AST, text: Optional[str] = None,
+                byte_col: Optional[int] = None) -> None:
+        if pattern not in self.enabled:
+            return
+        line = self._line(node.lineno)
+        if line is None:
+            return
+
+        if text is not None:
+            start_col = line.find(text, _char_col(line, node.col_offset if byte_col is None else byte_col))
+            if start_col == -1:
+                return
+            end_col = start_col + len(text)
+        else:
+            start_col = _char_col(line, node.col_offset)
+            if getattr(node, 'end_lineno', None) == node.lineno:
+                end_col = _char_col(line, node.end_col_offset)
+            else:
+                end_col = len(line)
+
+        self.hits[pattern].append((node.lineno, line, start_col, end_col))
+
+    def _visit_function(self, node: ast.AST) -> None:
+        if node.name in DUNDER_PATTERNS:
+            self._record(DUNDER_PATTERNS[node.name], node, node.name)
+        defaults = node.args.defaults + [default for default in node.args.kw_defaults if default is not None]
+        mutable_defaults = [default for default in defaults if _is_mutable_default(default)]
+        if mutable_defaults:
+            self._record(MUTABLE_DEFAULT, mutable_defaults[0])
+        self.generic_visit(node)
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_Lambda(self, node: ast.Lambda) -> None:
+        if any(isinstance(child, ast.Lambda) for child in ast.walk(node.body)):
+            self._record(NESTED_LAMBDA, node)
+        self.generic_visit(node)
+
+    def visit_ListComp(self, node: ast.ListComp) -> None:
+        generators = [child for child in ast.walk(node) if isinstance(child, ast.comprehension)]
+        if len(generators) >= 2 and any(generator.ifs for generator in generators):
+            self._record(NESTED_COMPREHENSION, node)
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        func = node.func
+        if isinstance(func, ast.Name) and func.id in CALL_PATTERNS:
+            self._record(CALL_PATTERNS[func.id], node)
+        elif (isinstance(func, ast.Attribute) and func.attr == 'update' and isinstance(func.value, ast.Call)
+              and isinstance(func.value.func, ast.Name) and func.value.func.id == 'globals'):
+            self._record(GLOBALS_UPDATE, node)
+        self.generic_visit(node)
+
+    def visit_Delete(self, node: ast.Delete) -> None:
+        self._record(DEL_STATEMENT, node, 'del')
+        self.generic_visit(node)
+
+    def visit_Nonlocal(self, node: ast.Nonlocal) -> None:
+        self._record(NONLOCAL_STATEMENT, node, 'nonlocal')
+
+    def visit_NamedExpr(self, node: ast.NamedExpr) -> None:
+        self._record(WALRUS, node, ':=', node.target.end_col_offset)
+        self.generic_visit(node)
+
+    def visit_Compare(self, node: ast.Compare) -> None:
+        left = node.left
+        for operator, comparator in zip(node.ops, node.comparators):
+            if isinstance(operator, (ast.Is, ast.IsNot)):
+                singleton = isinstance(comparator, ast.Constant) and comparator.value in SINGLETON_CONSTANTS
+                if not singleton and left.end_lineno == node.lineno:
+                    self._record(IS_COMPARISON, node, 'is', left.end_col_offset)
+            left = comparator
+        self.generic_visit(node)
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> None:
+        if any(isinstance(value, ast.BoolOp) and type(value.op) is not type(node.op) for value in node.values):
+            self._record(MIXED_BOOLEAN, node)
+        self.generic_visit(node)
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if node.id in DUNDER_PATTERNS:
+            self._record(DUNDER_PATTERNS[node.id], node, node.id)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        if node.attr in DUNDER_PATTERNS and node.end_lineno == node.lineno:
+            self._record(DUNDER_PATTERNS[node.attr], node, node.attr, node.value.end_col_offset)
+        self.generic_visit(node)
+
+
+class PythonAstDetector:
+    def __init__(self, patterns: List[str]):
+        self.patterns = [pattern for pattern in patterns if pattern in AST_PATTERNS]
+
+    def detect(self, content: str, line_starts: List[int]) -> Optional[Dict[str, List[Hit]]]:
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                tree = ast.parse(content)
+        except (SyntaxError, ValueError, RecursionError, MemoryError):
+            return None
+
+        visitor = PythonAtomVisitor(content, line_starts, self.patterns)
+        try:
+            visitor.visit(tree)
+        except RecursionError:
+            return None
+
+        for hits in visitor.hits.values():
+            hits.sort(key=lambda hit: (hit[0], hit[2]))
+        return visitor.hits
@@ -1,9 +1,11 @@
 import json
+import html
 import csv
 import os
 import time
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+from findings import expanded_json
 
 class ReportGenerator:
     def __init__(self, output_dir: str = "reports"):
@@ -25,7 +27,7 @@ class ReportGenerator:
         file_path = os.path.join(self.output_dir, filename)
         
         with open(file_path, 'w', encoding='utf-8') as json_file:
-            json.dump(data, json_file, indent=4, ensure_ascii=False)
+            json.dump(data, json_file, indent=4, ensure_ascii=False, default=expanded_json)
         
         print(f"Relatório JSON gerado: {file_path}")
         return file_path
@@ -48,7 +50,8 @@ class ReportGenerator:
                 'Linguagem': file_info.get('language', 'N/A'),
                 'Pontuação de Confusão': file_info.get('confusion_score', 0.0),
                 'Padrões de Confusão': file_info.get('confusion_patterns', 0),
-                'Comentários Suspeitos': file_info.get('suspicious_comments', 0)
+                'Comentários Suspeitos': file_info.get('suspicious_comments', 0),
+                'Análise Truncada': file_info.get('truncated') or ''
             }
             files_data.append(file_entry)
         
@@ -135,10 +138,14 @@ class ReportGenerator:
                 <p><strong>Pontuação Média de Confusão:</strong> {average_confusion_score:.2f}/10.0</p>
             </div>
             
-            <h2>Arquivos Analisados</h2>
         """
         
+        statistics = data.get('statistics')
+        if statistics:
+            html_content += self._statistics_html(statistics)
+        
         html_content += """
+            <h2>Arquivos Analisados</h2>
             <table>
                 <tr>
                     <th>Arquivo</th>
@@ -251,6 +258,68 @@ class ReportGenerator:
         print(f"Relatório HTML gerado: {file_path}")
         return file_path
 
+    def _statistics_html(self, statistics: Dict[str, Any]) -> str:
+        density = statistics['density']
+        html_content = f"""
+            <h2>Estatísticas do Corpus</h2>
+            <div class="summary">
+                <p><strong>Ocorrências:</strong> {statistics['findings']}</p>
+                <p><strong>Linhas Analisadas:</strong> {density['lines_analyzed']}</p>
+                <p><strong>Ocorrências por KLOC:</strong> {density['findings_per_kloc'] or 0.0:.3f}</p>
+            </div>
+            <table>
+                <tr>
+                    <th>Linguagem</th>
+                    <th>Arquivos</th>
+                    <th>Pontuação Média</th>
+                    <th>Mediana</th>
+                    <th>P90</th>
+                    <th>P99</th>
+                    <th>Ocorrências por KLOC</th>
+                </tr>
+        """
+        
+        for language, distribution in statistics['score_distribution']['by_language'].items():
+            if not distribution['count']:
+                continue
+            html_content += f"""
+                <tr>
+                    <td>{language}</td>
+                    <td>{distribution['count']}</td>
+                    <td>{distribution['mean']:.2f}</td>
+                    <td>{distribution.get('p50', 0.0):.2f}</td>
+                    <td>{distribution.get('p90', 0.0):.2f}</td>
+                    <td>{distribution.get('p99', 0.0):.2f}</td>
+                    <td>{density['by_language'][language]['findings_per_kloc'] or 0.0:.3f}</td>
+                </tr>
+            """
+        
+        html_content += """
+            </table>
+            <table>
+                <tr>
+                    <th>Linguagem</th>
+                    <th>Padrão</th>
+                    <th>Ocorrências</th>
+                    <th>Arquivos</th>
+                    <th>Repositórios</th>
+                </tr>
+        """
+        
+        for row in statistics['patterns']:
+            html_content += f"""
+                <tr>
+                    <td>{row['language']}</td>
+                    <td>{html.escape(row['pattern'])}</td>
+                    <td>{row['findings']}</td>
+                    <td>{row['files']}</td>
+                    <td>{row['repositories']}</td>
+                </tr>
+            """
+        
+        html_content += "</table>"
+        return html_content
+
     def generate_all_reports(self, data: Dict[str, Any]) -> Dict[str, str]:
         timestamp = self._get_timestamp()
         base_filename = f"relatorio_de_atomo_de_confusao_{timestamp}"
@@ -0,0 +1,123 @@
+import io
+import re
+import tokenize
+from typing import List, Tuple, Optional
+from pattern_matcher import newline_index
+import config
+
+Span = Tuple[int, int, str]
+
+NON_NEWLINE = re.compile(r'[^\n]+')
+
+STRING_TOKEN_TYPES = {tokenize.STRING}
+STRING_TOKEN_TYPES.update(getattr(tokenize, name) for name in ('FSTRING_START', 'FSTRING_MIDDLE', 'FSTRING_END')
+                          if hasattr(tokenize, name))
+
+C_LIKE_TOKENS = {
+    'java': re.compile(r'//|/\*|"""|["\']'),
+    'javascript': re.compile(r'//|/\*|["\'`]'),
+}
+
+PYTHON_TOKENS = re.compile(r'#|\'\'\'|"""|["\']')
+
+STRING_BODIES = {
+    '"': re.compile(r'"(?:[^"\\\n]|\\.|\\\n)*"?'),
+    "'": re.compile(r"'(?:[^'\\\n]|\\.|\\\n)*'?"),
+    '`': re.compile(r'`(?:[^`\\]|\\.|\\\n)*`?', re.DOTALL),
+}
+
+
+def _python_token_spans(content: str, line_starts: List[int]) -> Optional[List[Span]]:
+    spans = []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(content).readline):
+            if token.type == tokenize.COMMENT:
+                kind = 'comment'
+            elif token.type in STRING_TOKEN_TYPES:
+                kind = 'string'
+            else:
+                continue
+            (start_row, start_col), (end_row, end_col) = token.start, token.end
+            spans.append((line_starts[start_row - 1] + start_col, line_starts[end_row - 1] + end_col, kind))
+    except (tokenize.TokenError, SyntaxError, IndexError):
+        return None
+    return spans
+
+
+def _delimited_end(content: str, start: int, delimiter: str) -> int:
+    end = content.find(delimiter, start + len(delimiter))
+    return len(content) if end == -1 else end + len(delimiter)
+
+
+def _scan_spans(content: str, token_pattern: re.Pattern, line_comment: str) -> List[Span]:
+    spans = []
+    search = token_pattern.search
+    position = 0
+    length = len(content)
+
+    while position < length:
+        token = search(content, position)
+        if token is None:
+            break
+
+        start = token.start()
+        text = token.group(0)
+        if text == line_comment:
+            end = content.find('\n', start)
+            end = length if end == -1 else end
+            kind = 'comment'
+        elif text == '/*':
+            end = _delimited_end(content, start, '*/')
+            kind = 'comment'
+        elif len(text) == 3:
+            end = _delimited_end(content, start, text)
+            kind = 'string'
+        else:
+            end = STRING_BODIES[text].match(content, start).end()
+            kind = 'string'
+
+        spans.append((start, end, kind))
+        position = max(end, start + 1)
+
+    return spans
+
+
+def lex_spans(content: str, language: str, line_starts: Optional[List[int]] = None) -> List[Span]:
+    if language == 'python':
+        spans = None
+        if config.PYTHON_LEXER == 'tokenize':
+            spans = _python_token_spans(content, line_starts or newline_index(content))
+        if spans is None:
+            spans = _scan_spans(content, PYTHON_TOKENS, '#')
+        return spans
+    if language in C_LIKE_TOKENS:
+        return _scan_spans(content, C_LIKE_TOKENS[language], '//')
+    return []
+
+
+def _blank(segment: str) -> str:
+    return NON_NEWLINE.sub(lambda match: ' ' * len(match.group(0)), segment)
+
+
+def masked_views(content: str, spans: List[Span]) -> Tuple[str, str]:
+    code_parts = []
+    comment_parts = []
+    position = 0
+
+    for start, end, kind in spans:
+        if start < position:
+            continue
+        between = content[position:start]
+        code_parts.append(between)
+        comment_parts.append(_blank(between))
+
+        segment = content[start:end]
+        code_parts.append(_blank(segment))
+        comment_parts.append(segment if kind == 'comment' else _blank(segment))
+        position = end
+
+    tail = content[position:]
+    code_parts.append(tail)
+    comment_parts.append(_blank(tail))
+
+    return ''.join(code_parts), ''.join(comment_parts)
@@ -0,0 +1,107 @@
+import time
+import threading
+from urllib.parse import urlparse
+from typing import Dict, List, Any, Optional, Mapping
+import config
+
+
+class TokenPool:
+    def __init__(self, tokens: List[str], reserve: Optional[int] = None,
+                 pacing_threshold: Optional[float] = None):
+        if not tokens:
+            raise ValueError("É necessário pelo menos um token do GitHub")
+
+        self.tokens = list(dict.fromkeys(tokens))
+        self.reserve = reserve if reserve is not None else config.TOKEN_POOL_RESERVE
+        self.pacing_threshold = pacing_threshold if pacing_threshold is not None else config.TOKEN_POOL_PACING_THRESHOLD
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict[str, Dict[str, Any]]] = {token: {} for token in self.tokens}
+
+    def resource_for_url(self, url: str) -> str:
+        path = urlparse(url).path
+        if path.startswith('/search/'):
+            return 'search'
+        if path.startswith('/graphql'):
+            return 'graphql'
+        return 'core'
+
+    def _bucket(self, token: str, resource: str) -> Dict[str, Any]:
+        buckets = self._state[token]
+        if resource not in buckets:
+            limit = config.GITHUB_DEFAULT_RATE_LIMITS.get(resource, config.GITHUB_DEFAULT_RATE_LIMITS['core'])
+            buckets[resource] = {'limit': limit, 'remaining': limit, 'reset': 0.0, 'last_request': 0.0}
+        return buckets[resource]
+
+    def _headroom(self, bucket: Dict[str, Any], now: float) -> int:
+        if bucket['reset'] <= now:
+            if bucket['reset'] or bucket['remaining'] <= self.reserve:
+                bucket['remaining'] = bucket['limit']
+            bucket['reset'] = 0.0
+        return bucket['remaining'] - self.reserve
+
+    def _pacing_delay(self, bucket: Dict[str, Any], headroom: int, now: float) -> float:
+        if bucket['remaining'] > bucket['limit'] * self.pacing_threshold or bucket['reset'] <= now:
+            return 0.0
+        interval = (bucket['reset'] - now) / max(headroom, 1)
+        return max(0.0, bucket['last_request'] + interval - now)
+
+    def acquire(self, resource: str = 'core') -> str:
+        while True:
+            with self._lock:
+                now = time.time()
+                best = None
+                for token in self.tokens:
+                    bucket = self._bucket(token, resource)
+                    headroom = self._headroom(bucket, now)
+                    if headroom <= 0:
+                        continue
+                    candidate = (self._pacing_delay(bucket, headroom, now), -headroom, token)
+                    if best is None or candidate < best:
+                        best = candidate
+
+                if best is not None:
+                    sleep_time, _, token = best
+                    if sleep_time <= 0:
+                        bucket = self._bucket(token, resource)
+                        bucket['remaining'] -= 1
+                        bucket['last_request'] = now
+                        return token
+                else:
+                    resets = [self._bucket(token, resource)['reset'] for token in self.tokens]
+                    sleep_time = max(min(resets) - now, 0.0) + 1
+                    print(f"Todos os tokens sem cota para '{resource}'. Aguardando {int(sleep_time)} segundos...")
+
+            time.sleep(sleep_time)
+
+    def update(self, token: str, headers: Mapping[str, str], resource: Optional[str] = None) -> None:
+        if 'X-RateLimit-Remaining' not in headers:
+            return
+        resource = headers.get('X-RateLimit-Resource', resource or 'core')
+        with self._lock:
+            bucket = self._bucket(token, resource)
+            bucket['remaining'] = int(headers['X-RateLimit-Remaining'])
+            if 'X-RateLimit-Limit' in headers:
+                bucket['limit'] = int(headers['X-RateLimit-Limit'])
+            if 'X-RateLimit-Reset' in headers:
+                bucket['reset'] = float(headers['X-RateLimit-Reset'])
+
+    def mark_exhausted(self, token: str, resource: str, reset_time: float) -> None:
+        with self._lock:
+            bucket = self._bucket(token, resource)
+            bucket['remaining'] = 0
+            bucket['reset'] = max(bucket['reset'], reset_time)
+
+    def load_rate_limit(self, token: str, rate_limit: Dict[str, Any]) -> None:
+        with self._lock:
+            for resource, values in rate_limit.get('resources', {}).items():
+                bucket = self._bucket(token, resource)
+                bucket['limit'] = values.get('limit', bucket['limit'])
+                bucket['remaining'] = values.get('remaining', bucket['remaining'])
+                bucket['reset'] = float(values.get('reset', bucket['reset']))
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        with self._lock:
+            return {f"token_{index + 1}": {resource: {'remaining': bucket['remaining'], 'limit': bucket['limit'],
+                                                      'reset': bucket['reset']}
+                                           for resource, bucket in self._state[token].items()}
+                    for index, token in enumerate(self.tokens)}